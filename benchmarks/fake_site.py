@@ -0,0 +1,207 @@
+"""Local stand-in for MercadoLibre used by the offline crawl benchmark.
+
+Serves results pages (`.../_Desde_<offset>_NoIndex_True` paging, the scheme
+`utils.scraper.build_search_url` produces) and listing detail pages
+(`/MLV-<id>-...`) from a corpus that is either generated or loaded from saved
+HTML. Absolute mercadolibre.com.ve links in saved pages are rewritten to the
+local server so the crawl never leaves the machine.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+MERCADOLIBRE_HOST_RE = re.compile(r"https?://(?:[a-z0-9-]+\.)*mercadolibre\.com\.ve", re.IGNORECASE)
+LISTING_PATH_RE = re.compile(r"/MLV-?(\d+)")
+OFFSET_RE = re.compile(r"_Desde_(\d+)")
+
+RESULTS_PAGE_TEMPLATE = """<!doctype html>
+<html><head><title>Apartamentos en venta</title></head>
+<body>
+<ol class="ui-search-layout">
+{cards}
+</ol>
+<ul class="andes-pagination">{next_button}</ul>
+</body></html>
+"""
+
+CARD_TEMPLATE = """  <li class="ui-search-layout__item">
+    <a href="{base}/MLV-{mlvid}-apartamento-benchmark-_JM">Apartamento {mlvid}</a>
+    <span class="andes-money-amount__fraction">{price}</span>
+  </li>"""
+
+NEXT_BUTTON = (
+    '<li class="andes-pagination__button andes-pagination__button--next">'
+    '<a href="#">Siguiente</a></li>'
+)
+
+LISTING_TEMPLATE = """<!doctype html>
+<html>
+<head>
+  <link rel="canonical" href="{base}/MLV-{mlvid}-apartamento-benchmark-_JM">
+  <meta itemprop="price" content="{price}">
+</head>
+<body>
+  <h1 class="ui-pdp-title">Apartamento benchmark {mlvid}</h1>
+  <span class="ui-pdp-subtitle">Apartamento &middot; Venta</span>
+  <div class="ui-pdp-highlighted-specs-res">
+    <div class="ui-pdp-label"><span>{area} m² totales</span></div>
+    <div class="ui-pdp-label"><span>3 cuartos</span></div>
+    <div class="ui-pdp-label"><span>2 baños</span></div>
+  </div>
+  <p class="ui-pdp-description__content">{description}</p>
+  <figure><img class="ui-pdp-gallery__figure__image" src="{base}/img/{mlvid}-1.jpg"></figure>
+  <figure><img class="ui-pdp-gallery__figure__image" src="{base}/img/{mlvid}-2.jpg"></figure>
+  <img class="ui-pdp-image" src="{base}/maps/api/staticmap?center=10.49%2C-66.85&zoom=15">
+</body>
+</html>
+"""
+
+
+@dataclass
+class Corpus:
+    """Results pages (in page order) and detail pages keyed by MLV id, with `{base}` placeholders."""
+
+    results_pages: list[str]
+    listings: dict[str, str]
+    results_per_page: int = 48
+
+    @classmethod
+    def synthetic(cls, pages: int = 3, per_page: int = 48, *, first_id: int = 100000) -> "Corpus":
+        results, listings = [], {}
+        for page_index in range(pages):
+            cards = []
+            for slot in range(per_page):
+                mlvid = str(first_id + page_index * per_page + slot)
+                price = 40000 + (int(mlvid) % 97) * 1000
+                cards.append(CARD_TEMPLATE.replace("{mlvid}", mlvid).replace("{price}", f"{price:,}".replace(",", ".")))
+                listings[mlvid] = (
+                    LISTING_TEMPLATE.replace("{mlvid}", mlvid)
+                    .replace("{price}", str(price))
+                    .replace("{area}", str(60 + int(mlvid) % 140))
+                    .replace("{description}", "Luminoso y amplio. " * 40)
+                )
+            next_button = NEXT_BUTTON if page_index < pages - 1 else ""
+            results.append(
+                RESULTS_PAGE_TEMPLATE.replace("{cards}", "\n".join(cards)).replace("{next_button}", next_button)
+            )
+        return cls(results, listings, per_page)
+
+    @classmethod
+    def from_directory(cls, root: Path, *, results_per_page: int = 48) -> "Corpus":
+        """Load saved pages: `results/*.html` (sorted = page order) and `listings/*.html` (MLV id in the name)."""
+        root = Path(root)
+        results = [
+            MERCADOLIBRE_HOST_RE.sub("{base}", p.read_text(encoding="utf-8"))
+            for p in sorted((root / "results").glob("*.html"))
+        ]
+        listings: dict[str, str] = {}
+        for path in sorted((root / "listings").glob("*.html")):
+            match = LISTING_PATH_RE.search("/" + path.stem)
+            if match:
+                listings[match.group(1)] = MERCADOLIBRE_HOST_RE.sub("{base}", path.read_text(encoding="utf-8"))
+        if not results:
+            raise ValueError(f"No results pages found under {root / 'results'}")
+        return cls(results, listings, results_per_page)
+
+    def results_page(self, number: int) -> Optional[str]:
+        if 1 <= number <= len(self.results_pages):
+            return self.results_pages[number - 1]
+        return None
+
+
+@dataclass
+class _ServerState:
+    corpus: Corpus
+    base_url: str = ""
+    requests: Counter = field(default_factory=Counter)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FakeMercadoLibre/1.0"
+    state: _ServerState  # set on the per-server subclass
+
+    def log_message(self, format, *args) -> None:  # noqa: A002 - BaseHTTPRequestHandler API
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "text/html; charset=utf-8") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _count(self, kind: str) -> None:
+        with self.state.lock:
+            self.state.requests[kind] += 1
+
+    def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler API
+        path = self.path.split("?", 1)[0]
+        corpus = self.state.corpus
+        listing = LISTING_PATH_RE.search(path)
+        if listing:
+            html = corpus.listings.get(listing.group(1))
+            self._count("listing" if html else "missing")
+            if html is None:
+                self._send(404, b"not found")
+                return
+            self._send(200, html.replace("{base}", self.state.base_url).encode("utf-8"))
+            return
+        if path.startswith(("/img/", "/maps/")) or path == "/favicon.ico":
+            self._count("asset")
+            self._send(200, b"", "image/jpeg")
+            return
+
+        offset = OFFSET_RE.search(path)
+        number = (int(offset.group(1)) - 1) // corpus.results_per_page + 1 if offset else 1
+        html = corpus.results_page(number)
+        self._count("results" if html else "missing")
+        if html is None:
+            self._send(200, RESULTS_PAGE_TEMPLATE.replace("{cards}", "").replace("{next_button}", "").encode("utf-8"))
+            return
+        self._send(200, html.replace("{base}", self.state.base_url).encode("utf-8"))
+
+    do_HEAD = do_GET
+
+
+class FakeMercadoLibre:
+    """Threaded HTTP server for a `Corpus`; usable as a (sync) context manager."""
+
+    def __init__(self, corpus: Corpus, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.state = _ServerState(corpus)
+        handler = type("BoundHandler", (_Handler,), {"state": self.state})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        host, port = self._server.server_address[:2]
+        self.base_url = self.state.base_url = f"http://{host}:{port}"
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def requests(self) -> Counter:
+        with self.state.lock:
+            return Counter(self.state.requests)
+
+    def start(self) -> "FakeMercadoLibre":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-mercadolibre", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self) -> "FakeMercadoLibre":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
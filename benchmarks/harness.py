@@ -0,0 +1,166 @@
+"""Run the real crawl pipeline against `FakeMercadoLibre` and measure it.
+
+`benchmark_env()` points the scraper at the local server and a throwaway
+SQLite database and disables pacing (humanized sleeps, rate limiting, metrics
+server). It must be applied before `scraper.*` is imported, because
+`scraper.config` reads the environment at import time; `run_benchmark()`
+imports the scraper lazily for that reason.
+"""
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.fake_site import Corpus, FakeMercadoLibre
+from benchmarks.probes import DbWriteCounter, ProtocolCallCounter, RssSampler
+
+BENCHMARK_CITY = "Caracas, Distrito Capital"
+
+# Metric -> True when higher is better. Used for baseline comparisons.
+TRACKED_METRICS = {
+    "listings_per_sec": True,
+    "protocol_calls_per_listing": False,
+    "db_statements_per_listing": False,
+    "peak_rss_mb": False,
+}
+
+
+@dataclass
+class BenchmarkResult:
+    listings: int
+    elapsed_s: float
+    listings_per_sec: float
+    protocol_calls: int
+    protocol_calls_per_listing: float
+    db_statements: int
+    db_rows: int
+    db_commits: int
+    db_statements_per_listing: float
+    peak_rss_mb: float
+    server_requests: dict = field(default_factory=dict)
+    top_protocol_calls: dict = field(default_factory=dict)
+    stages: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def benchmark_env(base_url: str, work_dir: Path, *, results_per_page: int, http_fetch: bool = False) -> dict:
+    """Environment for a paced-off crawl of the fake site (callers may pre-set tunables).
+
+    Detail pages go through the browser (`get_listing_information`) unless
+    `http_fetch` enables the plain-HTTP fast path.
+    """
+    forced = {
+        "DATABASE_URL": f"sqlite:///{Path(work_dir) / 'benchmark.db'}",
+        "SEARCH_BASE_URL": f"{base_url}/apartamentos/venta",
+        "MERCADOLIBRE_APARTAMENTOS_URL": f"{base_url}/apartamentos/venta",
+        "PAGINATION_MODE": "url",
+        "RESULTS_PER_PAGE": str(results_per_page),
+        "MAX_RESULT_PAGES": "0",
+        "HUMANIZE_DELAY_SCALE": "0",
+        "REQUESTS_PER_MINUTE": "1000000",
+        "RATE_LIMIT_MAX_RPM": "1000000",
+        "RATE_LIMIT_JITTER": "0",
+        "NETWORK_BUDGET_MB": "0",
+        "METRICS_PORT": "0",
+        "HTTP_FETCH_ENABLED": "1" if http_fetch else "0",
+        "HTTP_FETCH_HTTP2": "0",
+        "LOG_DIR": str(Path(work_dir) / "logs"),
+        "LOG_FILE": "",
+        "TIMINGS_EXPORT_PATH": "",
+        "DEBUG_MODE": "0",
+    }
+    defaults = {
+        "BROWSER_PROFILE": "production",
+        "LOG_LEVEL": "WARNING",
+        "SCROLL_IDLE_MS": "100",
+    }
+    env = {k: os.environ.get(k, v) for k, v in defaults.items()}
+    env.update(forced)
+    return env
+
+
+def _count_listings() -> int:
+    from sqlalchemy import func
+    from sqlmodel import Session, select
+
+    from db.models import Listing
+    from db.session import get_engine
+
+    with Session(get_engine()) as session:
+        return int(session.exec(select(func.count()).select_from(Listing)).one())
+
+
+async def run_benchmark(
+    corpus: Corpus,
+    work_dir: Path,
+    *,
+    http_fetch: bool = False,
+    city: str = BENCHMARK_CITY,
+) -> BenchmarkResult:
+    with FakeMercadoLibre(corpus) as site:
+        os.environ.update(
+            benchmark_env(site.base_url, work_dir, results_per_page=corpus.results_per_page, http_fetch=http_fetch)
+        )
+        from db.session import init_db, reset_engine
+        from scraper import scraper
+        from utils.timing import timings
+
+        await reset_engine()
+        init_db()
+        timings.reset()
+        protocol = ProtocolCallCounter().install()
+        db_writes = DbWriteCounter().install()
+        rss = RssSampler().start()
+        started = time.perf_counter()
+        try:
+            await scraper.main(city)
+        finally:
+            elapsed = time.perf_counter() - started
+            peak_rss = rss.stop()
+            protocol.uninstall()
+            db_writes.uninstall()
+        requests = dict(site.requests)
+
+    listings = _count_listings()
+    per_listing = max(1, listings)
+    stages = timings.summary()
+    return BenchmarkResult(
+        listings=listings,
+        elapsed_s=round(elapsed, 3),
+        listings_per_sec=round(listings / elapsed, 3) if elapsed else 0.0,
+        protocol_calls=protocol.total,
+        protocol_calls_per_listing=round(protocol.total / per_listing, 2),
+        db_statements=db_writes.statements,
+        db_rows=db_writes.rows,
+        db_commits=db_writes.commits,
+        db_statements_per_listing=round(db_writes.statements / per_listing, 3),
+        peak_rss_mb=round(peak_rss / (1024 * 1024), 1),
+        server_requests=requests,
+        top_protocol_calls=dict(protocol.calls.most_common(10)),
+        stages={k: stages[k] for k in ("listing", "results_page", "goto", "http_fetch") if k in stages},
+    )
+
+
+def compare_to_baseline(result: dict, baseline: dict, max_regression: float = 0.10) -> list[str]:
+    """Regressions beyond `max_regression` (fraction) for the tracked metrics."""
+    problems: list[str] = []
+    for metric, higher_is_better in TRACKED_METRICS.items():
+        old, new = baseline.get(metric), result.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        if worse > max_regression:
+            problems.append(f"{metric}: {old} -> {new} ({change:+.1%})")
+    return problems
+
+
+def load_corpus(corpus_dir: Optional[str], *, pages: int, per_page: int) -> Corpus:
+    if corpus_dir:
+        return Corpus.from_directory(Path(corpus_dir), results_per_page=per_page)
+    return Corpus.synthetic(pages=pages, per_page=per_page)
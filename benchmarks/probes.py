@@ -0,0 +1,151 @@
+"""Counters sampled while the benchmark crawl runs.
+
+- `ProtocolCallCounter`: Playwright driver calls (each one is a protocol
+  round trip that usually maps to one or more CDP commands).
+- `DbWriteCounter`: INSERT/UPDATE/DELETE statements, rows and commits issued
+  through SQLAlchemy.
+- `RssSampler`: peak resident memory of this process plus its descendants
+  (the Playwright driver and Chromium), read from /proc.
+"""
+from __future__ import annotations
+
+import os
+import resource
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+WRITE_VERBS = ("INSERT", "UPDATE", "DELETE")
+
+
+class ProtocolCallCounter:
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()
+        self._originals: dict[str, object] = {}
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def install(self) -> "ProtocolCallCounter":
+        from playwright._impl._connection import Channel
+
+        counter = self.calls
+        inner_send, send_no_reply = Channel._inner_send, Channel.send_no_reply
+
+        async def counted_inner_send(channel, method, *args, **kwargs):
+            counter[method] += 1
+            return await inner_send(channel, method, *args, **kwargs)
+
+        def counted_send_no_reply(channel, method, *args, **kwargs):
+            counter[method] += 1
+            return send_no_reply(channel, method, *args, **kwargs)
+
+        self._originals = {"_inner_send": inner_send, "send_no_reply": send_no_reply}
+        Channel._inner_send = counted_inner_send
+        Channel.send_no_reply = counted_send_no_reply
+        return self
+
+    def uninstall(self) -> None:
+        from playwright._impl._connection import Channel
+
+        for name, original in self._originals.items():
+            setattr(Channel, name, original)
+        self._originals = {}
+
+
+class DbWriteCounter:
+    def __init__(self) -> None:
+        self.statements = 0
+        self.rows = 0
+        self.commits = 0
+        self._lock = threading.Lock()
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if not statement.lstrip().upper().startswith(WRITE_VERBS):
+            return
+        with self._lock:
+            self.statements += 1
+            self.rows += len(parameters) if executemany else 1
+
+    def _commit(self, conn) -> None:
+        with self._lock:
+            self.commits += 1
+
+    def install(self) -> "DbWriteCounter":
+        event.listen(Engine, "before_cursor_execute", self._before_execute)
+        event.listen(Engine, "commit", self._commit)
+        return self
+
+    def uninstall(self) -> None:
+        event.remove(Engine, "before_cursor_execute", self._before_execute)
+        event.remove(Engine, "commit", self._commit)
+
+
+def _children(pid: int) -> list[int]:
+    pids: list[int] = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            pids.extend(int(c) for c in (task / "children").read_text().split())
+        except OSError:
+            continue
+    return pids
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def tree_rss_bytes(pid: Optional[int] = None) -> int:
+    """Resident memory of `pid` and all its descendants (Linux only; 0 elsewhere)."""
+    stack, total = [pid or os.getpid()], 0
+    while stack:
+        current = stack.pop()
+        total += _rss_bytes(current)
+        stack.extend(_children(current))
+    return total
+
+
+class RssSampler:
+    """Background thread recording the peak RSS of the process tree."""
+
+    def __init__(self, interval_seconds: float = 0.25) -> None:
+        self.interval_seconds = interval_seconds
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        self.peak_bytes = max(self.peak_bytes, tree_rss_bytes())
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> "RssSampler":
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> int:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._sample()
+        # Without /proc fall back to this process's own high-water mark (KiB on Linux).
+        if not self.peak_bytes:
+            self.peak_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return self.peak_bytes
+
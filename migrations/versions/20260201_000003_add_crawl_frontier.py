@@ -0,0 +1,62 @@
+"""add crawl_frontier
+
+Revision ID: 20260201_000003
+Revises: 20260130_000002
+Create Date: 2026-02-01
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20260201_000003"
+down_revision = "20260130_000002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "crawl_frontier",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("city_query", sa.String(), nullable=False),
+        sa.Column("page_number", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("kind", "url", name="uq_crawl_frontier_kind_url"),
+    )
+
+    op.create_index("ix_crawl_frontier_kind", "crawl_frontier", ["kind"], unique=False)
+    op.create_index(
+        "ix_crawl_frontier_city_query",
+        "crawl_frontier",
+        ["city_query"],
+        unique=False,
+    )
+    op.create_index("ix_crawl_frontier_status", "crawl_frontier", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_crawl_frontier_status", table_name="crawl_frontier")
+    op.drop_index("ix_crawl_frontier_city_query", table_name="crawl_frontier")
+    op.drop_index("ix_crawl_frontier_kind", table_name="crawl_frontier")
+    op.drop_table("crawl_frontier")
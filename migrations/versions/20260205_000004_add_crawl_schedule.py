@@ -0,0 +1,41 @@
+"""add crawl_schedule
+
+Revision ID: 20260205_000004
+Revises: 20260201_000003
+Create Date: 2026-02-05
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20260205_000004"
+down_revision = "20260201_000003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "crawl_schedule",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("city_query", sa.String(), nullable=False),
+        sa.Column("last_started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_index(
+        "ix_crawl_schedule_city_query",
+        "crawl_schedule",
+        ["city_query"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_crawl_schedule_city_query", table_name="crawl_schedule")
+    op.drop_table("crawl_schedule")
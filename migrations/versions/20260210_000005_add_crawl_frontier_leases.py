@@ -0,0 +1,39 @@
+"""add lease columns to crawl_frontier
+
+Revision ID: 20260210_000005
+Revises: 20260205_000004
+Create Date: 2026-02-10
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20260210_000005"
+down_revision = "20260205_000004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("crawl_frontier", sa.Column("lease_owner", sa.String(), nullable=True))
+    op.add_column(
+        "crawl_frontier",
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_crawl_frontier_lease_expires_at",
+        "crawl_frontier",
+        ["lease_expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_crawl_frontier_lease_expires_at", table_name="crawl_frontier")
+    with op.batch_alter_table("crawl_frontier") as batch_op:
+        batch_op.drop_column("lease_expires_at")
+        batch_op.drop_column("lease_owner")
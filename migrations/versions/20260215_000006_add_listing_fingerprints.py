@@ -0,0 +1,29 @@
+"""add change-detection fingerprints to listings
+
+Revision ID: 20260215_000006
+Revises: 20260210_000005
+Create Date: 2026-02-15
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20260215_000006"
+down_revision = "20260210_000005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("listings", sa.Column("card_hash", sa.String(), nullable=True))
+    op.add_column("listings", sa.Column("content_hash", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("listings") as batch_op:
+        batch_op.drop_column("content_hash")
+        batch_op.drop_column("card_hash")
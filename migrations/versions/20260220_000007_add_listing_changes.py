@@ -0,0 +1,61 @@
+"""add listing_changes
+
+Revision ID: 20260220_000007
+Revises: 20260215_000006
+Create Date: 2026-02-20
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20260220_000007"
+down_revision = "20260215_000006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "listing_changes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("listing_id", sa.Integer(), nullable=False),
+        sa.Column("mercadolibre_listing_id", sa.String(), nullable=False),
+        sa.Column(
+            "changed_at",
+            sa.DateTime(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("changes", sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["listing_id"],
+            ["listings.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_index(
+        "ix_listing_changes_listing_id",
+        "listing_changes",
+        ["listing_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_listing_changes_mercadolibre_listing_id",
+        "listing_changes",
+        ["mercadolibre_listing_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_listing_changes_mercadolibre_listing_id",
+        table_name="listing_changes",
+    )
+    op.drop_index("ix_listing_changes_listing_id", table_name="listing_changes")
+    op.drop_table("listing_changes")
@@ -0,0 +1,27 @@
+"""add card_hash to crawl_frontier
+
+Revision ID: 20260225_000008
+Revises: 20260220_000007
+Create Date: 2026-02-25
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20260225_000008"
+down_revision = "20260220_000007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("crawl_frontier", sa.Column("card_hash", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("crawl_frontier") as batch_op:
+        batch_op.drop_column("card_hash")
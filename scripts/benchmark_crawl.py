@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Ensure src (for `scraper.*`) and the repo root (for `benchmarks.*`) are importable
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for path in (SRC, ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.harness import compare_to_baseline, load_corpus, run_benchmark  # noqa: E402
+
+
+async def main(argv: list[str]) -> int:
+    """Crawl a local fake MercadoLibre end to end and report throughput and per-listing costs."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--pages", type=int, default=3, help="Results pages in the synthetic corpus")
+    parser.add_argument("--per-page", type=int, default=48, help="Listings per results page")
+    parser.add_argument("--corpus", help="Directory with saved results/*.html and listings/*.html")
+    parser.add_argument("--http-fetch", action="store_true", help="Fetch detail pages over HTTP instead of the browser")
+    parser.add_argument("--json", dest="json_path", help="Write the result as JSON to this path")
+    parser.add_argument("--baseline", help="Previous --json output to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="Allowed regression (fraction)")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus, pages=args.pages, per_page=args.per_page)
+    with tempfile.TemporaryDirectory(prefix="crawl-bench-") as work_dir:
+        result = (await run_benchmark(corpus, Path(work_dir), http_fetch=args.http_fetch)).to_dict()
+
+    print(json.dumps(result, indent=2))
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(result, baseline, args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ensure src is importable (so `scraper.*` imports work)
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from playwright.async_api import async_playwright  # noqa: E402
+from playwright_stealth import Stealth  # noqa: E402
+
+from scraper.browser_profiles import BROWSER_PROFILES  # noqa: E402
+from scraper.scraper import extract_listing_fields, launch_browser, new_crawl_context  # noqa: E402
+from utils.console import console  # noqa: E402
+
+# Served for every request in offline mode so only browser overhead is measured.
+SAMPLE_LISTING_HTML = """
+<html><head><meta itemprop="price" content="85000"></head><body>
+  <h1 class="ui-pdp-title">Apartamento en Chacao</h1>
+  <span class="ui-pdp-subtitle">Apartamento · Venta</span>
+  <div class="ui-pdp-highlighted-specs-res">
+    <div class="ui-pdp-label"><span>120 m² totales</span></div>
+    <div class="ui-pdp-label"><span>3 cuartos</span></div>
+  </div>
+  <p class="ui-pdp-description__content">Luminoso y amplio</p>
+  <img class="ui-pdp-gallery__figure__image" src="https://img.test/1.jpg">
+</body></html>
+"""
+
+
+async def measure_profile(playwright_instance, name: str, urls: list[str], offline: bool) -> dict:
+    profile = BROWSER_PROFILES[name]
+    started = time.perf_counter()
+    browser = await launch_browser(playwright_instance, profile)
+    context = await new_crawl_context(browser, profile=profile)
+    page = await context.new_page()
+    startup_ms = (time.perf_counter() - started) * 1000
+
+    if offline:
+        async def fulfill(route):
+            await route.fulfill(status=200, content_type="text/html", body=SAMPLE_LISTING_HTML)
+
+        await context.route("**/*", fulfill)
+
+    latencies: list[float] = []
+    try:
+        for url in urls:
+            t0 = time.perf_counter()
+            await page.goto(url, wait_until="domcontentloaded")
+            await extract_listing_fields(page)
+            latencies.append((time.perf_counter() - t0) * 1000)
+    finally:
+        await browser.close()
+    return {
+        "profile": name,
+        "startup_ms": startup_ms,
+        "listing_p50_ms": statistics.median(latencies),
+        "listing_mean_ms": statistics.fmean(latencies),
+    }
+
+
+async def main(argv: list[str]) -> None:
+    """Compare startup and per-listing latency of the browser launch profiles."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("urls", nargs="*", help="Listing URLs to load (default: offline sample page)")
+    parser.add_argument("--repeat", type=int, default=20, help="Loads per URL in offline mode")
+    parser.add_argument("--profiles", default=",".join(BROWSER_PROFILES))
+    args = parser.parse_args(argv)
+
+    offline = not args.urls
+    urls = args.urls or [f"https://listing.test/MLV-{i}" for i in range(args.repeat)]
+
+    rows = []
+    async with Stealth().use_async(async_playwright()) as playwright_instance:
+        for name in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+            rows.append(await measure_profile(playwright_instance, name, urls, offline))
+
+    for row in rows:
+        console.print(
+            f"[bold]{row['profile']:<11}[/] startup={row['startup_ms']:.0f} ms "
+            f"listing p50={row['listing_p50_ms']:.0f} ms mean={row['listing_mean_ms']:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+# Ensure src is importable (so `scraper.*` imports work)
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from scraper.config import LOG_DIR  # noqa: E402
+from scraper.parser import reparse_snapshots  # noqa: E402
+
+
+def main(argv: list[str]) -> None:
+    """Re-parse saved HTML pages (default: failure snapshots in LOG_DIR) as JSON lines."""
+    targets = [Path(a) for a in argv] or [Path(LOG_DIR)]
+    paths: list[Path] = []
+    for target in targets:
+        if target.is_dir():
+            paths.extend(sorted(target.glob("failure_*.html*")))
+        else:
+            paths.append(target)
+
+    for path, fields in reparse_snapshots(paths).items():
+        print(json.dumps({"path": path, **fields}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
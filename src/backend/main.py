@@ -2,20 +2,25 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from backend.middlewares.metrics import record_request_metrics
 from backend.routers.auth import router as auth_router
 from backend.routers.listings import router as listings_router
+from backend.routers.metrics import router as metrics_router
 from backend.routers.users import router as users_router
-from db.session import init_db
+from db.session import dispose_async_engine, init_db
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
     yield
+    await dispose_async_engine()
 
 
 app = FastAPI(lifespan=lifespan)
+app.middleware("http")(record_request_metrics)
 
 app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(listings_router)
+app.include_router(metrics_router)
@@ -4,19 +4,19 @@ from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from backend.auth.security import decode_access_token
 from db.models import User
-from db.session import get_session
+from db.session import get_async_session
 
 
 _bearer = HTTPBearer(auto_error=False)
 
 
-def get_optional_user(
+async def get_optional_user(
     *,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
 ) -> Optional[User]:
     if credentials is None:
@@ -32,7 +32,7 @@ def get_optional_user(
     except ValueError:
         return None
 
-    return session.get(User, user_id)
+    return await session.get(User, user_id)
 
 
 def require_user(user: Optional[User] = Depends(get_optional_user)) -> User:
@@ -0,0 +1,27 @@
+"""Request latency metrics for the API."""
+from __future__ import annotations
+
+import time
+
+from fastapi import Request
+
+from utils.metrics import HTTP_REQUEST_SECONDS
+
+
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template ("/listing/{listing_id}"), not the raw path,
+        # so label cardinality stays bounded.
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
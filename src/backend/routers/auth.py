@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import Session, SQLModel, select
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from backend.auth.security import create_access_token, hash_password, verify_password
 from db.models import User, UserCreate, UserRead
-from db.session import get_session
+from db.session import get_async_session
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -23,31 +25,32 @@ class TokenResponse(SQLModel):
 
 
 @router.post("/signup", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def signup(*, session: Session = Depends(get_session), payload: UserCreate):
+async def signup(*, session: AsyncSession = Depends(get_async_session), payload: UserCreate):
     user = User(
         name=payload.name,
         email=payload.email,
-        password=hash_password(payload.password),
+        # PBKDF2 is CPU-bound; keep it off the event loop.
+        password=await run_in_threadpool(hash_password, payload.password),
     )
     session.add(user)
     try:
-        session.commit()
+        await session.commit()
     except IntegrityError:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="A user with this email already exists.",
         )
 
-    session.refresh(user)
+    await session.refresh(user)
     return user
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(*, session: Session = Depends(get_session), payload: LoginRequest):
+async def login(*, session: AsyncSession = Depends(get_async_session), payload: LoginRequest):
     statement = select(User).where(User.email == payload.email)
-    user = session.exec(statement).first()
-    if not user or not verify_password(payload.password, user.password):
+    user = (await session.exec(statement)).first()
+    if not user or not await run_in_threadpool(verify_password, payload.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -1,103 +1,106 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from backend.auth.security import hash_password
 from backend.middlewares.logged_in import require_user
 from db.models import User, UserCreate, UserRead, UserUpdate
-from db.session import get_session
+from db.session import get_async_session
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.post("", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def create_user(*, session: Session = Depends(get_session), payload: UserCreate):
+async def create_user(*, session: AsyncSession = Depends(get_async_session), payload: UserCreate):
     user = User(
         name=payload.name,
         email=payload.email,
-        password=hash_password(payload.password),
+        # PBKDF2 is CPU-bound; keep it off the event loop.
+        password=await run_in_threadpool(hash_password, payload.password),
     )
 
     session.add(user)
     try:
-        session.commit()
+        await session.commit()
     except IntegrityError:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="A user with this email already exists.",
         )
 
-    session.refresh(user)
+    await session.refresh(user)
     return user
 
 
 @router.get("", response_model=list[UserRead])
-def list_users(
+async def list_users(
     *,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     _current_user: User = Depends(require_user),
     skip: int = 0,
     limit: int = 100,
 ):
     statement = select(User).offset(skip).limit(limit)
-    return list(session.exec(statement).all())
+    return list((await session.exec(statement)).all())
 
 
 @router.get("/{user_id}", response_model=UserRead)
-def get_user(*, session: Session = Depends(get_session), user_id: int):
-    user = session.get(User, user_id)
+async def get_user(*, session: AsyncSession = Depends(get_async_session), user_id: int):
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
 @router.patch("/{user_id}", response_model=UserRead)
-def update_user(
+async def update_user(
     *,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     _current_user: User = Depends(require_user),
     user_id: int,
     payload: UserUpdate,
 ):
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     updates = payload.model_dump(exclude_unset=True)
     if "password" in updates and updates["password"]:
-        updates["password"] = hash_password(updates["password"])
+        updates["password"] = await run_in_threadpool(hash_password, updates["password"])
     for key, value in updates.items():
         setattr(user, key, value)
 
     session.add(user)
     try:
-        session.commit()
+        await session.commit()
     except IntegrityError:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="A user with this email already exists.",
         )
 
-    session.refresh(user)
+    await session.refresh(user)
     return user
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(
+async def delete_user(
     *,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     _current_user: User = Depends(require_user),
     user_id: int,
 ):
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    session.delete(user)
-    session.commit()
+    await session.delete(user)
+    await session.commit()
     return None
 
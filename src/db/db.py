@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import logging
+
 from sqlalchemy.exc import SQLAlchemyError
 
 from db.session import drop_and_recreate_db, get_engine, init_db
-from utils.console import console
+
+log = logging.getLogger(__name__)
 
 
 class Database:
@@ -14,7 +17,7 @@ class Database:
     @staticmethod
     def initialize_fresh() -> None:
         drop_and_recreate_db()
-        console.print("[green]Database initialized:[/] Tables recreated")
+        log.info("Database initialized: tables recreated")
 
     @staticmethod
     def execute_query(sql: str, params=None):
@@ -31,6 +34,5 @@ class Database:
                 except Exception:
                     return []
         except SQLAlchemyError as exc:
-            console.print("[red]Database query failed[/]", {"sql": sql, "params": params})
-            console.print("[red]Error:[/]", exc)
+            log.error("Database query failed: %s", exc, extra={"sql": sql, "params": params})
             raise
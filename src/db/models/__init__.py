@@ -1,9 +1,15 @@
+from .crawl_job import CrawlJob
+from .crawl_schedule import CrawlSchedule
 from .property import Listing
+from .listing_change import ListingChange
 from .listing_price import ListingPrice
 from .user import User, UserCreate, UserRead, UserUpdate
 
 __all__ = [
+    "CrawlJob",
+    "CrawlSchedule",
     "Listing",
+    "ListingChange",
     "ListingPrice",
     "User",
     "UserCreate",
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+JOB_KIND_RESULTS_PAGE = "results_page"
+JOB_KIND_LISTING = "listing"
+
+JOB_STATUS_PENDING = "pending"
+JOB_STATUS_IN_FLIGHT = "in_flight"
+JOB_STATUS_DONE = "done"
+JOB_STATUS_FAILED = "failed"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class CrawlJob(SQLModel, table=True):
+    """One unit of crawl work (a results page or a listing href) in the frontier."""
+
+    __tablename__ = "crawl_frontier"
+    __table_args__ = (
+        UniqueConstraint("kind", "url", name="uq_crawl_frontier_kind_url"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    kind: str = Field(index=True)
+    url: str
+    city_query: str = Field(index=True)
+    page_number: Optional[int] = Field(default=None)
+
+    status: str = Field(default=JOB_STATUS_PENDING, index=True)
+    attempts: int = Field(default=0)
+    last_error: Optional[str] = Field(default=None)
+    # Search-card fingerprint seen when a listing job was queued (worker mode
+    # hands it to the visit so change detection can settle).
+    card_hash: Optional[str] = Field(default=None)
+
+    # Distributed workers (scraper.work_queue): who holds the job and until when.
+    lease_owner: Optional[str] = Field(default=None)
+    lease_expires_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True, index=True)
+    )
+
+    created_at: datetime = Field(
+        default_factory=_utcnow, sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
+    updated_at: datetime = Field(
+        default_factory=_utcnow, sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
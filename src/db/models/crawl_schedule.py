@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime
+from sqlmodel import Field, SQLModel
+
+
+class CrawlSchedule(SQLModel, table=True):
+    """When each city was last crawled, so the scheduler can honor freshness deadlines."""
+
+    __tablename__ = "crawl_schedule"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    city_query: str = Field(index=True, unique=True)
+
+    last_started_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+    last_finished_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
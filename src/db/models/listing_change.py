@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import Column
+from sqlalchemy.types import JSON
+from sqlmodel import Field, SQLModel
+
+
+class ListingChange(SQLModel, table=True):
+    """One row per listing update: the changed columns and their previous values."""
+
+    __tablename__ = "listing_changes"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    listing_id: int = Field(foreign_key="listings.id", index=True)
+    mercadolibre_listing_id: str = Field(index=True)
+
+    changed_at: datetime = Field(default_factory=datetime.utcnow)
+
+    # {column: previous value}; the current value is on the listing row.
+    changes: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 from typing import Optional
 
 from sqlalchemy import Column, String
@@ -8,7 +9,8 @@ from sqlalchemy.exc import IntegrityError
 from sqlmodel import Field, Session, SQLModel, select
 
 from db.session import get_engine
-from utils.console import console
+
+log = logging.getLogger(__name__)
 
 
 class Listing(SQLModel, table=True):
@@ -37,6 +39,10 @@ class Listing(SQLModel, table=True):
 
     images: list[str] = Field(default_factory=list, sa_column=Column(JSON))
 
+    # Change detection (see scraper.fingerprint): search-card and detail-content hashes.
+    card_hash: Optional[str] = Field(default=None)
+    content_hash: Optional[str] = Field(default=None)
+
     def save(self) -> None:
         """Inserts the current property object into the database."""
         try:
@@ -44,13 +50,11 @@ class Listing(SQLModel, table=True):
                 session.add(self)
                 session.commit()
                 session.refresh(self)
-            console.print(f"[green]Listing saved:[/] '{self.title}'")
+            log.info("Listing saved: %r", self.title)
         except IntegrityError:
-            console.print(
-                f"[yellow]Listing already exists:[/] {self.mercadolibre_listing_id}"
-            )
+            log.info("Listing already exists: %s", self.mercadolibre_listing_id)
         except Exception:
-            console.print(f"[red]Failed to save listing[/] {self.mercadolibre_listing_id}")
+            log.exception("Failed to save listing %s", self.mercadolibre_listing_id)
             raise
 
     @staticmethod
@@ -60,5 +64,5 @@ class Listing(SQLModel, table=True):
             with Session(get_engine()) as session:
                 return list(session.exec(select(Listing)).all())
         except Exception:
-            console.print("[red]Failed to fetch listings[/]")
+            log.exception("Failed to fetch listings")
             raise
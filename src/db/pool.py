@@ -0,0 +1,97 @@
+"""Connection pool settings and instrumentation.
+
+Both engines (sync and async) use a QueuePool subclass that reports every
+checkout to `utils.metrics`: how long the caller waited for a connection,
+overflow connections opened beyond `DB_POOL_SIZE`, and checkouts that
+timed out after `DB_POOL_TIMEOUT_SECONDS`.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import exc
+from sqlalchemy.engine import URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from scraper.config import (
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_STATEMENT_TIMEOUT_MS,
+)
+from utils.metrics import (
+    DB_POOL_CHECKOUTS,
+    DB_POOL_IN_USE,
+    DB_POOL_OVERFLOWS,
+    DB_POOL_TIMEOUTS,
+    DB_POOL_WAIT_SECONDS,
+)
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Pool configuration; defaults come from the DB_* settings in scraper.config."""
+
+    size: int = DB_POOL_SIZE
+    max_overflow: int = DB_MAX_OVERFLOW
+    timeout_seconds: int = DB_POOL_TIMEOUT_SECONDS
+    pre_ping: bool = DB_POOL_PRE_PING
+    recycle_seconds: int = DB_POOL_RECYCLE_SECONDS
+    statement_timeout_ms: int = DB_STATEMENT_TIMEOUT_MS
+
+    def engine_kwargs(self, url: URL, *, is_async: bool) -> dict:
+        """Keyword arguments for `create_engine` / `create_async_engine`."""
+        kwargs: dict = {"pool_pre_ping": self.pre_ping, "connect_args": {}}
+        backend = url.get_backend_name()
+        if backend == "sqlite":
+            if not is_async:
+                kwargs["connect_args"]["check_same_thread"] = False
+            if url.database in (None, "", ":memory:"):
+                # In-memory databases keep SQLAlchemy's single-connection pool.
+                return kwargs
+        elif backend == "postgresql" and self.statement_timeout_ms:
+            kwargs["connect_args"]["options"] = f"-c statement_timeout={self.statement_timeout_ms}"
+        kwargs.update(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=self.size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.timeout_seconds,
+            pool_recycle=self.recycle_seconds,
+        )
+        return kwargs
+
+
+class _InstrumentedMixin:
+    label = "sync"
+
+    def connect(self):
+        overflow_before = self._overflow
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc(pool=self.label)
+            raise
+        finally:
+            # Includes the pre-ping, i.e. the time until a usable connection.
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started, pool=self.label)
+        DB_POOL_CHECKOUTS.inc(pool=self.label)
+        DB_POOL_IN_USE.set(self.checkedout(), pool=self.label)
+        if self._overflow > max(0, overflow_before):
+            DB_POOL_OVERFLOWS.inc(pool=self.label)
+        return connection
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        DB_POOL_IN_USE.set(self.checkedout(), pool=self.label)
+
+
+class InstrumentedQueuePool(_InstrumentedMixin, QueuePool):
+    label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedMixin, AsyncAdaptedQueuePool):
+    label = "async"
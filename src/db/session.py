@@ -2,12 +2,18 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional
 
 from alembic import command
 from alembic.config import Config
 from dotenv import load_dotenv
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from db.pool import PoolSettings
 
 # Ensure DATABASE_URL from .env is available for CLI tools (Alembic) and app code.
 load_dotenv()
@@ -15,6 +21,20 @@ load_dotenv()
 _engine = None
 _engine_url: Optional[str] = None
 
+_async_engine: Optional[AsyncEngine] = None
+_async_engine_url: Optional[str] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+# The sync engine the async one was derived from; resetting `_engine` (tests,
+# a new DATABASE_URL) rebuilds both.
+_async_engine_source = None
+
+# Async drivers substituted for the sync URL's driver.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+psycopg",
+    "postgres": "postgresql+psycopg",
+}
+
 
 def _build_database_url() -> str:
     url = os.getenv("DATABASE_URL")
@@ -44,21 +64,89 @@ def _build_database_url() -> str:
 
 
 def get_engine():
+    """Process-wide sync engine, built once from DATABASE_URL and the DB_POOL_*
+    settings; `await reset_engine()` disposes it so the next call rebuilds it."""
     global _engine, _engine_url
 
-    url = _build_database_url()
-    if _engine is not None and _engine_url == url:
+    if _engine is not None:
         return _engine
 
-    connect_args = {}
-    if url.startswith("sqlite:"):
-        connect_args = {"check_same_thread": False}
-
-    _engine = create_engine(url, echo=False, connect_args=connect_args)
+    url = _build_database_url()
+    _engine = create_engine(url, echo=False, **PoolSettings().engine_kwargs(make_url(url), is_async=False))
     _engine_url = url
     return _engine
 
 
+def build_async_database_url(url: Optional[str] = None) -> str:
+    """Async flavor of the database URL (`ASYNC_DATABASE_URL` wins if set).
+
+    sqlite -> sqlite+aiosqlite, postgresql[+psycopg|psycopg2] -> postgresql+psycopg.
+    On Windows, psycopg's async mode needs a selector event loop, which
+    Playwright cannot use; set ASYNC_DATABASE_URL to e.g. postgresql+asyncpg://.
+    """
+    override = os.getenv("ASYNC_DATABASE_URL")
+    if override:
+        return override
+    parsed = make_url(url or _build_database_url())
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No async driver configured for {parsed.get_backend_name()!r}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _async_engine_url, _async_sessionmaker, _async_engine_source
+
+    engine = get_engine()
+    if _async_engine is not None and _async_engine_source is engine:
+        return _async_engine
+
+    url = build_async_database_url(_engine_url)
+    _async_engine = create_async_engine(
+        url, echo=False, **PoolSettings().engine_kwargs(make_url(url), is_async=True)
+    )
+    _async_engine_url = url
+    _async_engine_source = engine
+    _async_sessionmaker = async_sessionmaker(_async_engine, class_=AsyncSession, expire_on_commit=False)
+    return _async_engine
+
+
+def async_session() -> AsyncSession:
+    """New `AsyncSession` on the shared async engine (use as `async with`)."""
+    get_async_engine()
+    return _async_sessionmaker()
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections; they are bound to the running event loop."""
+    global _async_engine, _async_engine_url, _async_sessionmaker, _async_engine_source
+    if _async_engine is not None:
+        engine, _async_engine = _async_engine, None
+        _async_engine_url = None
+        _async_engine_source = None
+        _async_sessionmaker = None
+        await engine.dispose()
+
+
+async def reset_engine() -> None:
+    """Dispose and forget both cached engines; the next call re-reads DATABASE_URL."""
+    global _engine, _engine_url
+    await dispose_async_engine()
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+    _engine_url = None
+
+
+def dialect_insert(engine):
+    """Dialect-specific `insert` (supports ON CONFLICT) for Postgres and SQLite."""
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert
+    if engine.dialect.name == "sqlite":
+        return sqlite.insert
+    raise RuntimeError(f"Bulk upsert is not supported for dialect {engine.dialect.name!r}")
+
+
 def init_db() -> None:
     # Use Alembic migrations to manage schema.
     _run_migrations()
@@ -89,3 +177,9 @@ def _run_migrations() -> None:
 def get_session() -> Generator[Session, None, None]:
     with Session(get_engine()) as session:
         yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency: one `AsyncSession` per request."""
+    async with async_session() as session:
+        yield session
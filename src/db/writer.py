@@ -0,0 +1,426 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import bindparam, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from db.models import Listing, ListingChange, ListingPrice
+from db.session import async_session, dialect_insert, get_async_engine
+from scraper.config import (
+    LISTING_CHANGE_LOG,
+    WRITER_BATCH_SIZE,
+    WRITER_FLUSH_SECONDS,
+    WRITER_MAX_RETRIES,
+)
+from utils.metrics import DB_WRITE_SECONDS, LISTINGS_UPDATED, QUEUE_DEPTH
+from utils.timing import timings
+
+log = logging.getLogger(__name__)
+
+
+# Columns refreshed when a stored listing is scraped again. `price` is tracked
+# in listings_prices and city/state come from the crawl target, not the page.
+UPDATABLE_COLUMNS = (
+    "title",
+    "p_type",
+    "listing_type",
+    "description",
+    "area",
+    "rooms",
+    "bathrooms",
+    "latitude",
+    "longitude",
+    "images",
+    "card_hash",
+    "content_hash",
+)
+
+
+@dataclass
+class WriterStats:
+    listings_queued: int = 0
+    prices_queued: int = 0
+    listings_updated: int = 0
+    rows_dropped: int = 0
+    commits: int = 0
+
+
+def diff_listing(stored: dict, fresh: dict) -> dict:
+    """Return {column: new value} for updatable columns that changed.
+
+    Values missing from the fresh parse (None) never overwrite stored ones.
+    """
+    return {
+        column: fresh[column]
+        for column in UPDATABLE_COLUMNS
+        if fresh.get(column) is not None and fresh[column] != stored.get(column)
+    }
+
+
+async def _update_changed_listings(
+    session: AsyncSession, listings: list[dict], *, change_log: bool
+) -> tuple[set[str], int]:
+    """Diff `listings` against their stored rows and UPDATE only changed columns.
+
+    Rows changing the same set of columns share one executemany UPDATE.
+    Returns the mercadolibre ids already stored and the number of rows updated.
+    """
+    by_mlvid = {row["mercadolibre_listing_id"]: row for row in listings}
+    columns = [getattr(Listing, c) for c in ("id", "mercadolibre_listing_id", *UPDATABLE_COLUMNS)]
+    stored_rows = (
+        await session.exec(select(*columns).where(Listing.mercadolibre_listing_id.in_(list(by_mlvid))))
+    ).all()
+
+    groups: dict[tuple[str, ...], list[dict]] = {}
+    change_rows: list[dict] = []
+    for stored in stored_rows:
+        stored = stored._asdict()
+        changes = diff_listing(stored, by_mlvid[stored["mercadolibre_listing_id"]])
+        if not changes:
+            continue
+        groups.setdefault(tuple(sorted(changes)), []).append({"id": stored["id"], **changes})
+        if change_log:
+            change_rows.append(
+                ListingChange(
+                    listing_id=stored["id"],
+                    mercadolibre_listing_id=stored["mercadolibre_listing_id"],
+                    changes={c: stored[c] for c in changes},
+                ).model_dump(exclude={"id"})
+            )
+
+    for rows in groups.values():
+        # ORM bulk UPDATE by primary key: one executemany per column set.
+        await session.exec(update(Listing), params=rows)
+    if change_rows:
+        await session.exec(dialect_insert(session.get_bind())(ListingChange), params=change_rows)
+    stored_ids = {row.mercadolibre_listing_id for row in stored_rows}
+    return stored_ids, sum(len(rows) for rows in groups.values())
+
+
+async def write_batch(
+    listings: list[dict],
+    prices: dict[str, tuple[Optional[int], Optional[float]]],
+    *,
+    day: Optional[date] = None,
+    card_hashes: Optional[dict[str, str]] = None,
+    change_log: bool = LISTING_CHANGE_LOG,
+) -> int:
+    """Write one batch in a single transaction and return the number of
+    existing listings updated.
+
+    Listings already stored are diffed against the fresh rows and only the
+    changed `UPDATABLE_COLUMNS` are updated (`change_log` also records the
+    previous values in `listing_changes`); unchanged rows are not written.
+    New listings are inserted with ON CONFLICT DO NOTHING on the unique
+    `mercadolibre_listing_id`. Today's prices are inserted with ON CONFLICT
+    DO NOTHING on `uq_listings_prices_mlvid_day`, so the first price of the
+    day wins. `card_hashes` refreshes the search-card fingerprint of stored
+    listings whose detail content did not change (one executemany UPDATE).
+    """
+    if not listings and not prices and not card_hashes:
+        return 0
+    insert = dialect_insert(get_async_engine())
+    day = day or date.today()
+    updated = 0
+
+    async with async_session() as session:
+        stored_ids: set[str] = set()
+        if listings:
+            stored_ids, updated = await _update_changed_listings(session, listings, change_log=change_log)
+        new_listings = [row for row in listings if row["mercadolibre_listing_id"] not in stored_ids]
+        if new_listings:
+            # Still conflict-safe against rows inserted by a concurrent writer.
+            await session.exec(
+                insert(Listing).on_conflict_do_nothing(index_elements=["mercadolibre_listing_id"]),
+                params=new_listings,
+            )
+
+        missing_ids = [mlvid for mlvid, (listing_id, _) in prices.items() if listing_id is None]
+        resolved: dict[str, int] = {}
+        if missing_ids:
+            rows = (
+                await session.exec(
+                    select(Listing.mercadolibre_listing_id, Listing.id).where(
+                        Listing.mercadolibre_listing_id.in_(missing_ids)
+                    )
+                )
+            ).all()
+            resolved = {mlvid: listing_id for mlvid, listing_id in rows}
+
+        price_rows = []
+        for mlvid, (listing_id, price) in prices.items():
+            listing_id = listing_id if listing_id is not None else resolved.get(mlvid)
+            if listing_id is None:
+                # Can't create price history without a Listing record.
+                continue
+            price_rows.append(
+                ListingPrice(
+                    listing_id=listing_id,
+                    mercadolibre_listing_id=mlvid,
+                    day=day,
+                    price=price,
+                ).model_dump(exclude={"id"})
+            )
+        if price_rows:
+            await session.exec(
+                insert(ListingPrice).on_conflict_do_nothing(
+                    index_elements=["mercadolibre_listing_id", "day"]
+                ),
+                params=price_rows,
+            )
+        if card_hashes:
+            table = Listing.__table__
+            await session.exec(
+                update(table)
+                .where(table.c.mercadolibre_listing_id == bindparam("mlvid"))
+                .values(card_hash=bindparam("new_card_hash")),
+                params=[{"mlvid": mlvid, "new_card_hash": h} for mlvid, h in card_hashes.items()],
+            )
+        await session.commit()
+    return updated
+
+
+class ListingWriter:
+    """Async write-behind buffer for listings and daily prices.
+
+    Rows are flushed in one transaction when `batch_size` rows are pending or
+    `flush_seconds` have passed, whichever comes first, and on `close()`.
+    A failed batch is put back and retried up to `max_retries` times; then
+    (and on the final flush) it is split in halves until the listings that
+    still fail are isolated, and those are logged and dropped so the rest of
+    the batch is saved.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = WRITER_BATCH_SIZE,
+        flush_seconds: float = WRITER_FLUSH_SECONDS,
+        max_retries: int = WRITER_MAX_RETRIES,
+    ) -> None:
+        self.batch_size = max(1, int(batch_size))
+        self.flush_seconds = flush_seconds
+        self.max_retries = max(0, int(max_retries))
+        self._failed_flushes = 0
+        self.stats = WriterStats()
+        self._listings: dict[str, dict] = {}
+        self._prices: dict[str, tuple[Optional[int], Optional[float]]] = {}
+        self._card_hashes: dict[str, str] = {}
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._listings) + len(self._prices) + len(self._card_hashes)
+
+    def _ensure_started(self) -> None:
+        if self._task is None and not self._closed:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as exc:
+                log.error(
+                    "Listing writer flush failed: %s",
+                    exc,
+                    extra={"event": "writer_flush_failed", "attempts": self._failed_flushes},
+                )
+
+    async def add_listing(self, listing: Listing) -> None:
+        """Queue a listing (inserted, or diff-updated if stored) plus today's
+        price (taken from `listing.price`)."""
+        mlvid = listing.mercadolibre_listing_id
+        if not mlvid:
+            return
+        self._listings.setdefault(mlvid, listing.model_dump(exclude={"id"}))
+        self._prices.setdefault(mlvid, (None, listing.price))
+        self.stats.listings_queued += 1
+        self.stats.prices_queued += 1
+        self._after_add()
+
+    async def add_price(
+        self,
+        mercadolibre_id: str,
+        price: Optional[float],
+        *,
+        listing_id: Optional[int] = None,
+    ) -> None:
+        """Queue today's price for a listing that is (or will be) stored."""
+        if not mercadolibre_id:
+            return
+        self._prices.setdefault(mercadolibre_id, (listing_id, price))
+        self.stats.prices_queued += 1
+        self._after_add()
+
+    async def add_card_hash(self, mercadolibre_id: str, card_hash: str) -> None:
+        """Queue a search-card fingerprint refresh for a stored, unchanged listing."""
+        if not mercadolibre_id or not card_hash:
+            return
+        self._card_hashes[mercadolibre_id] = card_hash
+        self._after_add()
+
+    def _after_add(self) -> None:
+        QUEUE_DEPTH.set(self.pending, queue="writer")
+        self._ensure_started()
+        if self.pending >= self.batch_size:
+            self._wake.set()
+
+    async def _write(
+        self,
+        listings: dict[str, dict],
+        prices: dict[str, tuple[Optional[int], Optional[float]]],
+        card_hashes: dict[str, str],
+    ) -> None:
+        # Async engine: no worker thread is held while the batch is written.
+        started = time.perf_counter()
+        with timings.span("db.write_batch"):
+            updated = await write_batch(list(listings.values()), prices, card_hashes=card_hashes)
+        DB_WRITE_SECONDS.observe(time.perf_counter() - started)
+        if updated:
+            LISTINGS_UPDATED.inc(updated)
+            self.stats.listings_updated += updated
+        self.stats.commits += 1
+
+    async def _write_isolating_failures(
+        self,
+        mlvids: list[str],
+        listings: dict[str, dict],
+        prices: dict[str, tuple[Optional[int], Optional[float]]],
+        card_hashes: dict[str, str],
+    ) -> None:
+        """Write the rows of `mlvids`, bisecting on failure; rows of a listing
+        that fails on its own are logged and dropped."""
+        keys = set(mlvids)
+        part = (
+            {k: v for k, v in listings.items() if k in keys},
+            {k: v for k, v in prices.items() if k in keys},
+            {k: v for k, v in card_hashes.items() if k in keys},
+        )
+        try:
+            await self._write(*part)
+            return
+        except Exception:
+            if len(mlvids) > 1:
+                middle = len(mlvids) // 2
+                await self._write_isolating_failures(mlvids[:middle], listings, prices, card_hashes)
+                await self._write_isolating_failures(mlvids[middle:], listings, prices, card_hashes)
+                return
+            dropped = sum(len(rows) for rows in part)
+            self.stats.rows_dropped += dropped
+            log.exception(
+                "Dropping %d writer rows for listing %s",
+                dropped,
+                mlvids[0],
+                extra={
+                    "event": "writer_rows_dropped",
+                    "listing_id": mlvids[0],
+                    "rows": dropped,
+                    "listing": part[0].get(mlvids[0]),
+                    "price": part[1].get(mlvids[0]),
+                },
+            )
+
+    async def flush(self, *, final: bool = False) -> None:
+        async with self._lock:
+            if not self.pending:
+                return
+            listings = dict(self._listings)
+            prices = dict(self._prices)
+            card_hashes = dict(self._card_hashes)
+            self._listings.clear()
+            self._prices.clear()
+            self._card_hashes.clear()
+            try:
+                await self._write(listings, prices, card_hashes)
+                self._failed_flushes = 0
+            except Exception:
+                self._failed_flushes += 1
+                if not final and self._failed_flushes <= self.max_retries:
+                    # Keep the rows for the next attempt instead of dropping them.
+                    for mlvid, row in listings.items():
+                        self._listings.setdefault(mlvid, row)
+                    for mlvid, value in prices.items():
+                        self._prices.setdefault(mlvid, value)
+                    for mlvid, value in card_hashes.items():
+                        self._card_hashes.setdefault(mlvid, value)
+                    raise
+                log.warning(
+                    "Writer batch failed %d times; isolating failing rows",
+                    self._failed_flushes,
+                    extra={"event": "writer_batch_isolating", "attempts": self._failed_flushes},
+                )
+                self._failed_flushes = 0
+                mlvids = list(dict.fromkeys([*listings, *prices, *card_hashes]))
+                await self._write_isolating_failures(mlvids, listings, prices, card_hashes)
+            finally:
+                QUEUE_DEPTH.set(self.pending, queue="writer")
+
+    async def close(self) -> None:
+        """Stop the background flusher and write whatever is still buffered."""
+        self._closed = True
+        if self._task is not None:
+            # Wake the flusher so it writes the current batch and exits.
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush(final=True)
+
+    async def __aenter__(self) -> "ListingWriter":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+_writer: Optional[ListingWriter] = None
+
+
+def get_listing_writer() -> ListingWriter:
+    """Process-wide writer shared by every scraper worker."""
+    global _writer
+    if _writer is None:
+        _writer = ListingWriter()
+    return _writer
+
+
+async def close_listing_writer() -> None:
+    """Flush and close the shared writer. Never raises, so the rest of a
+    crawl's shutdown still runs; rows that could not be written are logged."""
+    global _writer
+    if _writer is not None:
+        writer, _writer = _writer, None
+        try:
+            await writer.close()
+        except Exception:
+            log.exception(
+                "Listing writer failed to close; %d buffered rows lost",
+                writer.pending,
+                extra={"event": "writer_close_failed", "rows": writer.pending},
+            )
+        log.info(
+            "Listing writer closed",
+            extra={
+                "event": "writer_summary",
+                "listings": writer.stats.listings_queued,
+                "prices": writer.stats.prices_queued,
+                "updated": writer.stats.listings_updated,
+                "dropped": writer.stats.rows_dropped,
+                "commits": writer.stats.commits,
+            },
+        )
@@ -1,10 +1,25 @@
+import argparse
 import asyncio
 from scraper.scraper import main
+from scraper.distributed import run_worker_node
+from scraper.scheduler import CrawlTarget, load_schedule_file, run_scheduler, targets_for_state
 from scraper.config import DEBUG_MODE
 from db.db import Database
 
-def bootstrap():
-    city = input("Enter the city name: ")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape MercadoLibre housing listings.")
+    parser.add_argument("cities", nargs="*", help='City queries, e.g. "Caracas, Distrito Capital"')
+    parser.add_argument("--state", action="append", default=[], help="Crawl every known city of a state (repeatable)")
+    parser.add_argument("--schedule", help='JSON file: [{"city" or "state", "priority", "every_hours"}, ...]')
+    parser.add_argument("--forever", action="store_true", help="Keep re-crawling targets as their freshness window expires")
+    parser.add_argument("--worker", action="store_true", help="Work the shared crawl queue; given cities/states are seeded into it")
+    parser.add_argument("--exit-when-idle", action="store_true", help="With --worker: stop once no jobs are pending or leased")
+    return parser.parse_args(argv)
+
+
+def bootstrap(argv=None):
+    args = parse_args(argv)
     # PostgreSQL: configure DATABASE_URL in your environment (e.g. .env)
     # Keeping DATABASE_NAME unset avoids accidental SQLite usage.
     
@@ -13,7 +28,25 @@ def bootstrap():
     else:
         # Ensure the database/table exists for non-debug runs
         Database.initialize_database()
-    asyncio.run(main(city))
+
+    if args.worker:
+        seed = list(args.cities)
+        for state in args.state:
+            seed.extend(target.city_query for target in targets_for_state(state))
+        asyncio.run(run_worker_node(seed, exit_when_idle=args.exit_when_idle))
+        return
+
+    if not (args.state or args.schedule or len(args.cities) > 1 or args.forever):
+        city = args.cities[0] if args.cities else input("Enter the city name: ")
+        asyncio.run(main(city))
+        return
+
+    targets = [CrawlTarget(city) for city in args.cities]
+    for state in args.state:
+        targets.extend(targets_for_state(state))
+    if args.schedule:
+        targets.extend(load_schedule_file(args.schedule))
+    asyncio.run(run_scheduler(targets, forever=args.forever))
 
 if __name__ == "__main__":
-    bootstrap()
\ No newline at end of file
+    bootstrap()
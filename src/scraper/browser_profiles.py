@@ -0,0 +1,74 @@
+"""Chromium launch profiles.
+
+- "debug": the original visible browser with `slow_mo=100`, for watching a
+  crawl locally.
+- "production": headless, no `slow_mo`, lean Chromium flags (no GPU, no
+  extensions, no background services, small caches) and a smaller viewport.
+
+`Stealth` and the `navigator.webdriver` init script apply to both profiles.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+LEAN_CHROMIUM_ARGS = (
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-first-run",
+    "--disk-cache-size=33554432",
+    "--media-cache-size=1",
+)
+
+
+@dataclass(frozen=True)
+class BrowserProfile:
+    name: str
+    headless: bool
+    slow_mo: float = 0
+    args: tuple[str, ...] = ()
+    viewport: Optional[dict] = None
+    extra_context_options: dict = field(default_factory=dict)
+
+    def launch_kwargs(self) -> dict:
+        kwargs: dict = {"headless": self.headless}
+        if self.slow_mo:
+            kwargs["slow_mo"] = self.slow_mo
+        if self.args:
+            kwargs["args"] = list(self.args)
+        return kwargs
+
+    def context_kwargs(self) -> dict:
+        kwargs = dict(self.extra_context_options)
+        if self.viewport:
+            kwargs["viewport"] = dict(self.viewport)
+        return kwargs
+
+
+BROWSER_PROFILES: dict[str, BrowserProfile] = {
+    "debug": BrowserProfile(name="debug", headless=False, slow_mo=100),
+    "production": BrowserProfile(
+        name="production",
+        headless=True,
+        args=LEAN_CHROMIUM_ARGS,
+        viewport={"width": 1024, "height": 768},
+        extra_context_options={"device_scale_factor": 1},
+    ),
+}
+
+
+def get_browser_profile(name: str) -> BrowserProfile:
+    profile = BROWSER_PROFILES.get((name or "").strip().lower())
+    if profile is None:
+        raise ValueError(
+            f"Unknown browser profile: {name!r} (expected one of {', '.join(BROWSER_PROFILES)})"
+        )
+    return profile
@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -25,16 +26,190 @@ def _get_bool_env(*names: str, default: bool = False) -> bool:
 			return default
 	return default
 
+
+def _get_int_env(name: str, default: int) -> int:
+	raw = os.getenv(name)
+	if raw is None or not raw.strip():
+		return default
+	try:
+		return int(raw)
+	except ValueError:
+		return default
+
+
+def _get_float_env(name: str, default: float) -> float:
+	raw = os.getenv(name)
+	if raw is None or not raw.strip():
+		return default
+	try:
+		return float(raw)
+	except ValueError:
+		return default
+
+
+def _get_list_env(name: str, default: list[str]) -> list[str]:
+	raw = os.getenv(name)
+	if raw is None:
+		return list(default)
+	return [item.strip() for item in raw.split(",") if item.strip()]
+
 MERCADOLIBRE_URL = os.getenv("MERCADOLIBRE_APARTAMENTOS_URL")
 DEBUG_MODE = _get_bool_env("DEBUG_MODE", "PWDEBUG", default=False)
 
 LOG_DIR = os.getenv("LOG_DIR", "logs")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Console log output: "json", "rich" or "auto" (Rich only when attached to a TTY).
+LOG_FORMAT = (os.getenv("LOG_FORMAT") or "auto").strip().lower()
+# JSON-lines log file, rotated at LOG_FILE_MAX_MB (empty disables it).
+LOG_FILE = os.getenv("LOG_FILE", os.path.join(LOG_DIR, "scraper.jsonl"))
+LOG_FILE_MAX_MB = max(1.0, _get_float_env("LOG_FILE_MAX_MB", 50.0))
+# Failure snapshots (gzip HTML + JPEG screenshot in LOG_DIR) are written by a
+# background queue. Only a FAILURE_SNAPSHOT_SAMPLE_RATE fraction of failures is
+# captured, at most FAILURE_SNAPSHOT_MAX_PER_SIGNATURE per distinct error, and
+# the oldest files are deleted past FAILURE_SNAPSHOT_MAX_MB.
+FAILURE_SNAPSHOT_SAMPLE_RATE = min(1.0, max(0.0, _get_float_env("FAILURE_SNAPSHOT_SAMPLE_RATE", 1.0)))
+FAILURE_SNAPSHOT_MAX_PER_SIGNATURE = max(0, _get_int_env("FAILURE_SNAPSHOT_MAX_PER_SIGNATURE", 3))
+FAILURE_SNAPSHOT_MAX_MB = max(0.0, _get_float_env("FAILURE_SNAPSHOT_MAX_MB", 200.0))
+# "viewport", "full" (full-page) or "off".
+FAILURE_SCREENSHOT = (os.getenv("FAILURE_SCREENSHOT") or "viewport").strip().lower()
+# Local Prometheus-style /metrics endpoint for the scraper process (0 disables).
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = max(0, _get_int_env("METRICS_PORT", 9108))
+# Optional path for a JSON export of the per-stage timing report (empty = print only).
+TIMINGS_EXPORT_PATH = os.getenv("TIMINGS_EXPORT_PATH", "")
+
+# Chromium launch profile (see scraper/browser_profiles.py): "production" is
+# headless with lean flags and no slow_mo; "debug" is the visible, slowed-down
+# browser. Defaults to "debug" when DEBUG_MODE is on.
+BROWSER_PROFILE = (os.getenv("BROWSER_PROFILE") or ("debug" if DEBUG_MODE else "production")).strip().lower()
+
+# Long crawls replace their browser context (carrying cookies/storage over)
+# after this many main-frame navigations or once a page's JS heap passes this
+# many MB, so Chromium memory stays bounded. 0 disables either trigger.
+CONTEXT_RECYCLE_NAVIGATIONS = max(0, _get_int_env("CONTEXT_RECYCLE_NAVIGATIONS", 200))
+CONTEXT_RECYCLE_MEMORY_MB = max(0.0, _get_float_env("CONTEXT_RECYCLE_MEMORY_MB", 512.0))
+
+# Concurrency: number of tabs scraping listing detail pages at once, and the
+# maximum number of in-flight requests against a single host (politeness).
+SCRAPER_CONCURRENCY = max(1, _get_int_env("SCRAPER_CONCURRENCY", 3))
+SCRAPER_PER_DOMAIN_CONCURRENCY = max(1, _get_int_env("SCRAPER_PER_DOMAIN_CONCURRENCY", 2))
+
+# Request interception: resource types / URL substrings aborted before they hit
+# the proxy. Gallery URLs are read from DOM attributes, so images can be blocked.
+BLOCK_RESOURCES = _get_bool_env("BLOCK_RESOURCES", default=True)
+BLOCKED_RESOURCE_TYPES = _get_list_env("BLOCKED_RESOURCE_TYPES", ["image", "media", "font"])
+BLOCKED_URL_PATTERNS = _get_list_env(
+	"BLOCKED_URL_PATTERNS",
+	[
+		"google-analytics.com",
+		"googletagmanager.com",
+		"doubleclick.net",
+		"connect.facebook.net",
+		"hotjar.com",
+		"maps.googleapis.com",
+		"/tracks",
+	],
+)
+
+# Per-run bandwidth budget in MB (0 disables). When exceeded, "stop" ends the
+# crawl; "pause" sleeps NETWORK_BUDGET_PAUSE_SECONDS and then opens a new window
+# of the same size.
+NETWORK_BUDGET_MB = max(0.0, _get_float_env("NETWORK_BUDGET_MB", 0.0))
+NETWORK_BUDGET_ACTION = (os.getenv("NETWORK_BUDGET_ACTION") or "stop").strip().lower()
+NETWORK_BUDGET_PAUSE_SECONDS = max(0.0, _get_float_env("NETWORK_BUDGET_PAUSE_SECONDS", 900.0))
+# How many of the costliest URLs the end-of-run network report lists.
+NETWORK_TOP_N = max(0, _get_int_env("NETWORK_TOP_N", 10))
+
+# Check result-page listing ids against the DB in one query and only open
+# detail pages for listings we have not stored yet.
+SKIP_KNOWN_LISTINGS = _get_bool_env("SKIP_KNOWN_LISTINGS", default=True)
+# Fingerprint search cards and detail content (scraper.fingerprint): known
+# listings whose card changed are re-visited, and a visit whose content hash
+# matches the stored one only records today's price.
+CHANGE_DETECTION_ENABLED = _get_bool_env("CHANGE_DETECTION_ENABLED", default=True)
+
+# Buffered listing writer (db.writer): a batch is flushed once WRITER_BATCH_SIZE
+# rows are pending or WRITER_FLUSH_SECONDS have passed.
+WRITER_BATCH_SIZE = max(1, _get_int_env("WRITER_BATCH_SIZE", 50))
+WRITER_FLUSH_SECONDS = max(0.1, _get_float_env("WRITER_FLUSH_SECONDS", 5.0))
+# Failed batches are kept and retried this many times; after that the batch is
+# split in halves to find the rows that keep failing, which are logged and dropped.
+WRITER_MAX_RETRIES = max(0, _get_int_env("WRITER_MAX_RETRIES", 3))
+# Record the previous value of every updated listing column in `listing_changes`.
+LISTING_CHANGE_LOG = _get_bool_env("LISTING_CHANGE_LOG", default=False)
+
+# Database connection pool (db.pool), shared by the sync and async engines.
+DB_POOL_SIZE = max(1, _get_int_env("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = max(0, _get_int_env("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT_SECONDS = max(1, _get_int_env("DB_POOL_TIMEOUT_SECONDS", 30))
+DB_POOL_PRE_PING = _get_bool_env("DB_POOL_PRE_PING", default=True)
+# Connections older than this are replaced on checkout (-1 disables).
+DB_POOL_RECYCLE_SECONDS = _get_int_env("DB_POOL_RECYCLE_SECONDS", 1800)
+# Server-side statement timeout (Postgres only; 0 disables).
+DB_STATEMENT_TIMEOUT_MS = max(0, _get_int_env("DB_STATEMENT_TIMEOUT_MS", 0))
+
+# Crawl pacing. Every navigation goes through a per-host adaptive token bucket:
+# REQUESTS_PER_MINUTE is the starting rate, it speeds up to RATE_LIMIT_MAX_RPM
+# while responses are healthy and backs off exponentially on 403/429/captcha/timeouts.
+REQUESTS_PER_MINUTE = max(0.1, _get_float_env("REQUESTS_PER_MINUTE", 6.0))
+RATE_LIMIT_MIN_RPM = max(0.1, _get_float_env("RATE_LIMIT_MIN_RPM", 1.0))
+RATE_LIMIT_MAX_RPM = max(REQUESTS_PER_MINUTE, _get_float_env("RATE_LIMIT_MAX_RPM", 20.0))
+RATE_LIMIT_JITTER = max(0.0, _get_float_env("RATE_LIMIT_JITTER", 0.3))
+RATE_LIMIT_MAX_BACKOFF_SECONDS = max(0.0, _get_float_env("RATE_LIMIT_MAX_BACKOFF_SECONDS", 600.0))
+CAPTCHA_URL_MARKERS = _get_list_env("CAPTCHA_URL_MARKERS", ["captcha", "account-verification"])
+# Multiplier for in-page "human" delays (scroll steps, typing). 0 disables them.
+HUMANIZE_DELAY_SCALE = max(0.0, _get_float_env("HUMANIZE_DELAY_SCALE", 1.0))
+# Page scrolling:
+# - "observer": one in-page script scrolls until all result cards are present or
+#   the DOM stays unchanged for SCROLL_IDLE_MS (MutationObserver); humanized
+#   step timing follows HUMANIZE_DELAY_SCALE
+# - "steps": legacy step-by-step scroll with a long sleep per step
+SCROLL_MODE = (os.getenv("SCROLL_MODE") or "observer").strip().lower()
+SCROLL_IDLE_MS = max(0, _get_int_env("SCROLL_IDLE_MS", 1500))
+SCROLL_TIMEOUT_SECONDS = max(1.0, _get_float_env("SCROLL_TIMEOUT_SECONDS", 30.0))
+
+# Listing detail pages are fetched over plain HTTP (pooled httpx client, HTTP/2
+# when `h2` is installed, cookies copied from the browser) and only rendered in
+# Chromium when the response is blocked or lacks the server-rendered markup.
+HTTP_FETCH_ENABLED = _get_bool_env("HTTP_FETCH_ENABLED", default=True)
+HTTP_FETCH_HTTP2 = _get_bool_env("HTTP_FETCH_HTTP2", default=True)
+HTTP_FETCH_TIMEOUT_SECONDS = max(1.0, _get_float_env("HTTP_FETCH_TIMEOUT_SECONDS", 20.0))
+HTTP_FETCH_MAX_CONNECTIONS = max(1, _get_int_env("HTTP_FETCH_MAX_CONNECTIONS", 10))
+
+# Results pagination:
+# - "url": build each results URL directly (`_Desde_<offset>`); no typing or clicks
+# - "searchbox": type the city into the search box and click "Next" (legacy)
+PAGINATION_MODE = (os.getenv("PAGINATION_MODE") or "url").strip().lower()
+# Base of the results URLs, e.g. https://inmuebles.mercadolibre.com.ve/apartamentos/venta
+SEARCH_BASE_URL = os.getenv("SEARCH_BASE_URL") or MERCADOLIBRE_URL or ""
+RESULTS_PER_PAGE = max(1, _get_int_env("RESULTS_PER_PAGE", 48))
+# Hard cap on results pages per city (0 = until the last page).
+MAX_RESULT_PAGES = max(0, _get_int_env("MAX_RESULT_PAGES", 0))
+
+# Durable crawl frontier (crawl_frontier table): interrupted city crawls resume
+# from the first unfinished results page and skip listings already done.
+FRONTIER_ENABLED = _get_bool_env("FRONTIER_ENABLED", default=True)
+FRONTIER_MAX_ATTEMPTS = max(1, _get_int_env("FRONTIER_MAX_ATTEMPTS", 3))
+
+# Multi-city scheduler: how many cities crawl at once (one browser context
+# each, sharing the browser, rate limiter and per-host cap) and how stale a
+# city may get before it is due again.
+SCHEDULER_CONCURRENCY = max(1, _get_int_env("SCHEDULER_CONCURRENCY", 2))
+SCHEDULER_DEFAULT_FRESHNESS_HOURS = max(0.0, _get_float_env("SCHEDULER_DEFAULT_FRESHNESS_HOURS", 24.0))
+
+# Distributed worker mode: nodes claim crawl_frontier jobs with
+# SELECT ... FOR UPDATE SKIP LOCKED and hold them under a lease that is renewed
+# by heartbeats; leases that expire (crashed node) are reclaimed by any worker.
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+WORK_QUEUE_LEASE_SECONDS = max(10.0, _get_float_env("WORK_QUEUE_LEASE_SECONDS", 300.0))
+WORK_QUEUE_POLL_SECONDS = max(0.1, _get_float_env("WORK_QUEUE_POLL_SECONDS", 10.0))
+WORK_QUEUE_BATCH_SIZE = max(1, _get_int_env("WORK_QUEUE_BATCH_SIZE", SCRAPER_CONCURRENCY))
 
 SEARCHBOX_HTML_ID = "cb1-edit"
 
 # Listing related constants
 LISTING_ITEM_HTML_CLASSNAME = "ui-search-layout__item"
+LISTING_CARD_PRICE_HTML_CLASSNAME = "andes-money-amount__fraction"
 LISTING_TITLE_HTML_CLASSNAME = "ui-pdp-title"
 LISTING_TYPE_HTML_CLASSNAME = "ui-pdp-subtitle" # Whether is "house" or "apartment"
 APARTMENT_OR_HOUSE_HTML_CLASSNAME = "ui-pdp-subtitle"
@@ -42,4 +217,13 @@ LISTING_DESCRIPTION_HTML_CLASSNAME = "ui-pdp-description__content"
 SPECS_CONTAINER_CLASSNAME = "ui-pdp-highlighted-specs-res"
 PRICE_META_PROPERTY = "price"
 NEXT_BUTTON_HTML_CLASSNAME = "andes-pagination__button--next"
-MAP_IMAGE = "ui-pdp-image"
\ No newline at end of file
+MAP_IMAGE = "ui-pdp-image"
+GALLERY_IMAGE_HTML_CLASSNAME = "ui-pdp-gallery__figure__image"
+
+# How listing detail fields are read from the page:
+# - "evaluate": one page.evaluate round trip returning every field (default)
+# - "html": one page.content() round trip, parsed by scraper.parser in a process pool
+# - "locators": one Playwright locator call per field (legacy)
+EXTRACTION_MODE = (os.getenv("EXTRACTION_MODE") or "evaluate").strip().lower()
+# Worker processes for offline HTML parsing; 0 parses in a thread instead.
+PARSER_PROCESSES = max(0, _get_int_env("PARSER_PROCESSES", 2))
@@ -0,0 +1,240 @@
+"""Worker mode: any number of nodes share one crawl through the work queue.
+
+Each node runs one browser and repeatedly claims a batch of jobs. A results
+page job queues the listings it links to plus the next results page; a listing
+job scrapes the detail page. Every node keeps its own rate limiter and proxy,
+so throughput grows with the number of nodes while each stays polite.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from playwright.async_api import BrowserContext, Page, async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from playwright_stealth import Stealth
+
+from db.models.crawl_job import JOB_KIND_RESULTS_PAGE
+from db.session import dispose_async_engine
+from db.writer import close_listing_writer
+from scraper.config import (
+    DEBUG_MODE,
+    FRONTIER_MAX_ATTEMPTS,
+    HTTP_FETCH_ENABLED,
+    LISTING_ITEM_HTML_CLASSNAME,
+    MAX_RESULT_PAGES,
+    NEXT_BUTTON_HTML_CLASSNAME,
+    RESULTS_PER_PAGE,
+    SCRAPER_CONCURRENCY,
+    SEARCH_BASE_URL,
+    WORK_QUEUE_BATCH_SIZE,
+    WORK_QUEUE_LEASE_SECONDS,
+    WORK_QUEUE_POLL_SECONDS,
+    WORKER_ID,
+)
+from scraper.fingerprint import CardFingerprint
+from scraper.parser import shutdown_parse_executor
+from scraper.pool import ListingWorkerPool
+from scraper.recycling import ContextRecycler
+from scraper.scraper import (
+    close_http_fetcher,
+    collect_listing_hrefs,
+    domain_limiter,
+    get_http_fetcher,
+    get_listing_information,
+    launch_browser,
+    load_card_fingerprint,
+    metrics_server,
+    new_context_recycler,
+    new_network_usage,
+    new_request_blocker,
+    paced_goto,
+    print_run_summary,
+    scrape_listing_over_http,
+    setup_logging,
+)
+from scraper.work_queue import ClaimedJob, LeaseHeartbeat, WorkQueue
+from utils.logging import flush_failure_snapshots, log_failure, shutdown_logging
+from utils.metrics import LISTINGS_FAILED, LISTINGS_SCRAPED, QUEUE_DEPTH
+from utils.network_usage import BandwidthBudgetExceeded, NetworkUsage
+from utils.scraper import build_search_url, get_elements_by_classname
+from utils.timing import timings
+
+log = logging.getLogger(__name__)
+
+
+def new_work_queue() -> WorkQueue:
+    return WorkQueue(
+        WORKER_ID,
+        lease_seconds=WORK_QUEUE_LEASE_SECONDS,
+        max_attempts=FRONTIER_MAX_ATTEMPTS,
+    )
+
+
+def seed_cities(queue: WorkQueue, cities: list[str]) -> None:
+    for city_query in cities:
+        queue.seed_city(
+            city_query,
+            build_search_url(SEARCH_BASE_URL, city_query, 1, results_per_page=RESULTS_PER_PAGE),
+        )
+
+
+async def process_results_page(page: Page, job: ClaimedJob, queue: WorkQueue) -> bool:
+    await paced_goto(page, job.url, wait_until="domcontentloaded")
+    try:
+        await page.wait_for_selector(f".{LISTING_ITEM_HTML_CLASSNAME}", timeout=15_000)
+    except PlaywrightTimeoutError:
+        log.info(
+            "No more pages for city %r",
+            job.city_query,
+            extra={"event": "city_exhausted", "page_number": job.page_number},
+        )
+        return True
+
+    card_state: dict[str, CardFingerprint] = {}
+    hrefs = await collect_listing_hrefs(page, card_state=card_state)
+    card_hashes = {href: card.card_hash for href, card in card_state.items()}
+    await asyncio.to_thread(queue.add_listings, job.city_query, hrefs, card_hashes)
+    log.info(
+        "Queued %d listings from results page %s",
+        len(hrefs),
+        job.page_number,
+        extra={"event": "listings_enqueued", "count": len(hrefs), "city_query": job.city_query},
+    )
+
+    page_number = job.page_number or 1
+    if MAX_RESULT_PAGES and page_number >= MAX_RESULT_PAGES:
+        return True
+    next_button = get_elements_by_classname(page, NEXT_BUTTON_HTML_CLASSNAME)
+    if await next_button.is_visible():
+        next_url = build_search_url(
+            SEARCH_BASE_URL, job.city_query, page_number + 1, results_per_page=RESULTS_PER_PAGE
+        )
+        await asyncio.to_thread(queue.add_results_page, job.city_query, page_number + 1, next_url)
+    return True
+
+
+async def process_listing(page: Page, job: ClaimedJob, *, net: NetworkUsage | None = None) -> bool:
+    card = await load_card_fingerprint(job.url, job.card_hash)
+    if HTTP_FETCH_ENABLED and await scrape_listing_over_http(
+        job.url, city_query=job.city_query, net=net, card=card
+    ):
+        LISTINGS_SCRAPED.inc(source="http")
+        return True
+    await paced_goto(page, job.url, charge=not HTTP_FETCH_ENABLED)
+    log.debug("Visiting listing", extra={"event": "listing_visit", "url": job.url})
+    if await get_listing_information(page, city_query=job.city_query, card=card) is None:
+        LISTINGS_FAILED.inc()
+        return False
+    LISTINGS_SCRAPED.inc(source="browser")
+    return True
+
+
+async def run_worker(
+    context: BrowserContext,
+    queue: WorkQueue,
+    *,
+    net: NetworkUsage | None = None,
+    exit_when_idle: bool = False,
+    recycler: ContextRecycler | None = None,
+) -> None:
+    """Claim and process jobs until the queue is drained (or forever)."""
+    async with LeaseHeartbeat(queue) as heartbeat:
+        while True:
+            # No job is leased between batches, so the context can be swapped here.
+            if recycler is not None and await recycler.maybe_recycle():
+                context = recycler.context
+            if net is not None:
+                await net.enforce_budget()
+            with timings.span("db.claim"):
+                jobs = await asyncio.to_thread(queue.claim, WORK_QUEUE_BATCH_SIZE)
+            QUEUE_DEPTH.set(len(jobs), queue="claimed_jobs")
+            if not jobs:
+                if exit_when_idle and not await asyncio.to_thread(queue.has_open_jobs):
+                    log.info("Work queue drained", extra={"event": "queue_drained", "worker_id": queue.worker_id})
+                    return
+                await asyncio.sleep(WORK_QUEUE_POLL_SECONDS)
+                continue
+
+            by_url = {job.url: job for job in jobs}
+            if HTTP_FETCH_ENABLED:
+                await get_http_fetcher(net).sync_from_context(context)
+            heartbeat.job_ids.update(job.id for job in jobs)
+            done: list[int] = []
+            failed: dict[int, str] = {}
+
+            async def handle(page: Page, url: str):
+                job = by_url[url]
+                ok = False
+                error = "no listing extracted"
+                try:
+                    if job.kind == JOB_KIND_RESULTS_PAGE:
+                        with timings.span("results_page"):
+                            ok = await process_results_page(page, job, queue)
+                    else:
+                        with timings.span("listing"):
+                            ok = await process_listing(page, job, net=net)
+                    return ok
+                except BandwidthBudgetExceeded:
+                    # Not the job's fault: it is released, not failed.
+                    error = None
+                    raise
+                except Exception as exc:
+                    error = repr(exc)
+                    await log_failure(page, url, exc, {"step": "run_worker", "kind": job.kind})
+                    if DEBUG_MODE:
+                        raise
+                    return None
+                finally:
+                    if ok:
+                        done.append(job.id)
+                    elif error is not None:
+                        failed[job.id] = error
+
+            pool = ListingWorkerPool(
+                context,
+                handle,
+                concurrency=SCRAPER_CONCURRENCY,
+                domain_limiter=domain_limiter,
+                stop_on=(BandwidthBudgetExceeded,),
+            )
+            try:
+                await pool.run(list(by_url))
+            finally:
+                await asyncio.to_thread(queue.complete, done)
+                await asyncio.to_thread(queue.fail, failed)
+                # Jobs never started (budget stop, cancellation) go back untouched.
+                await asyncio.to_thread(
+                    queue.release, [j.id for j in jobs if j.id not in failed and j.id not in done]
+                )
+                heartbeat.job_ids.difference_update(job.id for job in jobs)
+
+
+async def run_worker_node(seed: list[str], *, exit_when_idle: bool = False) -> None:
+    """Launch one browser, optionally seed cities, and work the shared queue."""
+    setup_logging()
+    queue = new_work_queue()
+    if seed:
+        await asyncio.to_thread(seed_cities, queue, seed)
+    async with metrics_server(), Stealth().use_async(async_playwright()) as playwright_instance:
+        log.info("Starting crawl worker %s", queue.worker_id)
+        browser = await launch_browser(playwright_instance)
+        net = new_network_usage()
+        blocker = new_request_blocker()
+        recycler = new_context_recycler(browser, net=net, blocker=blocker)
+        context = await recycler.start()
+        try:
+            await run_worker(context, queue, net=net, exit_when_idle=exit_when_idle, recycler=recycler)
+        except BandwidthBudgetExceeded as exc:
+            log.error("Stopping worker %s: %s", queue.worker_id, exc, extra={"event": "budget_exceeded"})
+        finally:
+            await net.drain()
+            await recycler.close()
+            await browser.close()
+            await close_listing_writer()
+            await dispose_async_engine()
+            await close_http_fetcher()
+            shutdown_parse_executor()
+            await flush_failure_snapshots()
+            print_run_summary(net, blocker)
+            shutdown_logging()
@@ -0,0 +1,60 @@
+"""Compact fingerprints used to skip work for listings that did not change.
+
+Two hashes are stored per listing:
+
+- `card_hash`: the search-result card (its text snippet and displayed
+  price). If it matches, the detail page is not visited at all.
+- `content_hash`: the normalized detail content (title, description, specs
+  and images). If a visit happens anyway and it matches, the listing row is
+  not rebuilt or rewritten; only today's price is recorded.
+
+Hashes are 128-bit BLAKE2b hex digests of whitespace-normalized text.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+_SEPARATOR = "\x1f"
+
+
+def normalize_text(value: Optional[str]) -> str:
+    return _WHITESPACE.sub(" ", value or "").strip().lower()
+
+
+def _digest(parts: Iterable[str]) -> str:
+    return hashlib.blake2b(_SEPARATOR.join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def card_fingerprint(card: dict) -> str:
+    """Hash of a search card: {"snippet", "price"} as returned by the cards script."""
+    return _digest([normalize_text(card.get("snippet")), normalize_text(card.get("price"))])
+
+
+def content_fingerprint(fields: dict) -> str:
+    """Hash of the raw detail fields that make up a listing (price excluded; it is tracked daily)."""
+    specs = [normalize_text(s) for s in fields.get("specs") or []]
+    images = sorted({(url or "").strip() for url in fields.get("images") or [] if url})
+    return _digest(
+        [
+            normalize_text(fields.get("title")),
+            normalize_text(fields.get("p_type")),
+            normalize_text(fields.get("description")),
+            _SEPARATOR.join(specs),
+            _SEPARATOR.join(images),
+            (fields.get("map_src") or "").strip(),
+        ]
+    )
+
+
+@dataclass(frozen=True)
+class CardFingerprint:
+    """What a results page knows about a listing before its detail page is visited."""
+
+    card_hash: str
+    listing_id: Optional[int] = None
+    # Stored content hash of an already-known listing (None for new listings).
+    content_hash: Optional[str] = None
@@ -0,0 +1,176 @@
+"""Durable crawl frontier: results pages and listing hrefs with their state.
+
+A crawl that dies halfway through a city resumes from the first results page
+that was not finished, and listings already scraped are not revisited. When a
+city finishes cleanly its frontier rows are cleared, so the next scheduled
+crawl starts from page one again.
+
+All methods are synchronous DB calls; run them with `asyncio.to_thread`.
+"""
+from __future__ import annotations
+
+import urllib.parse
+from datetime import datetime, timezone
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy import case, delete, func, update
+from sqlmodel import Session, select
+
+from db.models.crawl_job import (
+    JOB_KIND_LISTING,
+    JOB_KIND_RESULTS_PAGE,
+    JOB_STATUS_DONE,
+    JOB_STATUS_FAILED,
+    JOB_STATUS_IN_FLIGHT,
+    JOB_STATUS_PENDING,
+    CrawlJob,
+)
+from db.session import dialect_insert, get_engine
+
+
+def normalize_job_url(url: str) -> str:
+    """Drop tracking fragments (`#position=...`) so the same listing maps to one job."""
+    return urllib.parse.urldefrag(url or "")[0]
+
+
+class CrawlFrontier:
+    def __init__(self, *, max_attempts: int = 3) -> None:
+        self.max_attempts = max(1, int(max_attempts))
+
+    def _insert_pending(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        engine = get_engine()
+        insert = dialect_insert(engine)
+        with Session(engine) as session:
+            session.execute(
+                insert(CrawlJob).on_conflict_do_nothing(index_elements=["kind", "url"]),
+                [CrawlJob(**row).model_dump(exclude={"id"}) for row in rows],
+            )
+            session.commit()
+
+    def add_results_page(self, city_query: str, page_number: int, url: str) -> None:
+        self._insert_pending(
+            [
+                {
+                    "kind": JOB_KIND_RESULTS_PAGE,
+                    "url": normalize_job_url(url),
+                    "city_query": city_query,
+                    "page_number": page_number,
+                }
+            ]
+        )
+
+    def add_listings(
+        self,
+        city_query: str,
+        hrefs: Iterable[str],
+        card_hashes: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """Queue listing hrefs, with the search-card hash of each when known."""
+        card_hashes = card_hashes or {}
+        self._insert_pending(
+            [
+                {
+                    "kind": JOB_KIND_LISTING,
+                    "url": normalize_job_url(h),
+                    "city_query": city_query,
+                    "card_hash": card_hashes.get(h),
+                }
+                for h in dict.fromkeys(hrefs)
+                if h
+            ]
+        )
+
+    def _set_status(self, kind: str, urls: Iterable[str], status: str) -> None:
+        urls = {normalize_job_url(u) for u in urls if u}
+        if not urls:
+            return
+        with Session(get_engine()) as session:
+            session.execute(
+                update(CrawlJob)
+                .where(CrawlJob.kind == kind, CrawlJob.url.in_(urls))
+                .values(status=status, updated_at=datetime.now(timezone.utc))
+            )
+            session.commit()
+
+    def mark_in_flight(self, kind: str, url: str) -> None:
+        self._set_status(kind, [url], JOB_STATUS_IN_FLIGHT)
+
+    def mark_done(self, kind: str, urls: Iterable[str]) -> None:
+        self._set_status(kind, urls, JOB_STATUS_DONE)
+
+    def mark_failed(self, kind: str, errors: dict[str, str]) -> None:
+        """Count a failed attempt; jobs go back to pending until they run out of attempts."""
+        if not errors:
+            return
+        now = datetime.now(timezone.utc)
+        with Session(get_engine()) as session:
+            for url, error in errors.items():
+                session.execute(
+                    update(CrawlJob)
+                    .where(CrawlJob.kind == kind, CrawlJob.url == normalize_job_url(url))
+                    .values(
+                        attempts=CrawlJob.attempts + 1,
+                        status=case(
+                            (CrawlJob.attempts + 1 >= self.max_attempts, JOB_STATUS_FAILED),
+                            else_=JOB_STATUS_PENDING,
+                        ),
+                        last_error=(error or "")[:1000],
+                        updated_at=now,
+                    )
+                )
+            session.commit()
+
+    def finished_listing_urls(self, hrefs: Iterable[str]) -> set[str]:
+        """Subset of `hrefs` (normalized) that is done or permanently failed."""
+        urls = {normalize_job_url(h) for h in hrefs if h}
+        if not urls:
+            return set()
+        with Session(get_engine()) as session:
+            return set(
+                session.exec(
+                    select(CrawlJob.url).where(
+                        CrawlJob.kind == JOB_KIND_LISTING,
+                        CrawlJob.url.in_(urls),
+                        CrawlJob.status.in_([JOB_STATUS_DONE, JOB_STATUS_FAILED]),
+                    )
+                ).all()
+            )
+
+    def resume_page(self, city_query: str) -> int:
+        """First results page of an interrupted crawl for `city_query` (1 if none)."""
+        with Session(get_engine()) as session:
+            unfinished = session.exec(
+                select(func.min(CrawlJob.page_number)).where(
+                    CrawlJob.kind == JOB_KIND_RESULTS_PAGE,
+                    CrawlJob.city_query == city_query,
+                    CrawlJob.status != JOB_STATUS_DONE,
+                )
+            ).first()
+            if unfinished:
+                return int(unfinished)
+            last_done = session.exec(
+                select(func.max(CrawlJob.page_number)).where(
+                    CrawlJob.kind == JOB_KIND_RESULTS_PAGE,
+                    CrawlJob.city_query == city_query,
+                )
+            ).first()
+            return int(last_done) + 1 if last_done else 1
+
+    def reset_in_flight(self, city_query: str) -> int:
+        """Jobs left in flight by a crashed run become pending again."""
+        with Session(get_engine()) as session:
+            result = session.execute(
+                update(CrawlJob)
+                .where(CrawlJob.city_query == city_query, CrawlJob.status == JOB_STATUS_IN_FLIGHT)
+                .values(status=JOB_STATUS_PENDING, updated_at=datetime.now(timezone.utc))
+            )
+            session.commit()
+            return result.rowcount or 0
+
+    def clear(self, city_query: str) -> None:
+        """Forget a city's frontier once its crawl has completed."""
+        with Session(get_engine()) as session:
+            session.execute(delete(CrawlJob).where(CrawlJob.city_query == city_query))
+            session.commit()
@@ -0,0 +1,127 @@
+"""Plain-HTTP fetch path for listing detail pages.
+
+Price, title, specs and the static-map `src` are all in the server-rendered
+HTML, so detail pages are fetched with a pooled httpx client (HTTP/2 when the
+`h2` package is installed) and parsed with `scraper.parser`, which is driven by
+the selectors in `scraper.config`. The client carries the browser context's
+cookies and user agent. A response that is throttled, lands on a captcha page
+or lacks the listing markup returns None and the caller renders the page in
+the browser instead.
+"""
+from __future__ import annotations
+
+import importlib.util
+from typing import Optional
+
+import httpx
+from playwright.async_api import BrowserContext
+
+from scraper.config import CAPTCHA_URL_MARKERS, LISTING_TITLE_HTML_CLASSNAME
+from utils.metrics import PAGES_VISITED
+from utils.network_usage import NetworkUsage
+from utils.rate_limiter import THROTTLE_STATUSES, AdaptiveRateLimiter
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+DEFAULT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "es-VE,es;q=0.9,en;q=0.8",
+}
+
+
+def _headers_size(headers: httpx.Headers) -> int:
+    # "Name: value\r\n" per header; close to the HTTP/1.1 wire size.
+    return sum(len(name) + len(value) + 4 for name, value in headers.raw)
+
+
+class HttpListingFetcher:
+    def __init__(
+        self,
+        *,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        net: Optional[NetworkUsage] = None,
+        http2: bool = True,
+        timeout_seconds: float = 20.0,
+        max_connections: int = 10,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.rate_limiter = rate_limiter
+        self.net = net
+        self.client = httpx.AsyncClient(
+            http2=http2 and HTTP2_AVAILABLE,
+            timeout=timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            transport=transport,
+        )
+        self.fetched = 0
+        self.escalated = 0
+
+    async def sync_from_context(self, context: BrowserContext, *, user_agent: Optional[str] = None) -> None:
+        """Copy the browser session (cookies, user agent) into the HTTP client."""
+        for cookie in await context.cookies():
+            self.client.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+        if user_agent:
+            self.client.headers["User-Agent"] = user_agent
+
+    @staticmethod
+    def needs_browser(status: int, final_url: str, html: str) -> bool:
+        if status in THROTTLE_STATUSES or status >= 400:
+            return True
+        lowered = final_url.lower()
+        if any(marker in lowered for marker in CAPTCHA_URL_MARKERS):
+            return True
+        # Client-rendered or interstitial pages lack the detail-page markup.
+        return LISTING_TITLE_HTML_CLASSNAME not in html
+
+    async def fetch_listing_html(self, url: str) -> Optional[str]:
+        """Server-rendered HTML of a listing, or None when the browser should take over."""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(url)
+        try:
+            response = await self.client.get(url)
+        except httpx.TimeoutException:
+            PAGES_VISITED.inc(status="timeout")
+            if self.rate_limiter is not None:
+                self.rate_limiter.observe(url, timeout=True)
+            self.escalated += 1
+            return None
+        except httpx.HTTPError:
+            self.escalated += 1
+            return None
+
+        PAGES_VISITED.inc(status=f"{response.status_code // 100}xx")
+        if self.net is not None:
+            # Encoded (on-the-wire) body size; pre-loaded responses never stream.
+            body_size = response.num_bytes_downloaded or len(response.content)
+            self.net.add_bytes(
+                inbound=body_size + _headers_size(response.headers),
+                outbound=_headers_size(response.request.headers),
+                url=url,
+                resource_type="document",
+            )
+        final_url = str(response.url)
+        html = response.text
+        if self.rate_limiter is not None:
+            self.rate_limiter.observe(
+                url,
+                status=response.status_code,
+                captcha=any(m in final_url.lower() for m in CAPTCHA_URL_MARKERS),
+            )
+        if self.needs_browser(response.status_code, final_url, html):
+            self.escalated += 1
+            return None
+        self.fetched += 1
+        return html
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
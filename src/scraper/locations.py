@@ -0,0 +1,48 @@
+"""Venezuelan states and the cities crawled for each of them."""
+from __future__ import annotations
+
+from utils.strings import to_snake_case
+
+STATE_CITIES: dict[str, list[str]] = {
+    "Amazonas": ["Puerto Ayacucho"],
+    "Anzoátegui": ["Barcelona", "Puerto La Cruz", "Lechería", "El Tigre", "Anaco"],
+    "Apure": ["San Fernando de Apure"],
+    "Aragua": ["Maracay", "Turmero", "La Victoria", "Cagua"],
+    "Barinas": ["Barinas"],
+    "Bolívar": ["Ciudad Guayana", "Ciudad Bolívar"],
+    "Carabobo": ["Valencia", "Naguanagua", "San Diego", "Puerto Cabello", "Guacara"],
+    "Cojedes": ["San Carlos"],
+    "Delta Amacuro": ["Tucupita"],
+    "Distrito Capital": ["Caracas"],
+    "Falcón": ["Coro", "Punto Fijo"],
+    "Guárico": ["San Juan de los Morros", "Calabozo", "Valle de la Pascua"],
+    "La Guaira": ["La Guaira", "Catia La Mar"],
+    "Lara": ["Barquisimeto", "Cabudare", "Carora"],
+    "Mérida": ["Mérida", "El Vigía"],
+    "Miranda": ["Baruta", "Chacao", "El Hatillo", "Sucre", "Los Teques", "Guarenas", "Guatire"],
+    "Monagas": ["Maturín"],
+    "Nueva Esparta": ["Porlamar", "Pampatar", "La Asunción"],
+    "Portuguesa": ["Acarigua", "Araure", "Guanare"],
+    "Sucre": ["Cumaná", "Carúpano"],
+    "Táchira": ["San Cristóbal"],
+    "Trujillo": ["Valera", "Trujillo"],
+    "Yaracuy": ["San Felipe"],
+    "Zulia": ["Maracaibo", "Cabimas", "Ciudad Ojeda", "San Francisco"],
+}
+
+
+def find_state(state: str) -> str | None:
+    """Canonical state name, matching case- and accent-insensitively."""
+    wanted = to_snake_case(state or "")
+    for name in STATE_CITIES:
+        if to_snake_case(name) == wanted:
+            return name
+    return None
+
+
+def expand_state(state: str) -> list[str]:
+    """City queries ("City, State") for every known city in `state`."""
+    name = find_state(state)
+    if name is None:
+        raise ValueError(f"Unknown state: {state!r}")
+    return [f"{city}, {name}" for city in STATE_CITIES[name]]
@@ -0,0 +1,295 @@
+"""Browser-free parsing of MercadoLibre listing detail HTML.
+
+Everything here is pure Python (stdlib `html.parser`), so it can run in a
+process pool off the event loop, in tests without a browser, and over saved
+`failure_*.html` snapshots.
+"""
+import asyncio
+import gzip
+import re
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Iterable, Optional
+
+from scraper.config import (
+    APARTMENT_OR_HOUSE_HTML_CLASSNAME,
+    GALLERY_IMAGE_HTML_CLASSNAME,
+    LISTING_DESCRIPTION_HTML_CLASSNAME,
+    LISTING_TITLE_HTML_CLASSNAME,
+    LISTING_TYPE_HTML_CLASSNAME,
+    MAP_IMAGE,
+    PARSER_PROCESSES,
+    PRICE_META_PROPERTY,
+    SPECS_CONTAINER_CLASSNAME,
+)
+
+LISTING_FIELD_SELECTORS = {
+    "price": f'meta[itemprop="{PRICE_META_PROPERTY}"]',
+    "title": f".{LISTING_TITLE_HTML_CLASSNAME}",
+    "p_type": f".{APARTMENT_OR_HOUSE_HTML_CLASSNAME}",
+    "listing_type": f".{LISTING_TYPE_HTML_CLASSNAME}",
+    "description": f".{LISTING_DESCRIPTION_HTML_CLASSNAME}",
+    "specs": f".{SPECS_CONTAINER_CLASSNAME} .ui-pdp-label span",
+    "map": f".{MAP_IMAGE}",
+    "gallery": f".{GALLERY_IMAGE_HTML_CLASSNAME}",
+}
+
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+def dedupe_image_urls(urls: list[str]) -> list[str]:
+    """Drop empty/inline (`data:`) URLs and duplicates, keeping first-seen order."""
+    cleaned: list[str] = []
+    seen: set[str] = set()
+    for u in urls:
+        if not u or u.startswith("data:"):
+            continue
+        if u not in seen:
+            seen.add(u)
+            cleaned.append(u)
+    return cleaned
+
+
+def parse_specs(specs_texts: list[str]) -> tuple[str | None, str | None, str | None]:
+    """Parse (area, rooms, bathrooms) out of the highlighted specs labels."""
+    area = rooms = bathrooms = None
+    for text in specs_texts:
+        if "m²" in text:
+            match = re.search(r"(\d+)", text)
+            area = match.group(1) if match else None
+        elif "cuarto" in text:
+            rooms = text.split()[0]
+        elif "baños" in text:
+            bathrooms = text.split()[0]
+    return area, rooms, bathrooms
+
+
+def parse_price(price: str | None) -> float | None:
+    return float(price) if price else None
+
+
+def parse_card_price(text: str | None) -> float | None:
+    """Parse a search-card price fraction such as "85.000" (dots are thousands separators)."""
+    digits = re.sub(r"[^\d]", "", text or "")
+    return float(digits) if digits else None
+
+
+class Element:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: dict[str, str], parent: Optional["Element"]) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.children: list["Element | str"] = []
+        self.parent = parent
+
+    @property
+    def classes(self) -> set[str]:
+        return set((self.attrs.get("class") or "").split())
+
+    def get(self, name: str) -> Optional[str]:
+        return self.attrs.get(name)
+
+    def text_content(self) -> str:
+        parts: list[str] = []
+        stack: list["Element | str"] = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            else:
+                stack.extend(reversed(node.children))
+        return "".join(parts)
+
+    def iter(self) -> Iterable["Element"]:
+        stack: list[Element] = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed([c for c in node.children if isinstance(c, Element)]))
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document", {}, None)
+        self._stack: list[Element] = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        parent = self._stack[-1]
+        el = Element(tag, {k: (v if v is not None else "") for k, v in attrs}, parent)
+        parent.children.append(el)
+        if tag not in _VOID_TAGS:
+            self._stack.append(el)
+
+    def handle_startendtag(self, tag, attrs):
+        parent = self._stack[-1]
+        parent.children.append(Element(tag, {k: (v if v is not None else "") for k, v in attrs}, parent))
+
+    def handle_endtag(self, tag):
+        # Tolerate unclosed tags: pop back to the nearest matching open element.
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                return
+
+    def handle_data(self, data):
+        self._stack[-1].children.append(data)
+
+
+def parse_document(html: str) -> Element:
+    builder = _TreeBuilder()
+    builder.feed(html or "")
+    builder.close()
+    return builder.root
+
+
+_COMPOUND_RE = re.compile(
+    r"""(?P<tag>^[a-zA-Z][\w-]*)
+      | \.(?P<cls>[\w-]+)
+      | \#(?P<id>[\w-]+)
+      | \[(?P<attr>[\w-]+)(?:=["']?(?P<val>[^"'\]]*)["']?)?\]""",
+    re.VERBOSE,
+)
+
+
+def _parse_compound(token: str) -> list[tuple[str, str, Optional[str]]]:
+    parts: list[tuple[str, str, Optional[str]]] = []
+    pos = 0
+    while pos < len(token):
+        m = _COMPOUND_RE.match(token, pos)
+        if not m:
+            raise ValueError(f"Unsupported selector: {token!r}")
+        if m.group("tag"):
+            parts.append(("tag", m.group("tag").lower(), None))
+        elif m.group("cls"):
+            parts.append(("class", m.group("cls"), None))
+        elif m.group("id"):
+            parts.append(("attr", "id", m.group("id")))
+        else:
+            parts.append(("attr", m.group("attr"), m.group("val")))
+        pos = m.end()
+    return parts
+
+
+def _matches(el: Element, compound: list[tuple[str, str, Optional[str]]]) -> bool:
+    for kind, name, value in compound:
+        if kind == "tag":
+            if el.tag != name:
+                return False
+        elif kind == "class":
+            if name not in el.classes:
+                return False
+        else:
+            if name not in el.attrs:
+                return False
+            if value is not None and el.attrs[name] != value:
+                return False
+    return True
+
+
+def select(root: Element, selector: str) -> list[Element]:
+    """Minimal CSS selection: compound selectors joined by descendant combinators."""
+    compounds = [_parse_compound(tok) for tok in selector.split()]
+    if not compounds:
+        return []
+    *ancestors, last = compounds
+
+    found: list[Element] = []
+    for el in root.iter():
+        if el is root or not _matches(el, last):
+            continue
+        node = el.parent
+        remaining = list(ancestors)
+        while remaining and node is not None:
+            if _matches(node, remaining[-1]):
+                remaining.pop()
+            node = node.parent
+        if not remaining:
+            found.append(el)
+    return found
+
+
+def select_one(root: Element, selector: str) -> Optional[Element]:
+    matches = select(root, selector)
+    return matches[0] if matches else None
+
+
+def parse_listing_html(html: str) -> dict:
+    """Parse listing detail HTML into the same raw field dict as the live extractors."""
+    doc = parse_document(html)
+    sel = LISTING_FIELD_SELECTORS
+
+    def text(selector: str) -> Optional[str]:
+        el = select_one(doc, selector)
+        return el.text_content() if el is not None else None
+
+    def attr(selector: str, name: str) -> Optional[str]:
+        el = select_one(doc, selector)
+        return el.get(name) if el is not None else None
+
+    return {
+        "url": attr('link[rel="canonical"]', "href") or attr('meta[property="og:url"]', "content"),
+        "price": attr(sel["price"], "content"),
+        "title": text(sel["title"]),
+        "p_type": text(sel["p_type"]),
+        "listing_type": text(sel["listing_type"]),
+        "description": text(sel["description"]),
+        "specs": [el.text_content() for el in select(doc, sel["specs"])],
+        "map_src": attr(sel["map"], "src"),
+        "images": [
+            u
+            for u in (el.get("data-zoom") or el.get("src") or "" for el in select(doc, sel["gallery"]))
+            if u
+        ],
+    }
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_executor() -> Optional[ProcessPoolExecutor]:
+    """Shared process pool for HTML parsing; None means parse in a thread."""
+    global _executor
+    if PARSER_PROCESSES <= 0:
+        return None
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PARSER_PROCESSES)
+    return _executor
+
+
+def shutdown_parse_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def parse_listing_html_off_loop(html: str) -> dict:
+    """Parse in the process pool (or a thread when disabled) so the event loop stays free."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_parse_executor(), parse_listing_html, html)
+
+
+def read_snapshot(path: Path) -> str:
+    if path.suffix == ".gz":
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            return fh.read()
+    return path.read_text(encoding="utf-8")
+
+
+def reparse_snapshots(paths: Iterable[Path], *, processes: Optional[int] = None) -> dict[str, dict]:
+    """Re-parse saved HTML pages in bulk. Returns {path: fields}."""
+    paths = [Path(p) for p in paths]
+    htmls = [read_snapshot(p) for p in paths]
+    workers = PARSER_PROCESSES if processes is None else processes
+    if workers <= 0:
+        results = [parse_listing_html(h) for h in htmls]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_listing_html, htmls, chunksize=8))
+    return {str(p): r for p, r in zip(paths, results)}
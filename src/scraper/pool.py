@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import urllib.parse
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+from playwright.async_api import BrowserContext, Page
+
+from scraper.config import DEBUG_MODE
+from utils.metrics import QUEUE_DEPTH
+
+log = logging.getLogger(__name__)
+
+ListingWorker = Callable[[Page, str], Awaitable[Any]]
+
+
+class DomainLimiter:
+    """Caps the number of concurrent requests per host (politeness limit)."""
+
+    def __init__(self, per_domain_limit: int) -> None:
+        self.per_domain_limit = max(1, int(per_domain_limit))
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore_for(self, url: str) -> asyncio.Semaphore:
+        host = urllib.parse.urlparse(url).netloc.lower()
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self.per_domain_limit)
+            self._semaphores[host] = sem
+        return sem
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[None]:
+        async with self._semaphore_for(url):
+            yield
+
+
+class ListingWorkerPool:
+    """Bounded pool of N tabs consuming listing hrefs from an asyncio queue.
+
+    Each worker owns its own `Page` (tab) in the shared browser context, so the
+    results page is never navigated away from and no `go_back` is needed.
+    """
+
+    def __init__(
+        self,
+        context: BrowserContext,
+        worker: ListingWorker,
+        *,
+        concurrency: int,
+        domain_limiter: Optional[DomainLimiter] = None,
+        per_domain_limit: Optional[int] = None,
+        stop_on: tuple[type[BaseException], ...] = (),
+    ) -> None:
+        self.context = context
+        self.worker = worker
+        self.concurrency = max(1, int(concurrency))
+        if domain_limiter is None:
+            domain_limiter = DomainLimiter(per_domain_limit or self.concurrency)
+        self.domain_limiter = domain_limiter
+        # Exceptions that should stop the whole pool instead of one listing.
+        self.stop_on = stop_on
+
+    async def _run_worker(self, worker_id: int, queue: "asyncio.Queue[str]", results: dict) -> None:
+        page: Optional[Page] = None
+        try:
+            while True:
+                try:
+                    href = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                QUEUE_DEPTH.set(queue.qsize(), queue="listings")
+                try:
+                    if page is None:
+                        page = await self.context.new_page()
+                    async with self.domain_limiter.limit(href):
+                        results[href] = await self.worker(page, href)
+                except self.stop_on:
+                    raise
+                except Exception as exc:
+                    # The worker callable is responsible for logging failures;
+                    # never let one listing take down the whole pool.
+                    log.error(
+                        "Worker %d failed on %s: %s",
+                        worker_id,
+                        href,
+                        exc,
+                        extra={"event": "worker_failed", "url": href},
+                    )
+                    results[href] = None
+                    if DEBUG_MODE:
+                        raise
+                finally:
+                    queue.task_done()
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+
+    async def run(self, hrefs: Iterable[str]) -> list[Any]:
+        """Scrape every href and return results in input order."""
+        ordered = list(dict.fromkeys(h for h in hrefs if h))
+        if not ordered:
+            return []
+
+        queue: "asyncio.Queue[str]" = asyncio.Queue()
+        for href in ordered:
+            queue.put_nowait(href)
+
+        results: dict[str, Any] = {}
+        workers = [
+            asyncio.create_task(self._run_worker(i, queue, results))
+            for i in range(min(self.concurrency, len(ordered)))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                if not task.done():
+                    task.cancel()
+        return [results.get(href) for href in ordered]
@@ -0,0 +1,100 @@
+"""Replace long-lived browser contexts before Chromium memory runs away.
+
+A context is recycled after `max_navigations` main-frame navigations (across
+all its tabs) or once a page's JS heap passes `max_memory_mb`. The new context
+starts from the old one's `storage_state()` (cookies and local storage), so
+the crawl keeps its session. Callers check between work items (results pages
+or queue batches); the next item simply navigates in the new context.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Awaitable, Callable, Optional
+
+from playwright.async_api import BrowserContext, Page
+
+log = logging.getLogger(__name__)
+
+ContextFactory = Callable[..., Awaitable[BrowserContext]]
+
+JS_HEAP_SCRIPT = "() => (performance.memory ? performance.memory.usedJSHeapSize : 0)"
+
+
+class ContextRecycler:
+    def __init__(
+        self,
+        new_context: ContextFactory,
+        *,
+        max_navigations: int = 0,
+        max_memory_mb: float = 0,
+    ) -> None:
+        # `new_context(storage_state=...)` builds a fully configured context.
+        self._new_context = new_context
+        self.max_navigations = max(0, int(max_navigations))
+        self.max_memory_mb = max(0.0, float(max_memory_mb))
+        self.context: Optional[BrowserContext] = None
+        self.navigations = 0
+        self.recycles = 0
+
+    def _on_request(self, request) -> None:
+        try:
+            if request.is_navigation_request() and request.frame.parent_frame is None:
+                self.navigations += 1
+        except Exception:
+            # Counting is best-effort; never break a request over it.
+            pass
+
+    async def _open(self, storage_state: Optional[dict] = None) -> BrowserContext:
+        kwargs = {"storage_state": storage_state} if storage_state else {}
+        context = await self._new_context(**kwargs)
+        context.on("request", self._on_request)
+        self.context = context
+        self.navigations = 0
+        return context
+
+    async def start(self) -> BrowserContext:
+        if self.context is None:
+            await self._open()
+        return self.context
+
+    async def memory_mb(self, page: Page) -> float:
+        try:
+            used = await page.evaluate(JS_HEAP_SCRIPT)
+        except Exception:
+            return 0.0
+        return float(used or 0) / (1024 * 1024)
+
+    async def should_recycle(self, page: Optional[Page] = None) -> bool:
+        if self.max_navigations and self.navigations >= self.max_navigations:
+            return True
+        if self.max_memory_mb and page is not None:
+            return await self.memory_mb(page) >= self.max_memory_mb
+        return False
+
+    async def recycle(self) -> BrowserContext:
+        """Swap in a fresh context carrying over cookies and storage."""
+        old = self.context
+        state = await old.storage_state() if old is not None else None
+        navigations = self.navigations
+        await self._open(state)
+        if old is not None:
+            await old.close()
+        self.recycles += 1
+        log.info(
+            "Recycled browser context after %d navigations",
+            navigations,
+            extra={"event": "context_recycled", "navigations": navigations},
+        )
+        return self.context
+
+    async def maybe_recycle(self, page: Optional[Page] = None) -> bool:
+        """Recycle when a threshold is hit; True means `page` is gone and callers need a new one."""
+        if self.context is None or not await self.should_recycle(page):
+            return False
+        await self.recycle()
+        return True
+
+    async def close(self) -> None:
+        if self.context is not None:
+            context, self.context = self.context, None
+            await context.close()
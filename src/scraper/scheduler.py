@@ -0,0 +1,292 @@
+"""Crawl many cities (or whole states) with one browser.
+
+Each target has a priority and a freshness window. A target is due when it
+was never crawled or its last finished crawl is older than the window; due
+targets run highest priority first, then most overdue first. Up to
+`SCHEDULER_CONCURRENCY` cities crawl at once, each in its own browser
+context, while the rate limiter, per-host cap, listing writer and byte budget
+stay shared across all of them.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Optional
+
+from playwright.async_api import Browser, BrowserContext, async_playwright
+from playwright_stealth import Stealth
+from sqlmodel import Session, select
+
+from db.models import CrawlSchedule
+from db.session import dialect_insert, dispose_async_engine, get_engine
+from db.writer import close_listing_writer
+from scraper.config import (
+    DEBUG_MODE,
+    SCHEDULER_CONCURRENCY,
+    SCHEDULER_DEFAULT_FRESHNESS_HOURS,
+)
+from scraper.locations import expand_state
+from scraper.parser import shutdown_parse_executor
+from scraper.recycling import ContextRecycler
+from scraper.scraper import (
+    close_http_fetcher,
+    crawl_city,
+    launch_browser,
+    metrics_server,
+    new_context_recycler,
+    new_network_usage,
+    new_request_blocker,
+    print_run_summary,
+    setup_logging,
+)
+from utils.logging import flush_failure_snapshots, shutdown_logging
+from utils.network_usage import BandwidthBudgetExceeded, NetworkUsage
+from utils.request_blocking import RequestBlocker
+
+log = logging.getLogger(__name__)
+
+CityCrawler = Callable[[BrowserContext, str, ContextRecycler], Awaitable[None]]
+
+
+@dataclass
+class CrawlTarget:
+    city_query: str
+    priority: int = 0
+    freshness: timedelta = field(
+        default_factory=lambda: timedelta(hours=SCHEDULER_DEFAULT_FRESHNESS_HOURS)
+    )
+
+
+def targets_for_state(state: str, *, priority: int = 0, freshness: Optional[timedelta] = None) -> list[CrawlTarget]:
+    kwargs = {"freshness": freshness} if freshness is not None else {}
+    return [CrawlTarget(city, priority=priority, **kwargs) for city in expand_state(state)]
+
+
+def load_schedule_file(path: str | Path) -> list[CrawlTarget]:
+    """Targets from a JSON list of `{"city" | "state", "priority", "every_hours"}` objects."""
+    entries = json.loads(Path(path).read_text(encoding="utf-8"))
+    targets: list[CrawlTarget] = []
+    for entry in entries:
+        priority = int(entry.get("priority", 0))
+        freshness = None
+        if entry.get("every_hours") is not None:
+            freshness = timedelta(hours=float(entry["every_hours"]))
+        if entry.get("state"):
+            targets.extend(targets_for_state(entry["state"], priority=priority, freshness=freshness))
+        else:
+            kwargs = {"freshness": freshness} if freshness is not None else {}
+            targets.append(CrawlTarget(entry["city"], priority=priority, **kwargs))
+    return targets
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes even for timezone-aware columns.
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def load_last_finished(city_queries: Iterable[str]) -> dict[str, Optional[datetime]]:
+    city_queries = list(dict.fromkeys(city_queries))
+    if not city_queries:
+        return {}
+    with Session(get_engine()) as session:
+        rows = session.exec(
+            select(CrawlSchedule.city_query, CrawlSchedule.last_finished_at).where(
+                CrawlSchedule.city_query.in_(city_queries)
+            )
+        ).all()
+    return {city: _as_utc(finished) for city, finished in rows}
+
+
+def _record(city_query: str, **values: datetime) -> None:
+    engine = get_engine()
+    insert = dialect_insert(engine)
+    statement = insert(CrawlSchedule).values(city_query=city_query, **values)
+    with Session(engine) as session:
+        session.execute(
+            statement.on_conflict_do_update(index_elements=["city_query"], set_=values)
+        )
+        session.commit()
+
+
+def record_started(city_query: str, when: Optional[datetime] = None) -> None:
+    _record(city_query, last_started_at=when or datetime.now(timezone.utc))
+
+
+def record_finished(city_query: str, when: Optional[datetime] = None) -> None:
+    _record(city_query, last_finished_at=when or datetime.now(timezone.utc))
+
+
+def due_at(target: CrawlTarget, last_finished: Optional[datetime]) -> Optional[datetime]:
+    """When `target` becomes due (None = never crawled, due right away)."""
+    if last_finished is None:
+        return None
+    return last_finished + target.freshness
+
+
+def due_targets(
+    targets: Iterable[CrawlTarget],
+    last_finished: dict[str, Optional[datetime]],
+    now: datetime,
+) -> list[CrawlTarget]:
+    """Due targets, highest priority first, then most overdue first."""
+    due: list[tuple[int, datetime, CrawlTarget]] = []
+    seen: set[str] = set()
+    for target in targets:
+        if target.city_query in seen:
+            continue
+        seen.add(target.city_query)
+        when = due_at(target, last_finished.get(target.city_query))
+        if when is None:
+            when = datetime.min.replace(tzinfo=timezone.utc)
+        if when <= now:
+            due.append((target.priority, when, target))
+    due.sort(key=lambda item: (-item[0], item[1]))
+    return [target for _, _, target in due]
+
+
+def next_due_at(
+    targets: Iterable[CrawlTarget],
+    last_finished: dict[str, Optional[datetime]],
+) -> Optional[datetime]:
+    moments = [due_at(t, last_finished.get(t.city_query)) for t in targets]
+    if any(moment is None for moment in moments):
+        return datetime.now(timezone.utc)
+    return min(moments, default=None)
+
+
+class CrawlScheduler:
+    def __init__(
+        self,
+        browser: Browser,
+        targets: list[CrawlTarget],
+        *,
+        net: NetworkUsage,
+        blocker: Optional[RequestBlocker] = None,
+        concurrency: int = SCHEDULER_CONCURRENCY,
+        crawl: Optional[CityCrawler] = None,
+    ) -> None:
+        self.browser = browser
+        self.targets = targets
+        self.net = net
+        self.blocker = blocker
+        self.concurrency = max(1, int(concurrency))
+        self._crawl = crawl
+
+    async def _crawl_city(self, context: BrowserContext, city_query: str, recycler: ContextRecycler) -> None:
+        if self._crawl is not None:
+            await self._crawl(context, city_query, recycler)
+            return
+        await crawl_city(context, city_query, net=self.net, recycler=recycler)
+
+    def _new_recycler(self) -> ContextRecycler:
+        return new_context_recycler(self.browser, net=self.net, blocker=self.blocker)
+
+    async def _run_target(self, target: CrawlTarget) -> None:
+        log.info(
+            "Scheduler crawling %r (priority %s)",
+            target.city_query,
+            target.priority,
+            extra={"event": "scheduled_crawl", "city_query": target.city_query},
+        )
+        await asyncio.to_thread(record_started, target.city_query)
+        recycler = self._new_recycler()
+        context = await recycler.start()
+        try:
+            await self._crawl_city(context, target.city_query, recycler)
+        finally:
+            await recycler.close()
+        await asyncio.to_thread(record_finished, target.city_query)
+
+    async def run_once(self) -> int:
+        """Crawl every target that is due now; returns how many were crawled."""
+        last_finished = await asyncio.to_thread(
+            load_last_finished, [t.city_query for t in self.targets]
+        )
+        queue: asyncio.Queue[CrawlTarget] = asyncio.Queue()
+        for target in due_targets(self.targets, last_finished, datetime.now(timezone.utc)):
+            queue.put_nowait(target)
+        crawled = 0
+
+        async def worker() -> None:
+            nonlocal crawled
+            while True:
+                try:
+                    target = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    await self._run_target(target)
+                    crawled += 1
+                except BandwidthBudgetExceeded:
+                    raise
+                except Exception as exc:
+                    log.error(
+                        "Scheduled crawl failed for %r: %s",
+                        target.city_query,
+                        exc,
+                        extra={"event": "scheduled_crawl_failed", "city_query": target.city_query},
+                    )
+                    # Wait for the next window instead of retrying a broken city in a
+                    # tight loop; the frontier resumes it where it stopped.
+                    await asyncio.to_thread(record_finished, target.city_query)
+                    if DEBUG_MODE:
+                        raise
+
+        tasks = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, queue.qsize()))]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return crawled
+
+    async def run_forever(self) -> None:
+        """Keep crawling, sleeping until the next target's freshness window runs out."""
+        while True:
+            await self.run_once()
+            last_finished = await asyncio.to_thread(
+                load_last_finished, [t.city_query for t in self.targets]
+            )
+            when = next_due_at(self.targets, last_finished)
+            if when is None:
+                return
+            delay = (when - datetime.now(timezone.utc)).total_seconds()
+            if delay > 0:
+                log.info("Scheduler idle until %s", when.isoformat(timespec="seconds"))
+                await asyncio.sleep(delay)
+
+
+async def run_scheduler(targets: list[CrawlTarget], *, forever: bool = False) -> None:
+    """Launch one browser and crawl `targets` once (or keep them fresh with `forever`)."""
+    setup_logging()
+    async with metrics_server(), Stealth().use_async(async_playwright()) as playwright_instance:
+        log.info("Launching browser for %d scheduled cities", len(targets))
+        browser = await launch_browser(playwright_instance)
+        net = new_network_usage()
+        blocker = new_request_blocker()
+        scheduler = CrawlScheduler(browser, targets, net=net, blocker=blocker)
+        try:
+            if forever:
+                await scheduler.run_forever()
+            else:
+                await scheduler.run_once()
+        except BandwidthBudgetExceeded as exc:
+            log.error("Stopping scheduler: %s", exc, extra={"event": "budget_exceeded"})
+        finally:
+            await net.drain()
+            await browser.close()
+            await close_listing_writer()
+            await dispose_async_engine()
+            await close_http_fetcher()
+            shutdown_parse_executor()
+            await flush_failure_snapshots()
+            print_run_summary(net, blocker)
+            shutdown_logging()
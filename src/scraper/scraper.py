@@ -1,40 +1,227 @@
 import asyncio
+import contextlib
+import functools
+import logging
 import random
 import re
-from datetime import date
+import time
 
-from playwright.async_api import Page, async_playwright
+from playwright.async_api import BrowserContext, Page, async_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from playwright_stealth import Stealth
-from sqlmodel import Session, select
-from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
 
 from scraper.config import (
-    APARTMENT_OR_HOUSE_HTML_CLASSNAME,
+    BLOCKED_RESOURCE_TYPES,
+    BLOCKED_URL_PATTERNS,
+    BLOCK_RESOURCES,
+    BROWSER_PROFILE,
+    CAPTCHA_URL_MARKERS,
+    CHANGE_DETECTION_ENABLED,
+    CONTEXT_RECYCLE_MEMORY_MB,
+    CONTEXT_RECYCLE_NAVIGATIONS,
     DEBUG_MODE,
-    LISTING_DESCRIPTION_HTML_CLASSNAME,
+    EXTRACTION_MODE,
+    FAILURE_SCREENSHOT,
+    FAILURE_SNAPSHOT_MAX_MB,
+    FAILURE_SNAPSHOT_MAX_PER_SIGNATURE,
+    FAILURE_SNAPSHOT_SAMPLE_RATE,
+    FRONTIER_ENABLED,
+    FRONTIER_MAX_ATTEMPTS,
+    GALLERY_IMAGE_HTML_CLASSNAME,
+    HTTP_FETCH_ENABLED,
+    HTTP_FETCH_HTTP2,
+    HTTP_FETCH_MAX_CONNECTIONS,
+    HTTP_FETCH_TIMEOUT_SECONDS,
+    HUMANIZE_DELAY_SCALE,
+    LISTING_CARD_PRICE_HTML_CLASSNAME,
     LISTING_ITEM_HTML_CLASSNAME,
-    LISTING_TITLE_HTML_CLASSNAME,
-    LISTING_TYPE_HTML_CLASSNAME,
     LOG_DIR,
+    LOG_FILE,
+    LOG_FILE_MAX_MB,
+    LOG_FORMAT,
     LOG_LEVEL,
+    MAX_RESULT_PAGES,
     MERCADOLIBRE_URL,
+    METRICS_HOST,
+    METRICS_PORT,
+    NETWORK_BUDGET_ACTION,
+    NETWORK_BUDGET_MB,
+    NETWORK_BUDGET_PAUSE_SECONDS,
+    NETWORK_TOP_N,
     NEXT_BUTTON_HTML_CLASSNAME,
-    PRICE_META_PROPERTY,
+    PAGINATION_MODE,
+    RATE_LIMIT_JITTER,
+    RATE_LIMIT_MAX_BACKOFF_SECONDS,
+    RATE_LIMIT_MAX_RPM,
+    RATE_LIMIT_MIN_RPM,
+    REQUESTS_PER_MINUTE,
+    RESULTS_PER_PAGE,
+    SCRAPER_CONCURRENCY,
+    SCRAPER_PER_DOMAIN_CONCURRENCY,
+    SCROLL_IDLE_MS,
+    SCROLL_MODE,
+    SCROLL_TIMEOUT_SECONDS,
     SEARCHBOX_HTML_ID,
-    SPECS_CONTAINER_CLASSNAME,
-    MAP_IMAGE,
+    SEARCH_BASE_URL,
+    SKIP_KNOWN_LISTINGS,
+    TIMINGS_EXPORT_PATH,
 )
-from utils.logging import log_failure, setup_logger
-from utils.console import console
-from db.models import Listing, ListingPrice
-from db.session import get_engine
+from utils.logging import (
+    SnapshotPolicy,
+    flush_failure_snapshots,
+    log_failure,
+    setup_logger,
+    shutdown_logging,
+)
+from db.models import Listing
+from db.session import async_session, dispose_async_engine
+from db.writer import close_listing_writer, get_listing_writer
 from utils.scraper import (
+    build_search_url,
     get_element_by_id,
     get_elements_by_classname,
     scroll_like_human,
-    extract_coordinates_from_staticmap,
+    scroll_until_loaded,
+    parse_staticmap_center,
+)
+from utils.network_usage import BYTES_PER_MB, BandwidthBudgetExceeded, NetworkUsage
+from utils.rate_limiter import AdaptiveRateLimiter
+from utils.request_blocking import RequestBlocker
+from utils.metrics import (
+    LISTINGS_FAILED,
+    LISTINGS_SCRAPED,
+    LISTINGS_SKIPPED,
+    LISTINGS_UNCHANGED,
+    PAGES_VISITED,
+    MetricsServer,
+)
+from utils.timing import report_timings, timings
+from scraper.frontier import CrawlFrontier, normalize_job_url
+from scraper.pool import DomainLimiter, ListingWorkerPool
+from scraper.http_fetch import HttpListingFetcher
+from scraper.browser_profiles import BrowserProfile, get_browser_profile
+from scraper.recycling import ContextRecycler
+from scraper.fingerprint import CardFingerprint, card_fingerprint, content_fingerprint
+from scraper.locations import expand_state
+from db.models.crawl_job import JOB_KIND_LISTING, JOB_KIND_RESULTS_PAGE
+from scraper.parser import (
+    LISTING_FIELD_SELECTORS,
+    dedupe_image_urls,
+    parse_card_price,
+    parse_listing_html_off_loop,
+    parse_price,
+    parse_specs,
+    shutdown_parse_executor,
 )
-from utils.network_usage import NetworkUsage
+
+log = logging.getLogger(__name__)
+
+# Shared by every tab so a host's rate applies to the whole crawl.
+rate_limiter = AdaptiveRateLimiter(
+    REQUESTS_PER_MINUTE,
+    jitter=RATE_LIMIT_JITTER,
+    min_rpm=RATE_LIMIT_MIN_RPM,
+    max_rpm=RATE_LIMIT_MAX_RPM,
+    max_backoff_seconds=RATE_LIMIT_MAX_BACKOFF_SECONDS,
+)
+
+
+# Shared by every pool so concurrent cities still respect the per-host cap.
+domain_limiter = DomainLimiter(SCRAPER_PER_DOMAIN_CONCURRENCY)
+
+frontier = CrawlFrontier(max_attempts=FRONTIER_MAX_ATTEMPTS) if FRONTIER_ENABLED else None
+
+
+_http_fetcher: HttpListingFetcher | None = None
+
+
+def get_http_fetcher(net: NetworkUsage | None = None) -> HttpListingFetcher:
+    """Process-wide HTTP client for detail pages, paced by the shared rate limiter."""
+    global _http_fetcher
+    if _http_fetcher is None:
+        _http_fetcher = HttpListingFetcher(
+            rate_limiter=rate_limiter,
+            net=net,
+            http2=HTTP_FETCH_HTTP2,
+            timeout_seconds=HTTP_FETCH_TIMEOUT_SECONDS,
+            max_connections=HTTP_FETCH_MAX_CONNECTIONS,
+        )
+    return _http_fetcher
+
+
+async def close_http_fetcher() -> None:
+    global _http_fetcher
+    if _http_fetcher is not None:
+        fetcher, _http_fetcher = _http_fetcher, None
+        await fetcher.aclose()
+        log.info(
+            "HTTP fetcher closed",
+            extra={"event": "http_fetcher_summary", "fetched": fetcher.fetched, "escalated": fetcher.escalated},
+        )
+
+
+async def _db(stage: str, func, *args):
+    """Run a blocking DB call off the event loop, timed as `stage`."""
+    with timings.span(stage):
+        return await asyncio.to_thread(func, *args)
+
+
+def looks_like_captcha(url: str | None) -> bool:
+    lowered = (url or "").lower()
+    return any(marker in lowered for marker in CAPTCHA_URL_MARKERS)
+
+
+async def paced_goto(page: Page, url: str, *, charge: bool = True, **kwargs):
+    """Navigate through the shared rate limiter and report the outcome back to it.
+
+    `charge=False` is for the browser fallback of a listing whose HTTP fetch
+    already took this request's token: it only waits out any backoff.
+    """
+    with timings.span("rate_limit_wait"):
+        if charge:
+            await rate_limiter.acquire(url)
+        else:
+            await rate_limiter.wait_for_backoff(url)
+    try:
+        with timings.span("goto"):
+            response = await page.goto(url, **kwargs)
+    except PlaywrightTimeoutError:
+        _observe_navigation(page, url, None, timeout=True)
+        raise
+    _observe_navigation(page, url, response)
+    return response
+
+
+async def paced_click_navigation(page: Page, target) -> None:
+    """Click `target` (e.g. the Next button) as a paced navigation, like `paced_goto`."""
+    url = page.url
+    with timings.span("rate_limit_wait"):
+        await rate_limiter.acquire(url)
+    try:
+        with timings.span("goto"):
+            async with page.expect_navigation() as navigation:
+                await target.click()
+            response = await navigation.value
+    except PlaywrightTimeoutError:
+        _observe_navigation(page, url, None, timeout=True)
+        raise
+    _observe_navigation(page, url, response)
+
+
+def _observe_navigation(page: Page, url: str, response, *, timeout: bool = False) -> None:
+    """Count the navigation and feed its outcome (status, captcha, timeout) to the rate limiter."""
+    if timeout:
+        rate_limiter.observe(url, timeout=True)
+        PAGES_VISITED.inc(status="timeout")
+        return
+    PAGES_VISITED.inc(status=f"{response.status // 100}xx" if response else "none")
+    rate_limiter.observe(
+        url,
+        status=response.status if response else None,
+        captcha=looks_like_captcha(page.url),
+    )
+
 
 def extract_listing_id_from_url(url: str) -> str:
     match = re.search(r'/MLV-(\d+)', url)
@@ -56,7 +243,7 @@ async def extract_gallery_image_urls(page: Page) -> list[str]:
     Prefers `data-zoom` when present (often the largest), falls back to `src`.
     """
     try:
-        locator = page.locator(".ui-pdp-gallery__figure__image")
+        locator = page.locator(f".{GALLERY_IMAGE_HTML_CLASSNAME}")
         if await locator.count() == 0:
             return []
 
@@ -66,160 +253,339 @@ async def extract_gallery_image_urls(page: Page) -> list[str]:
                 .filter(Boolean)
             """
         )
-
-        cleaned: list[str] = []
-        seen: set[str] = set()
-        for u in urls:
-            if not u or u.startswith("data:"):
-                continue
-            if u not in seen:
-                seen.add(u)
-                cleaned.append(u)
-        return cleaned
+        return dedupe_image_urls(urls)
     except Exception:
         return []
 
 
-def _persist_listing_and_daily_price(*, listing: Listing | None, mercadolibre_id: str, price: float | None) -> None:
-    """Persist Listing (only if new) and today's ListingPrice (only if missing).
+# Reads every listing field in the page in one go. Returns raw strings only;
+# parsing (specs, coordinates, image dedupe) stays in Python.
+LISTING_FIELDS_SCRIPT = """
+(sel) => {
+    const first = (s) => document.querySelector(s);
+    const text = (s) => { const el = first(s); return el ? el.textContent : null; };
+    const attr = (s, name) => { const el = first(s); return el ? el.getAttribute(name) : null; };
+    return {
+        price: attr(sel.price, 'content'),
+        title: text(sel.title),
+        p_type: text(sel.p_type),
+        listing_type: text(sel.listing_type),
+        description: text(sel.description),
+        specs: Array.from(document.querySelectorAll(sel.specs)).map(e => e.textContent || ''),
+        map_src: attr(sel.map, 'src'),
+        images: Array.from(document.querySelectorAll(sel.gallery))
+            .map(e => e.getAttribute('data-zoom') || e.getAttribute('src') || '')
+            .filter(Boolean),
+    };
+}
+"""
 
-    - If the listing already exists, it is NOT updated.
-    - If today's price row already exists (by mercadolibre id + day), it is skipped.
-    """
 
-    if not mercadolibre_id:
-        return
+async def extract_listing_fields(page: Page) -> dict:
+    """Read all listing detail fields with a single `page.evaluate` round trip."""
+    fields = await page.evaluate(LISTING_FIELDS_SCRIPT, LISTING_FIELD_SELECTORS)
+    return fields or {}
 
-    with Session(get_engine()) as session:
-        existing_listing = session.exec(
-            select(Listing).where(Listing.mercadolibre_listing_id == mercadolibre_id)
-        ).first()
-
-        if existing_listing is None:
-            if listing is None:
-                # Can't create price history without a Listing record.
-                return
-            session.add(listing)
-            session.commit()
-            session.refresh(listing)
-            existing_listing = listing
-        else:
-            # Do not update existing listing
-            pass
-
-        today = date.today()
-        already_scanned = session.exec(
-            select(ListingPrice).where(
-                ListingPrice.mercadolibre_listing_id == mercadolibre_id,
-                ListingPrice.day == today,
+
+async def extract_listing_fields_with_locators(page: Page) -> dict:
+    """Legacy extraction: one Playwright call per field. Same shape as `extract_listing_fields`."""
+    price = await page.locator(LISTING_FIELD_SELECTORS["price"]).get_attribute("content")
+    title = await page.locator(LISTING_FIELD_SELECTORS["title"]).text_content()
+    type_ = await page.locator(LISTING_FIELD_SELECTORS["p_type"]).text_content()
+    listing_type = await page.locator(LISTING_FIELD_SELECTORS["listing_type"]).text_content()
+    desc_el = await page.query_selector(LISTING_FIELD_SELECTORS["description"])
+    description = await desc_el.text_content() if desc_el else None
+    specs_texts = await page.locator(LISTING_FIELD_SELECTORS["specs"]).all_text_contents()
+
+    map_src = None
+    map_img = page.locator(LISTING_FIELD_SELECTORS["map"]).first
+    if await map_img.count() > 0:
+        map_src = await map_img.get_attribute("src")
+
+    return {
+        "price": price,
+        "title": title,
+        "p_type": type_,
+        "listing_type": listing_type,
+        "description": description,
+        "specs": specs_texts,
+        "map_src": map_src,
+        "images": await extract_gallery_image_urls(page),
+    }
+
+
+def build_listing_from_fields(
+    fields: dict,
+    *,
+    mercadolibre_id: str,
+    city: str,
+    state: str | None,
+) -> Listing:
+    """Turn the raw field dict from an extractor into a `Listing`."""
+    area, rooms, bathrooms = parse_specs(fields.get("specs") or [])
+    # Optional coordinates from the static map image
+    lat, lon = parse_staticmap_center(fields.get("map_src"))
+
+    return Listing(
+        mercadolibre_listing_id=mercadolibre_id,
+        title=fields.get("title"),
+        state=state,
+        city=city,
+        p_type=fields.get("p_type"),
+        price=parse_price(fields.get("price")),
+        listing_type=fields.get("listing_type"),
+        description=fields.get("description"),
+        area=float(area) if area else None,
+        rooms=int(rooms) if rooms else None,
+        bathrooms=int(bathrooms) if bathrooms else None,
+        latitude=lat,
+        longitude=lon,
+        images=dedupe_image_urls(fields.get("images") or []),
+    )
+
+
+async def _fetch_known_listings(
+    mercadolibre_ids: list[str],
+) -> dict[str, tuple[int, str | None, str | None]]:
+    """Return {mercadolibre id: (listing id, card hash, content hash)} for ids
+    already stored, in one IN query."""
+    ids = sorted({i for i in mercadolibre_ids if i})
+    if not ids:
+        return {}
+    async with async_session() as session:
+        rows = (
+            await session.exec(
+                select(
+                    Listing.mercadolibre_listing_id,
+                    Listing.id,
+                    Listing.card_hash,
+                    Listing.content_hash,
+                ).where(Listing.mercadolibre_listing_id.in_(ids))
             )
-        ).first()
-        if already_scanned is not None:
-            return
-
-        price_row = ListingPrice(
-            listing_id=existing_listing.id,
-            mercadolibre_listing_id=mercadolibre_id,
-            day=today,
-            price=price,
+        ).all()
+        return {mlvid: (listing_id, card_hash, content_hash) for mlvid, listing_id, card_hash, content_hash in rows}
+
+
+# One round trip for every card on a results page: href, displayed price and
+# the card's text (fingerprinted for change detection).
+LISTING_CARDS_SCRIPT = """
+(sel) => Array.from(document.querySelectorAll(sel.item)).map(card => {
+    const link = card.querySelector('a');
+    const price = card.querySelector(sel.price);
+    return {
+        href: link ? link.getAttribute('href') : null,
+        price: price ? price.textContent : null,
+        snippet: card.textContent,
+    };
+})
+"""
+
+
+async def extract_listing_cards(page: Page) -> list[dict]:
+    """Return [{"href", "price", "snippet"}] for every listing card on a results page."""
+    with timings.span("extract_cards"):
+        cards = await page.evaluate(
+            LISTING_CARDS_SCRIPT,
+            {
+                "item": f".{LISTING_ITEM_HTML_CLASSNAME}",
+                "price": f".{LISTING_CARD_PRICE_HTML_CLASSNAME}",
+            },
         )
-        try:
-            session.add(price_row)
-            session.commit()
-        except IntegrityError:
-            # Another worker/thread inserted concurrently.
-            session.rollback()
+    return [c for c in cards or [] if c.get("href")]
 
 
-def _listing_exists_by_mlvid(mercadolibre_id: str) -> bool:
-    if not mercadolibre_id:
-        return False
-    with Session(get_engine()) as session:
-        existing = session.exec(
-            select(Listing.id).where(Listing.mercadolibre_listing_id == mercadolibre_id)
-        ).first()
-        return existing is not None
+async def select_hrefs_to_visit(
+    cards: list[dict],
+    *,
+    card_state: dict[str, CardFingerprint] | None = None,
+) -> list[str]:
+    """Record today's price for already-stored listings straight from the search
+    cards and return only the hrefs whose detail page still needs a visit.
+
+    With change detection on, a known listing is only skipped while its card
+    fingerprint matches the stored one (or none is stored yet, in which case
+    it is recorded). `card_state` is filled with the fingerprint of every href
+    returned, for the visit to compare the detail content against.
+    """
+    hrefs = [c["href"] for c in cards]
+    if not SKIP_KNOWN_LISTINGS:
+        return hrefs
+
+    card_ids = {c["href"]: extract_listing_id_from_url(c["href"]) for c in cards}
+    with timings.span("db.known_ids"):
+        known = await _fetch_known_listings(list(card_ids.values()))
+
+    prices: dict[str, tuple[int, float | None]] = {}
+    card_hashes: dict[str, str] = {}
+    changed = 0
+    to_visit: list[str] = []
+    for card in cards:
+        mlvid = card_ids[card["href"]]
+        price = parse_card_price(card.get("price"))
+        listing_id, stored_card_hash, stored_content_hash = known.get(mlvid, (None, None, None))
+        card_hash = card_fingerprint(card) if CHANGE_DETECTION_ENABLED else None
+        if listing_id is not None and price is not None:
+            if card_hash is None or stored_card_hash in (None, card_hash):
+                prices[mlvid] = (listing_id, price)
+                if card_hash is not None and stored_card_hash is None:
+                    card_hashes[mlvid] = card_hash
+                continue
+            changed += 1
+        to_visit.append(card["href"])
+        if card_state is not None and card_hash is not None:
+            card_state[card["href"]] = CardFingerprint(card_hash, listing_id, stored_content_hash)
+
+    writer = get_listing_writer()
+    for mlvid, card_hash in card_hashes.items():
+        await writer.add_card_hash(mlvid, card_hash)
+    if prices:
+        LISTINGS_SKIPPED.inc(len(prices))
+        for mlvid, (listing_id, price) in prices.items():
+            await writer.add_price(mlvid, price, listing_id=listing_id)
+        log.info(
+            "%d known listings skipped (queued prices from search cards)",
+            len(prices),
+            extra={"event": "known_listings_skipped", "count": len(prices)},
+        )
+    if changed:
+        log.info(
+            "%d known listings changed on their search card; revisiting",
+            changed,
+            extra={"event": "known_listings_changed", "count": changed},
+        )
+    return to_visit
+
+
+async def load_card_fingerprint(href: str, card_hash: str | None) -> CardFingerprint | None:
+    """Rebuild the `CardFingerprint` of a queued listing job from the card hash
+    stored with it and the listing's current stored row (worker mode)."""
+    if not CHANGE_DETECTION_ENABLED or card_hash is None:
+        return None
+    mlvid = extract_listing_id_from_url(href)
+    with timings.span("db.known_ids"):
+        known = await _fetch_known_listings([mlvid])
+    listing_id, _, content_hash = known.get(mlvid, (None, None, None))
+    return CardFingerprint(card_hash, listing_id, content_hash)
+
+
+async def queue_listing_fields(
+    fields: dict,
+    *,
+    mercadolibre_id: str,
+    city_query: str,
+    source: str,
+    card: CardFingerprint | None = None,
+) -> Listing:
+    """Hand extracted fields to the listing writer.
+
+    When the detail content hashes to the same value already stored for the
+    listing, only today's price (and the fresh card fingerprint) is queued and
+    the row is not rebuilt.
+    """
+    content_hash = content_fingerprint(fields) if CHANGE_DETECTION_ENABLED else None
+    writer = get_listing_writer()
+    if card is not None and content_hash is not None and card.content_hash == content_hash:
+        price = parse_price(fields.get("price"))
+        await writer.add_price(mercadolibre_id, price, listing_id=card.listing_id)
+        await writer.add_card_hash(mercadolibre_id, card.card_hash)
+        LISTINGS_UNCHANGED.inc()
+        log.info(
+            "Listing unchanged; queued today's price",
+            extra={
+                "event": "listing_unchanged",
+                "listing_id": mercadolibre_id,
+                "source": source,
+                "city_query": city_query,
+            },
+        )
+        return Listing(mercadolibre_listing_id=mercadolibre_id, price=price)
+
+    city, state = _split_city_state(city_query)
+    listing_obj = build_listing_from_fields(
+        fields,
+        mercadolibre_id=mercadolibre_id,
+        city=city,
+        state=state,
+    )
+    listing_obj.card_hash = card.card_hash if card is not None else None
+    listing_obj.content_hash = content_hash
+    # Buffered and written in batches by the listing writer. Stored listings
+    # are diffed and only their changed columns are updated.
+    await writer.add_listing(listing_obj)
+    log.info(
+        "Queued listing + today's price",
+        extra={
+            "event": "listing_queued",
+            "listing_id": mercadolibre_id,
+            "source": source,
+            "city_query": city_query,
+        },
+    )
+    return listing_obj
+
+
+async def scrape_listing_over_http(
+    href: str,
+    *,
+    city_query: str,
+    net: NetworkUsage | None = None,
+    card: CardFingerprint | None = None,
+) -> Listing | None:
+    """Scrape a listing without the browser; None means it needs a real render."""
+    with timings.span("http_fetch"):
+        html = await get_http_fetcher(net).fetch_listing_html(href)
+    if html is None:
+        return None
+    with timings.span("parse_html"):
+        fields = await parse_listing_html_off_loop(html)
+    return await queue_listing_fields(
+        fields,
+        mercadolibre_id=extract_listing_id_from_url(fields.get("url") or href)
+        or extract_listing_id_from_url(href),
+        city_query=city_query,
+        source="http",
+        card=card,
+    )
 
 
 # This function scrapes detailed information from a listing page
-async def get_listing_information(page: Page, *, city_query: str):
+async def get_listing_information(page: Page, *, city_query: str, card: CardFingerprint | None = None):
     try:
         mercadolibre_id = extract_listing_id_from_url(page.url)
-        city, state = _split_city_state(city_query)
         
         # before scrolling
-        console.print("[italic]Scrolling listings on page...[/]")
+        log.debug("Scrolling listing page", extra={"event": "scroll", "url": page.url})
         
-        await scroll_like_human(page, delay=random.uniform(1.0, 6.0), max_scrolls=4)
-
-        # Price is needed even when we skip listing updates.
-        price = await page.locator(
-            f'meta[itemprop="{PRICE_META_PROPERTY}"]'
-        ).get_attribute("content")
-        price_value = float(price) if price else None
-
-        # If listing already exists, do NOT update it; only persist today's price.
-        if await asyncio.to_thread(_listing_exists_by_mlvid, mercadolibre_id):
-            await asyncio.to_thread(
-                _persist_listing_and_daily_price,
-                listing=None,
-                mercadolibre_id=mercadolibre_id,
-                price=price_value,
+        if SCROLL_MODE == "steps":
+            await scroll_like_human(
+                page, delay=random.uniform(1.0, 6.0) * HUMANIZE_DELAY_SCALE, max_scrolls=4
+            )
+        else:
+            await scroll_until_loaded(
+                page,
+                humanize_scale=HUMANIZE_DELAY_SCALE,
+                idle_ms=SCROLL_IDLE_MS,
+                timeout_seconds=SCROLL_TIMEOUT_SECONDS,
+                max_steps=4,
             )
-            console.print(f"[yellow]Listing exists; skipped update[/] [bold]{mercadolibre_id}[/]")
-            return None
 
-        title = await page.locator(f".{LISTING_TITLE_HTML_CLASSNAME}").text_content()
-        type_ = await page.locator(f".{APARTMENT_OR_HOUSE_HTML_CLASSNAME}").text_content()
-        listing_type = await page.locator(f".{LISTING_TYPE_HTML_CLASSNAME}").text_content()
-        desc_el = await page.query_selector(f".{LISTING_DESCRIPTION_HTML_CLASSNAME}")
-        description = await desc_el.text_content() if desc_el else None
-
-        specs_texts = await page.locator(
-            f".{SPECS_CONTAINER_CLASSNAME} .ui-pdp-label span"
-        ).all_text_contents()
-        area = rooms = bathrooms = None
-        for text in specs_texts:
-            if "m²" in text:
-                match = re.search(r"(\d+)", text)
-                area = match.group(1) if match else None
-            elif "cuarto" in text:
-                rooms = text.split()[0]
-            elif "baños" in text:
-                bathrooms = text.split()[0]
-
-        # Extract optional coordinates from the static map image
-        lat, lon = await extract_coordinates_from_staticmap(page, MAP_IMAGE)
-
-        images = await extract_gallery_image_urls(page)
-
-        listing_obj = Listing(
-            mercadolibre_listing_id=mercadolibre_id,
-            title=title,
-            state=state,
-            city=city,
-            p_type=type_,
-            price=price_value,
-            listing_type=listing_type,
-            description=description,
-            area=float(area) if area else None,
-            rooms=int(rooms) if rooms else None,
-            bathrooms=int(bathrooms) if bathrooms else None,
-            latitude=lat,
-            longitude=lon,
-            images=images,
-        )
+        with timings.span("extract_fields"):
+            if EXTRACTION_MODE == "locators":
+                fields = await extract_listing_fields_with_locators(page)
+            elif EXTRACTION_MODE == "html":
+                # One page.content() round trip; parsing happens in the process pool.
+                fields = await parse_listing_html_off_loop(await page.content())
+            else:
+                # Every field in a single page.evaluate round trip.
+                fields = await extract_listing_fields(page)
 
-        # Run DB I/O off the event loop (important once running multiple agents)
-        await asyncio.to_thread(
-            _persist_listing_and_daily_price,
-            listing=listing_obj,
+        return await queue_listing_fields(
+            fields,
             mercadolibre_id=mercadolibre_id,
-            price=price_value,
+            city_query=city_query,
+            source="browser",
+            card=card,
         )
-        console.print(f"[green]Saved listing + today's price[/] [bold]{mercadolibre_id}[/]")
-        console.print(f"[green]Finished scraping listing[/] [bold]{mercadolibre_id}[/]")
-        return listing_obj
     except Exception as exc:
         await log_failure(
             page,
@@ -231,116 +597,441 @@ async def get_listing_information(page: Page, *, city_query: str):
             raise
         return None
 
-async def get_all_listings_information(page: Page, *, city_query: str):
-    await scroll_like_human(page, delay=random.uniform(1.0, 10.0), max_scrolls=40)
+async def collect_listing_hrefs(
+    page: Page,
+    *,
+    card_state: dict[str, CardFingerprint] | None = None,
+) -> list[str]:
+    """Scroll the current results page and return the listing hrefs worth visiting."""
+    if SCROLL_MODE == "steps":
+        await scroll_like_human(
+            page, delay=random.uniform(1.0, 10.0) * HUMANIZE_DELAY_SCALE, max_scrolls=40
+        )
+    else:
+        result = await scroll_until_loaded(
+            page,
+            item_selector=f".{LISTING_ITEM_HTML_CLASSNAME}",
+            expected_items=RESULTS_PER_PAGE,
+            humanize_scale=HUMANIZE_DELAY_SCALE,
+            idle_ms=SCROLL_IDLE_MS,
+            timeout_seconds=SCROLL_TIMEOUT_SECONDS,
+        )
+        log.debug("Scrolled results page", extra={"event": "results_scrolled", **result})
     await page.wait_for_selector(f".{LISTING_ITEM_HTML_CLASSNAME}")
-    listings = get_elements_by_classname(page, LISTING_ITEM_HTML_CLASSNAME)
-    hrefs = []
-    for listing in await listings.all():
-        href = await listing.locator("a").first.get_attribute("href")
-        if href:
-            hrefs.append(href)
-
-    # Pretty-print to console
-    console.print(f"[cyan]{len(hrefs)} listings found on current page[/]")
-    console.print(f"[cyan]Collected {len(hrefs)} listing hrefs[/]")
-
-    for href in hrefs:
-        await asyncio.sleep(random.uniform(3.0, 10.0))
-        navigated = False
+    cards = await extract_listing_cards(page)
+    log.info(
+        "%d listings found on current page", len(cards), extra={"event": "cards_found", "count": len(cards)}
+    )
+    return await select_hrefs_to_visit(cards, card_state=card_state)
+
+
+async def get_all_listings_information(
+    page: Page,
+    *,
+    city_query: str,
+    net: NetworkUsage | None = None,
+):
+    card_state: dict[str, CardFingerprint] = {}
+    hrefs = await collect_listing_hrefs(page, card_state=card_state)
+    if frontier is not None:
+        finished = await _db("db.frontier", frontier.finished_listing_urls, hrefs)
+        hrefs = [h for h in hrefs if normalize_job_url(h) not in finished]
+        await _db("db.frontier", frontier.add_listings, city_query, hrefs)
+    log.info(
+        "Collected %d listing hrefs to visit",
+        len(hrefs),
+        extra={"event": "hrefs_collected", "count": len(hrefs), "city_query": city_query},
+    )
+    if HTTP_FETCH_ENABLED and hrefs:
+        await get_http_fetcher(net).sync_from_context(
+            page.context, user_agent=await page.evaluate("navigator.userAgent")
+        )
+
+    done: list[str] = []
+    failed: dict[str, str] = {}
+
+    async def visit(listing_page: Page, href: str):
+        if net is not None:
+            await net.enforce_budget()
+        info = None
+        error = "no listing extracted"
+        started = time.perf_counter()
         try:
-            await page.goto(href)
-            navigated = True
-            console.print(f"[magenta]Visiting[/] {href}")
-            info = await get_listing_information(page, city_query=city_query)
+            if HTTP_FETCH_ENABLED:
+                info = await scrape_listing_over_http(
+                    href, city_query=city_query, net=net, card=card_state.get(href)
+                )
+                if info:
+                    LISTINGS_SCRAPED.inc(source="http")
+                    return info
+            await paced_goto(listing_page, href, charge=not HTTP_FETCH_ENABLED)
+            log.debug("Visiting listing", extra={"event": "listing_visit", "url": href})
+            info = await get_listing_information(
+                listing_page, city_query=city_query, card=card_state.get(href)
+            )
             if info:
-                console.print(f"[green]Finished scraping listing[/] {info.mercadolibre_listing_id} ({href})")
-                console.print(f"[green]Scraped listing[/] {info.mercadolibre_listing_id}")
+                LISTINGS_SCRAPED.inc(source="browser")
+            return info
         except Exception as exc:
-            await log_failure(page, href, exc, {"step": "get_all_listings_information"})
+            error = repr(exc)
+            await log_failure(listing_page, href, exc, {"step": "get_all_listings_information"})
             if DEBUG_MODE:
                 raise
+            return None
         finally:
-            delay = random.uniform(15.0, 20.0)
-            await asyncio.sleep(delay)
-            if navigated:
-                try:
-                    await page.go_back()
-                except Exception as back_exc:
-                    await log_failure(
-                        page,
-                        href,
-                        back_exc,
-                        {"step": "return_to_list", "listing_href": href},
-                    )
-                    if DEBUG_MODE:
-                        raise
+            timings.record("listing", time.perf_counter() - started)
+            if info:
+                done.append(href)
+            else:
+                LISTINGS_FAILED.inc()
+                failed[href] = error
 
-async def get_all_listings_by_city(page: Page, city_query: str):
-    console.print(f"[bold]Starting search for city[/]: {city_query}")
+    # Detail pages open in their own tabs; the results page stays put, so
+    # there is no go_back navigation between listings.
+    pool = ListingWorkerPool(
+        page.context,
+        visit,
+        concurrency=SCRAPER_CONCURRENCY,
+        domain_limiter=domain_limiter,
+        stop_on=(BandwidthBudgetExceeded,),
+    )
     try:
-        searchbox = get_element_by_id(page, SEARCHBOX_HTML_ID)
-        await searchbox.click()
-        await page.keyboard.type(city_query, delay=random.randint(100, 200))
-        await asyncio.sleep(random.uniform(3.0, 6.0))
-        await searchbox.press("Enter")
-        await page.wait_for_selector(f".{LISTING_ITEM_HTML_CLASSNAME}")  # Wait for listings to load
-
-        while True:
-            await get_all_listings_information(page, city_query=city_query)
+        return await pool.run(hrefs)
+    finally:
+        if frontier is not None:
+            # One write per results page rather than per listing.
+            await _db("db.frontier", frontier.mark_done, JOB_KIND_LISTING, done)
+            await _db("db.frontier", frontier.mark_failed, JOB_KIND_LISTING, failed)
+
+async def _paginate_with_searchbox(page: Page, city_query: str, *, net: NetworkUsage | None) -> None:
+    searchbox = get_element_by_id(page, SEARCHBOX_HTML_ID)
+    await searchbox.click()
+    await page.keyboard.type(
+        city_query, delay=random.randint(100, 200) * HUMANIZE_DELAY_SCALE
+    )
+    with timings.span("sleep.humanize"):
+        await asyncio.sleep(random.uniform(3.0, 6.0) * HUMANIZE_DELAY_SCALE)
+    await searchbox.press("Enter")
+    await page.wait_for_selector(f".{LISTING_ITEM_HTML_CLASSNAME}")  # Wait for listings to load
+
+    while True:
+        await get_all_listings_information(page, city_query=city_query, net=net)
+        next_button = get_elements_by_classname(page, NEXT_BUTTON_HTML_CLASSNAME)
+        if not await next_button.is_visible():
+            log.info("No more pages for city %r", city_query, extra={"event": "city_exhausted"})
+            break
+        if net is not None:
+            await net.enforce_budget()
+        await paced_click_navigation(page, next_button)
+        log.info("Navigated to next page for city %r", city_query, extra={"event": "next_page"})
+        await page.wait_for_load_state("networkidle")  # Keep for pagination, or replace with selector if needed
+
+
+async def _paginate_with_urls(
+    page: Page,
+    city_query: str,
+    *,
+    net: NetworkUsage | None,
+    start_page: int,
+    page_stride: int,
+    max_pages: int,
+    recycler: ContextRecycler | None = None,
+) -> None:
+    page_number = max(1, start_page)
+    visited = 0
+    while not max_pages or visited < max_pages:
+        # Between results pages nothing is in flight, so the context can be
+        # swapped safely; the next page is simply loaded in the new one.
+        if recycler is not None and await recycler.maybe_recycle(page):
+            page = await recycler.context.new_page()
+        url = build_search_url(
+            SEARCH_BASE_URL, city_query, page_number, results_per_page=RESULTS_PER_PAGE
+        )
+        if net is not None:
+            await net.enforce_budget()
+        if frontier is not None:
+            await _db("db.frontier", frontier.add_results_page, city_query, page_number, url)
+            await _db("db.frontier", frontier.mark_in_flight, JOB_KIND_RESULTS_PAGE, url)
+        await paced_goto(page, url, wait_until="domcontentloaded")
+        try:
+            await page.wait_for_selector(f".{LISTING_ITEM_HTML_CLASSNAME}", timeout=15_000)
+        except PlaywrightTimeoutError:
+            log.info(
+                "No more pages for city %r",
+                city_query,
+                extra={"event": "city_exhausted", "page_number": page_number},
+            )
+            break
+        log.info(
+            "Results page %d for city %r",
+            page_number,
+            city_query,
+            extra={"event": "results_page", "page_number": page_number, "url": url},
+        )
+
+        with timings.span("results_page"):
+            await get_all_listings_information(page, city_query=city_query, net=net)
+        visited += 1
+        if frontier is not None:
+            await _db("db.frontier", frontier.mark_done, JOB_KIND_RESULTS_PAGE, [url])
+
+        # Only sequential crawls can rely on the Next button to detect the end;
+        # sharded crawls (stride > 1) stop on the first empty page instead.
+        if page_stride == 1:
             next_button = get_elements_by_classname(page, NEXT_BUTTON_HTML_CLASSNAME)
             if not await next_button.is_visible():
-                console.print(f"[yellow]No more pages for city[/] '{city_query}'")
+                log.info("No more pages for city %r", city_query, extra={"event": "city_exhausted"})
                 break
-            await next_button.click()
-            console.print(f"[blue]Navigated to next page for city[/]: '{city_query}'")
-            await page.wait_for_load_state("networkidle")  # Keep for pagination, or replace with selector if needed
-    except Exception as exc:
-        print(f"Error in get_all_listings_by_city for city '{city_query}': {exc}")
+        page_number += page_stride
+    else:
+        # Stopped by max_pages: the city is not finished, keep the frontier.
+        return
+
+    if frontier is not None and page_stride == 1:
+        # City finished: the next crawl starts again from page one.
+        await _db("db.frontier", frontier.clear, city_query)
+
+
+async def get_all_listings_by_city(
+    page: Page,
+    city_query: str,
+    *,
+    net: NetworkUsage | None = None,
+    start_page: int | None = None,
+    page_stride: int = 1,
+    max_pages: int = MAX_RESULT_PAGES,
+    recycler: ContextRecycler | None = None,
+):
+    """Scrape every results page for a city.
+
+    In "url" pagination mode, `start_page` resumes from any page (by default
+    the frontier's resume point) and `page_stride` shards one city across
+    workers (worker k of n uses start_page=k+1, page_stride=n). A `recycler`
+    may replace the browser context between results pages ("url" mode only:
+    the search box flow cannot resume mid-pagination).
+    """
+    log.info("Starting search for city %r", city_query, extra={"event": "city_started"})
+    try:
+        if frontier is not None:
+            await _db("db.frontier", frontier.reset_in_flight, city_query)
+        if start_page is None:
+            start_page = 1
+            if frontier is not None and PAGINATION_MODE != "searchbox":
+                start_page = await _db("db.frontier", frontier.resume_page, city_query)
+                if start_page > 1:
+                    log.info(
+                        "Resuming city %r from results page %d",
+                        city_query,
+                        start_page,
+                        extra={"event": "city_resumed", "page_number": start_page},
+                    )
+        if PAGINATION_MODE == "searchbox":
+            await _paginate_with_searchbox(page, city_query, net=net)
+            if frontier is not None:
+                await _db("db.frontier", frontier.clear, city_query)
+        else:
+            await _paginate_with_urls(
+                page,
+                city_query,
+                net=net,
+                start_page=start_page,
+                page_stride=max(1, page_stride),
+                max_pages=max_pages,
+                recycler=recycler,
+            )
+    except BandwidthBudgetExceeded:
+        raise
+    except Exception:
+        log.exception(
+            "Error in get_all_listings_by_city for city %r",
+            city_query,
+            extra={"event": "city_failed", "city": city_query},
+        )
         if DEBUG_MODE:
             raise
 
-async def get_all_listings_by_state(page: Page, state: str):
-    pass
+async def get_all_listings_by_state(page: Page, state: str, *, net: NetworkUsage | None = None):
+    """Crawl every known city of `state` one after another on the same tab."""
+    for city_query in expand_state(state):
+        if PAGINATION_MODE == "searchbox":
+            await paced_goto(page, MERCADOLIBRE_URL)
+        await get_all_listings_by_city(page, city_query, net=net)
 
-async def main(city: str):
-    setup_logger(LOG_DIR, LOG_LEVEL)
-    async with Stealth().use_async(async_playwright()) as playwright_instance:
-        console.print(f"[bold]Launching browser for city[/] '{city}'")
-        browser = await playwright_instance.chromium.launch(headless=False, slow_mo=100)
-        context = await browser.new_context()
-        await context.add_init_script(
-            """
-                Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-                })
-            """
+
+async def launch_browser(playwright_instance, profile: BrowserProfile | None = None):
+    profile = profile or get_browser_profile(BROWSER_PROFILE)
+    return await playwright_instance.chromium.launch(**profile.launch_kwargs())
+
+
+async def new_crawl_context(
+    browser,
+    *,
+    net: NetworkUsage | None = None,
+    blocker: RequestBlocker | None = None,
+    profile: BrowserProfile | None = None,
+    storage_state: dict | None = None,
+) -> BrowserContext:
+    """Isolated context (own cookies/tabs) with the stealth script, byte accounting and blocking."""
+    profile = profile or get_browser_profile(BROWSER_PROFILE)
+    options = profile.context_kwargs()
+    if storage_state:
+        options["storage_state"] = storage_state
+    context = await browser.new_context(**options)
+    await context.add_init_script(
+        """
+            Object.defineProperty(navigator, 'webdriver', {
+            get: () => undefined
+            })
+        """
+    )
+    # Attach network usage tracker to the context so every tab is counted
+    if net is not None:
+        net.attach(context)
+    if blocker is not None:
+        await blocker.install(context)
+    return context
+
+
+def setup_logging() -> None:
+    setup_logger(
+        LOG_DIR,
+        LOG_LEVEL,
+        SnapshotPolicy(
+            sample_rate=FAILURE_SNAPSHOT_SAMPLE_RATE,
+            max_per_signature=FAILURE_SNAPSHOT_MAX_PER_SIGNATURE,
+            max_bytes=int(FAILURE_SNAPSHOT_MAX_MB * BYTES_PER_MB),
+            screenshot=FAILURE_SCREENSHOT,
+        ),
+        log_format=LOG_FORMAT,
+        log_file=LOG_FILE or None,
+        log_file_max_bytes=int(LOG_FILE_MAX_MB * BYTES_PER_MB),
+    )
+
+
+def new_network_usage() -> NetworkUsage:
+    return NetworkUsage(
+        int(NETWORK_BUDGET_MB * BYTES_PER_MB),
+        on_exceeded=NETWORK_BUDGET_ACTION,
+        pause_seconds=NETWORK_BUDGET_PAUSE_SECONDS,
+    )
+
+
+def new_request_blocker() -> RequestBlocker | None:
+    if not BLOCK_RESOURCES:
+        return None
+    return RequestBlocker(BLOCKED_RESOURCE_TYPES, BLOCKED_URL_PATTERNS)
+
+
+def new_context_recycler(
+    browser,
+    *,
+    net: NetworkUsage | None = None,
+    blocker: RequestBlocker | None = None,
+) -> ContextRecycler:
+    return ContextRecycler(
+        functools.partial(new_crawl_context, browser, net=net, blocker=blocker),
+        max_navigations=CONTEXT_RECYCLE_NAVIGATIONS,
+        max_memory_mb=CONTEXT_RECYCLE_MEMORY_MB,
+    )
+
+
+async def crawl_city(
+    context: BrowserContext,
+    city: str,
+    *,
+    net: NetworkUsage | None = None,
+    recycler: ContextRecycler | None = None,
+) -> None:
+    """Crawl one city on a fresh tab of `context` (the recycler's context, when given)."""
+    page = await context.new_page()
+    try:
+        if PAGINATION_MODE == "searchbox":
+            await paced_goto(page, MERCADOLIBRE_URL)
+            log.info("Opened search page %s", MERCADOLIBRE_URL)
+        await get_all_listings_by_city(page, city, net=net, recycler=recycler)
+    finally:
+        # Already gone if the recycler replaced its context.
+        await page.close()
+
+
+def metrics_server():
+    """Serve /metrics on the local port for the duration of a run (if enabled)."""
+    if not METRICS_PORT:
+        return contextlib.nullcontext()
+    return MetricsServer(METRICS_HOST, METRICS_PORT)
+
+
+def print_run_summary(net: NetworkUsage, blocker: RequestBlocker | None) -> None:
+    snap = net.snapshot()
+    log.info(
+        "Proxy data inbound=%s MB outbound=%s MB total≈%s GB",
+        snap["inbound"]["megabytes"],
+        snap["outbound"]["megabytes"],
+        snap["total"]["gigabytes"],
+        extra={
+            "event": "network_summary",
+            "inbound_bytes": snap["inbound"]["bytes"],
+            "outbound_bytes": snap["outbound"]["bytes"],
+        },
+    )
+    for key in ("by_resource_type", "by_host"):
+        for name, entry in list(snap.get(key, {}).items())[:NETWORK_TOP_N]:
+            log.info(
+                "Network %s %s: %.2f MB in %d requests",
+                key.replace("_", " "),
+                name,
+                entry["megabytes"],
+                entry["requests"],
+                extra={"event": f"network_{key}", "key": name, **entry},
+            )
+    for url, size in net.top_urls(NETWORK_TOP_N):
+        log.info(
+            "Top URL %.2f MB %s",
+            size / BYTES_PER_MB,
+            url,
+            extra={"event": "network_top_url", "url": url, "bytes": size},
+        )
+    if blocker is not None:
+        log.info(
+            "Blocked requests %d (allowed %d)",
+            blocker.blocked_requests,
+            blocker.allowed_requests,
+            extra={
+                "event": "blocker_summary",
+                "blocked": blocker.blocked_requests,
+                "allowed": blocker.allowed_requests,
+            },
         )
+    report_timings(TIMINGS_EXPORT_PATH)
 
-        page = await context.new_page()
-        # Attach network usage tracker
-        net = NetworkUsage()
-        net.attach(page)
+
+async def main(city: str):
+    setup_logging()
+    async with metrics_server(), Stealth().use_async(async_playwright()) as playwright_instance:
+        log.info("Launching browser for city %r", city)
+        browser = await launch_browser(playwright_instance)
+        net = new_network_usage()
+        blocker = new_request_blocker()
+        recycler = new_context_recycler(browser, net=net, blocker=blocker)
+        context = await recycler.start()
 
         try:
-            await page.goto(MERCADOLIBRE_URL)
-            console.print(f"[blue]Opened search page[/]: {MERCADOLIBRE_URL}")
-            await get_all_listings_by_city(page, city)
-        except Exception as exc:
-            console.print(f"[red]Error in main for city[/] '{city}': {exc}")
+            await crawl_city(context, city, net=net, recycler=recycler)
+        except BandwidthBudgetExceeded as exc:
+            log.error("Stopping crawl for city %r: %s", city, exc, extra={"event": "budget_exceeded"})
+        except Exception:
+            log.exception("Error in main for city %r", city)
             if DEBUG_MODE:
                 raise
         finally:
+            await net.drain()
+            await recycler.close()
             await browser.close()
-            console.print(f"[blue]Browser closed for city[/] '{city}'")
-            snap = net.snapshot()
-            inbound_mb = snap.get("inbound", {}).get("megabytes", 0)
-            outbound_mb = snap.get("outbound", {}).get("megabytes", 0)
-            total_gb = snap.get("total", {}).get("gigabytes", 0)
-            console.print(
-                f"[cyan]Estimated proxy data[/] "
-                f"inbound={inbound_mb} MB, "
-                f"outbound={outbound_mb} MB, "
-                f"total≈{total_gb} GB"
-            )
-            # Logging handlers flush removed; using prints now
\ No newline at end of file
+            await close_listing_writer()
+            await dispose_async_engine()
+            await close_http_fetcher()
+            shutdown_parse_executor()
+            await flush_failure_snapshots()
+            log.info("Browser closed for city %r", city)
+            print_run_summary(net, blocker)
+            shutdown_logging()
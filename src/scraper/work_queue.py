@@ -0,0 +1,266 @@
+"""Shared crawl queue for several scraper nodes on one Postgres database.
+
+Jobs are the `crawl_frontier` rows. A worker claims a batch with
+`SELECT ... FOR UPDATE SKIP LOCKED`, so concurrent claimers never block on or
+receive the same rows, and holds each job under a lease (`lease_owner`,
+`lease_expires_at`) that a heartbeat keeps extending while the job runs. When a
+node dies its leases expire and the next claim by any node puts the jobs back
+to pending (counting a failed attempt).
+
+SQLite has no row locks; there the claiming UPDATE re-checks the job is still
+claimable, so a row is still handed to only one worker.
+
+All methods are synchronous DB calls; run them with `asyncio.to_thread`.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, case, func, or_, update
+from sqlmodel import Session, select
+
+from db.models.crawl_job import (
+    JOB_KIND_LISTING,
+    JOB_STATUS_DONE,
+    JOB_STATUS_FAILED,
+    JOB_STATUS_IN_FLIGHT,
+    JOB_STATUS_PENDING,
+    CrawlJob,
+)
+from db.session import get_engine
+from scraper.frontier import CrawlFrontier
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ClaimedJob:
+    id: int
+    kind: str
+    url: str
+    city_query: str
+    page_number: Optional[int]
+    attempts: int
+    card_hash: Optional[str] = None
+
+
+class WorkQueue(CrawlFrontier):
+    def __init__(self, worker_id: str, *, lease_seconds: float = 300.0, max_attempts: int = 3) -> None:
+        super().__init__(max_attempts=max_attempts)
+        self.worker_id = worker_id
+        self.lease = timedelta(seconds=max(1.0, float(lease_seconds)))
+
+    def seed_city(self, city_query: str, url: str) -> None:
+        """Queue a city's first results page; each results page queues the next one.
+
+        A city whose previous crawl finished (nothing pending or leased) is
+        cleared first so it is crawled again from the start.
+        """
+        with Session(get_engine()) as session:
+            open_jobs = session.exec(
+                select(func.count(CrawlJob.id)).where(
+                    CrawlJob.city_query == city_query,
+                    CrawlJob.status.in_([JOB_STATUS_PENDING, JOB_STATUS_IN_FLIGHT]),
+                )
+            ).one()
+        if not open_jobs:
+            self.clear(city_query)
+        self.add_results_page(city_query, 1, url)
+
+    def reclaim_expired(self, now: Optional[datetime] = None) -> int:
+        """Requeue jobs whose lease ran out; each expiry counts as a failed attempt."""
+        now = now or datetime.now(timezone.utc)
+        with Session(get_engine()) as session:
+            result = session.execute(
+                update(CrawlJob)
+                .where(CrawlJob.status == JOB_STATUS_IN_FLIGHT, CrawlJob.lease_expires_at < now)
+                .values(
+                    attempts=CrawlJob.attempts + 1,
+                    status=case(
+                        (CrawlJob.attempts + 1 >= self.max_attempts, JOB_STATUS_FAILED),
+                        else_=JOB_STATUS_PENDING,
+                    ),
+                    last_error="lease expired",
+                    lease_owner=None,
+                    lease_expires_at=None,
+                    updated_at=now,
+                )
+            )
+            session.commit()
+            return result.rowcount or 0
+
+    def claim(self, limit: int = 1, *, now: Optional[datetime] = None) -> list[ClaimedJob]:
+        """Lease up to `limit` pending jobs to this worker, listings before results pages."""
+        now = now or datetime.now(timezone.utc)
+        reclaimed = self.reclaim_expired(now)
+        if reclaimed:
+            log.warning(
+                "Reclaimed %d jobs with expired leases",
+                reclaimed,
+                extra={"event": "leases_reclaimed", "count": reclaimed},
+            )
+
+        claimable = CrawlJob.status == JOB_STATUS_PENDING
+        with Session(get_engine()) as session:
+            ids = session.exec(
+                select(CrawlJob.id)
+                .where(claimable)
+                # Drain listings first so the queue does not balloon with pages.
+                .order_by(case((CrawlJob.kind == JOB_KIND_LISTING, 0), else_=1), CrawlJob.id)
+                .limit(max(1, int(limit)))
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not ids:
+                return []
+            rows = session.execute(
+                update(CrawlJob)
+                .where(CrawlJob.id.in_(ids), claimable)
+                .values(
+                    status=JOB_STATUS_IN_FLIGHT,
+                    lease_owner=self.worker_id,
+                    lease_expires_at=now + self.lease,
+                    updated_at=now,
+                )
+                .returning(
+                    CrawlJob.id,
+                    CrawlJob.kind,
+                    CrawlJob.url,
+                    CrawlJob.city_query,
+                    CrawlJob.page_number,
+                    CrawlJob.attempts,
+                    CrawlJob.card_hash,
+                )
+            ).all()
+            session.commit()
+        return sorted((ClaimedJob(*row) for row in rows), key=lambda job: ids.index(job.id))
+
+    def _owned(self, job_ids: Iterable[int]):
+        return and_(
+            CrawlJob.id.in_(list(job_ids)),
+            CrawlJob.status == JOB_STATUS_IN_FLIGHT,
+            CrawlJob.lease_owner == self.worker_id,
+        )
+
+    def heartbeat(self, job_ids: Iterable[int], *, now: Optional[datetime] = None) -> int:
+        """Extend the leases this worker still holds; returns how many were extended."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+        now = now or datetime.now(timezone.utc)
+        with Session(get_engine()) as session:
+            result = session.execute(
+                update(CrawlJob)
+                .where(self._owned(job_ids))
+                .values(lease_expires_at=now + self.lease, updated_at=now)
+            )
+            session.commit()
+            return result.rowcount or 0
+
+    def complete(self, job_ids: Iterable[int]) -> None:
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        with Session(get_engine()) as session:
+            session.execute(
+                update(CrawlJob)
+                .where(self._owned(job_ids))
+                .values(
+                    status=JOB_STATUS_DONE,
+                    lease_owner=None,
+                    lease_expires_at=None,
+                    updated_at=datetime.now(timezone.utc),
+                )
+            )
+            session.commit()
+
+    def fail(self, errors: dict[int, str]) -> None:
+        """Count a failed attempt; jobs go back to pending until they run out of attempts."""
+        if not errors:
+            return
+        now = datetime.now(timezone.utc)
+        with Session(get_engine()) as session:
+            for job_id, error in errors.items():
+                session.execute(
+                    update(CrawlJob)
+                    .where(self._owned([job_id]))
+                    .values(
+                        attempts=CrawlJob.attempts + 1,
+                        status=case(
+                            (CrawlJob.attempts + 1 >= self.max_attempts, JOB_STATUS_FAILED),
+                            else_=JOB_STATUS_PENDING,
+                        ),
+                        last_error=(error or "")[:1000],
+                        lease_owner=None,
+                        lease_expires_at=None,
+                        updated_at=now,
+                    )
+                )
+            session.commit()
+
+    def release(self, job_ids: Iterable[int]) -> None:
+        """Hand unfinished jobs back without counting an attempt (clean shutdown)."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        with Session(get_engine()) as session:
+            session.execute(
+                update(CrawlJob)
+                .where(self._owned(job_ids))
+                .values(
+                    status=JOB_STATUS_PENDING,
+                    lease_owner=None,
+                    lease_expires_at=None,
+                    updated_at=datetime.now(timezone.utc),
+                )
+            )
+            session.commit()
+
+    def has_open_jobs(self) -> bool:
+        with Session(get_engine()) as session:
+            return bool(
+                session.exec(
+                    select(func.count(CrawlJob.id)).where(
+                        or_(
+                            CrawlJob.status == JOB_STATUS_PENDING,
+                            CrawlJob.status == JOB_STATUS_IN_FLIGHT,
+                        )
+                    )
+                ).one()
+            )
+
+
+class LeaseHeartbeat:
+    """Background task renewing the leases of the jobs a worker is running."""
+
+    def __init__(self, queue: WorkQueue, *, interval: Optional[float] = None) -> None:
+        self.queue = queue
+        self.interval = interval or queue.lease.total_seconds() / 3
+        self.job_ids: set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self.job_ids:
+                continue
+            try:
+                await asyncio.to_thread(self.queue.heartbeat, list(self.job_ids))
+            except Exception as exc:
+                log.error("Lease heartbeat failed: %s", exc)
+
+    async def __aenter__(self) -> "LeaseHeartbeat":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,4 +1,23 @@
+"""Structured logging and failure snapshots.
+
+`setup_logger()` routes every stdlib logger through a `QueueHandler`, so the
+event loop only enqueues records; a `QueueListener` thread formats them as
+JSON lines (stderr and an optional rotating file) or, when stderr is a TTY,
+renders them with Rich. Pass structured fields with
+`log.info("message", extra={"event": "...", ...})`.
+"""
+import asyncio
+import copy
+import gzip
+import json
+import logging
+import logging.handlers
 import os
+import queue
+import random
+import re
+import sys
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional, TYPE_CHECKING
 
@@ -9,14 +28,263 @@ else:
 
 _LOG_DIR = "logs"
 
+log = logging.getLogger(__name__)
+
+# Attributes every LogRecord has; anything else came in through `extra=`.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+# Chatty third-party loggers (httpx logs every request at INFO).
+_QUIET_LOGGERS = ("httpx", "httpcore", "asyncio", "aiosqlite")
+
+
+def record_fields(record: logging.LogRecord) -> Dict[str, Any]:
+    return {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS and not k.startswith("_")}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, extra fields, exc."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        payload.update(record_fields(record))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Message followed by its structured fields as key=value."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{k}={v}" for k, v in record_fields(record).items() if k != "event")
+        message = record.getMessage()
+        text = f"{message}  {fields}" if fields else message
+        if record.exc_text:
+            text = f"{text}\n{record.exc_text}"
+        return text
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render args and traceback now (they may not survive the hand-off), but
+        # keep the `extra` fields for the formatter; the stock prepare() folds
+        # everything into `msg`.
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
 
-def setup_logger(log_dir: str = "logs", level: str = "INFO"):
-    """No-op initializer kept for compatibility; ensures log dir exists."""
-    # Maintain signature; create the directory so snapshots can be saved.
-    global _LOG_DIR
+
+@dataclass
+class SnapshotPolicy:
+    """How failure snapshots are sampled, deduplicated, encoded and rotated."""
+
+    # Fraction of failures that get a snapshot (1.0 = all).
+    sample_rate: float = 1.0
+    # Snapshots kept per error signature; later repeats only get a log line.
+    max_per_signature: int = 3
+    # Total size of failure_* files in the log dir before the oldest are deleted (0 = unbounded).
+    max_bytes: int = 200 * 1024 * 1024
+    # "viewport" (JPEG of the visible area), "full" (full-page JPEG) or "off".
+    screenshot: str = "viewport"
+    jpeg_quality: int = 60
+    # Pending snapshots beyond this are dropped instead of buffering unbounded HTML.
+    queue_size: int = 32
+
+
+_POLICY = SnapshotPolicy()
+
+
+def setup_logger(
+    log_dir: str = "logs",
+    level: str = "INFO",
+    policy: Optional[SnapshotPolicy] = None,
+    *,
+    log_format: str = "auto",
+    log_file: Optional[str] = None,
+    log_file_max_bytes: int = 50 * 1024 * 1024,
+) -> None:
+    """Install the queue-based logging pipeline and configure failure snapshots.
+
+    `log_format` is "json", "rich" or "auto" (Rich only when stderr is a TTY).
+    `log_file` adds a rotating JSON-lines file. Calling it again replaces the
+    previous configuration.
+    """
+    global _LOG_DIR, _POLICY, _listener, _queue_handler
     _LOG_DIR = log_dir
+    if policy is not None:
+        _POLICY = policy
     os.makedirs(log_dir, exist_ok=True)
-    # Using prints instead of logger per request.
+
+    shutdown_logging()
+    handlers: list[logging.Handler] = []
+    use_rich = log_format == "rich" or (log_format == "auto" and sys.stderr.isatty())
+    if use_rich:
+        from rich.console import Console
+        from rich.logging import RichHandler
+
+        console_handler: logging.Handler = RichHandler(
+            console=Console(stderr=True), show_path=False, markup=False
+        )
+        console_handler.setFormatter(ConsoleFormatter())
+    else:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(JsonFormatter())
+    handlers.append(console_handler)
+    if log_file:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=log_file_max_bytes, backupCount=5, encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = _QueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    for name in _QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def shutdown_logging() -> None:
+    """Flush pending records and detach the queue handler."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        listener, _listener = _listener, None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def error_signature(exc: BaseException, step: Optional[str] = None) -> str:
+    """Group failures that differ only by ids, numbers or URLs."""
+    message = re.sub(r"https?://\S+", "<url>", str(exc).splitlines()[0] if str(exc) else "")
+    message = re.sub(r"\d+", "N", message)[:200]
+    return f"{step or '-'}|{type(exc).__name__}|{message}"
+
+
+def rotate_snapshots(log_dir: str, max_bytes: int) -> int:
+    """Delete the oldest failure_* files until the directory is under `max_bytes`."""
+    if max_bytes <= 0:
+        return 0
+    try:
+        entries = [e for e in os.scandir(log_dir) if e.is_file() and e.name.startswith("failure_")]
+    except FileNotFoundError:
+        return 0
+    files = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries))
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in files:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def _write_snapshot(html_path: Optional[str], html: Optional[str], shot_path: Optional[str], shot: Optional[bytes]) -> None:
+    os.makedirs(_LOG_DIR, exist_ok=True)
+    if html_path and html is not None:
+        with gzip.open(html_path, "wt", encoding="utf-8", compresslevel=6) as snapshot:
+            snapshot.write(html)
+    if shot_path and shot:
+        with open(shot_path, "wb") as image:
+            image.write(shot)
+    rotate_snapshots(_LOG_DIR, _POLICY.max_bytes)
+
+
+class SnapshotWriter:
+    """Background queue that compresses and writes failure snapshots off the event loop."""
+
+    def __init__(self, queue_size: int = 32) -> None:
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self._task: Optional[asyncio.Task] = None
+        self._loop = asyncio.get_running_loop()
+        self.written = 0
+        self.dropped = 0
+
+    def submit(self, html_path: Optional[str], html: Optional[str], shot_path: Optional[str], shot: Optional[bytes]) -> bool:
+        try:
+            self._queue.put_nowait((html_path, html, shot_path, shot))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            try:
+                if item is None:
+                    return
+                await asyncio.to_thread(_write_snapshot, *item)
+                self.written += 1
+            except Exception as exc:
+                log.warning("Unable to write failure snapshot: %s", exc)
+            finally:
+                self._queue.task_done()
+
+    async def close(self) -> None:
+        """Write everything still queued and stop the background task."""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+
+
+_writer: Optional[SnapshotWriter] = None
+_signature_counts: Dict[str, int] = {}
+
+
+def _get_snapshot_writer() -> SnapshotWriter:
+    global _writer
+    # A writer is bound to the loop that created it (tests run one loop each).
+    if _writer is None or _writer._loop is not asyncio.get_running_loop():
+        _writer = SnapshotWriter(_POLICY.queue_size)
+    return _writer
+
+
+async def flush_failure_snapshots() -> None:
+    """Wait for queued snapshots to reach disk; call before the process exits."""
+    global _writer
+    if _writer is not None:
+        writer, _writer = _writer, None
+        await writer.close()
+
+
+async def _capture_screenshot(page: Page) -> Optional[bytes]:
+    if _POLICY.screenshot == "off":
+        return None
+    return await page.screenshot(
+        type="jpeg",
+        quality=_POLICY.jpeg_quality,
+        full_page=_POLICY.screenshot == "full",
+    )
 
 
 async def log_failure(
@@ -25,8 +293,11 @@ async def log_failure(
     exc: Exception,
     extra: Optional[Dict[str, Any]] = None,
 ) -> None:
-    """Capture context when scraping fails; print and save HTML + screenshot."""
-    from utils.console import console
+    """Log failure context and queue a sampled, deduplicated HTML + screenshot snapshot.
+
+    Only `page.content()` and the screenshot bytes are taken inline; gzip and
+    disk writes happen in the background `SnapshotWriter`.
+    """
     context: Dict[str, Any] = {"href": href}
 
     page_url = None
@@ -37,28 +308,44 @@ async def log_failure(
             page_url = None
     context["page_url"] = page_url
 
+    signature = error_signature(exc, (extra or {}).get("step"))
+    seen = _signature_counts.get(signature, 0)
+    _signature_counts[signature] = seen + 1
+    capture = (
+        page is not None
+        and seen < _POLICY.max_per_signature
+        and random.random() < _POLICY.sample_rate
+    )
+
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S%f")
     html_path = None
     screenshot_path = None
-    if page:
+    if capture:
+        html = shot = None
         try:
-            os.makedirs(_LOG_DIR, exist_ok=True)
-            html_content = await page.content()
-            html_path = os.path.join(_LOG_DIR, f"failure_{timestamp}.html")
-            with open(html_path, "w", encoding="utf-8") as snapshot:
-                snapshot.write(html_content)
+            html = await page.content()
+            html_path = os.path.join(_LOG_DIR, f"failure_{timestamp}.html.gz")
         except Exception as html_exc:
-            console.print(f"[yellow]Warning:[/] Unable to capture HTML snapshot: {html_exc}")
+            log.warning("Unable to capture HTML snapshot: %s", html_exc)
         try:
-            screenshot_path = os.path.join(_LOG_DIR, f"failure_{timestamp}.png")
-            await page.screenshot(path=screenshot_path, full_page=True)
+            shot = await _capture_screenshot(page)
+            if shot:
+                screenshot_path = os.path.join(_LOG_DIR, f"failure_{timestamp}.jpg")
         except Exception as shot_exc:
-            console.print(f"[yellow]Warning:[/] Unable to capture screenshot: {shot_exc}")
+            log.warning("Unable to capture screenshot: %s", shot_exc)
+        if (html_path or screenshot_path) and not _get_snapshot_writer().submit(
+            html_path, html, screenshot_path, shot
+        ):
+            html_path = screenshot_path = None
     context["html_snapshot"] = html_path
     context["screenshot"] = screenshot_path
+    context["signature_count"] = seen + 1
 
     if extra:
         context.update(extra)
 
-    console.print("[red]Scrape failure:[/]", context)
-    console.print("[red]Error:[/]", exc)
+    log.error(
+        "Scrape failure: %r",
+        exc,
+        extra={"event": "scrape_failure", "failure": context, "error_type": type(exc).__name__},
+    )
@@ -0,0 +1,268 @@
+"""Minimal Prometheus-style metrics (counters, gauges, histograms).
+
+Metrics live in a process-wide registry and are rendered in the Prometheus
+text exposition format by `render_metrics()`. The API serves them at
+`/metrics`; the scraper serves them from `MetricsServer` on a local port.
+No client library is needed for the handful of series we export.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import threading
+from typing import Iterable, Optional
+
+log = logging.getLogger(__name__)
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> (bucket counts, sum, count)
+        self._values: dict[LabelValues, tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def samples(self) -> list[str]:
+        lines: list[str] = []
+        with self._lock:
+            items = sorted((k, (list(c), s, n)) for k, (c, s, n) in self._values.items())
+        for key, (counts, total, count) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {bucket_count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+    buckets: Iterable[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+# Scraper metrics
+LISTINGS_SCRAPED = counter("scraper_listings_scraped_total", "Listings scraped, by fetch path.", ["source"])
+LISTINGS_SKIPPED = counter(
+    "scraper_listings_skipped_total", "Known listings whose price came from the search card."
+)
+LISTINGS_UNCHANGED = counter(
+    "scraper_listings_unchanged_total", "Visited listings whose detail content hash matched the stored one."
+)
+LISTINGS_UPDATED = counter(
+    "scraper_listings_updated_total", "Stored listings whose changed columns were rewritten."
+)
+LISTINGS_FAILED = counter("scraper_listings_failed_total", "Listing visits that produced no listing.")
+PAGES_VISITED = counter(
+    "scraper_pages_visited_total", "Page loads (browser or HTTP fetch), by HTTP status class.", ["status"]
+)
+NETWORK_BYTES = counter("scraper_network_bytes_total", "Bytes transferred through the proxy.", ["direction"])
+DB_WRITE_SECONDS = histogram("scraper_db_write_seconds", "Latency of batched listing/price writes.")
+QUEUE_DEPTH = gauge("scraper_queue_depth", "Items waiting in an in-process queue.", ["queue"])
+
+# Database pool metrics (shared by the scraper and the API; `pool` is "sync" or "async")
+DB_POOL_CHECKOUTS = counter("db_pool_checkouts_total", "Connections checked out of the pool.", ["pool"])
+DB_POOL_WAIT_SECONDS = histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection (incl. pre-ping).", ["pool"]
+)
+DB_POOL_OVERFLOWS = counter(
+    "db_pool_overflow_total", "Connections opened beyond DB_POOL_SIZE (up to DB_MAX_OVERFLOW).", ["pool"]
+)
+DB_POOL_TIMEOUTS = counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS.", ["pool"]
+)
+DB_POOL_IN_USE = gauge("db_pool_in_use", "Connections currently checked out.", ["pool"])
+
+# API metrics
+HTTP_REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template.",
+    ["method", "route", "status"],
+)
+
+
+class MetricsServer:
+    """Tiny asyncio HTTP server answering `GET /metrics` for the scraper process."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9108) -> None:
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            # Drain headers; the request body (if any) is ignored.
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                body = render_metrics().encode("utf-8")
+                status, content_type = "200 OK", CONTENT_TYPE
+            else:
+                body = b"not found\n"
+                status, content_type = "404 Not Found", "text/plain"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+                + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self) -> bool:
+        try:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as exc:
+            log.warning("Metrics server not started on %s:%s: %s", self.host, self.port, exc)
+            return False
+        self.port = self._server.sockets[0].getsockname()[1]
+        log.info("Metrics on http://%s:%s/metrics", self.host, self.port)
+        return True
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "MetricsServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
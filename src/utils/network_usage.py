@@ -1,39 +1,156 @@
-from playwright.async_api import Page, Request, Response
+import asyncio
+import logging
+import urllib.parse
+from typing import Optional, Union
+
+from playwright.async_api import BrowserContext, Page, Request
+
+from utils.metrics import NETWORK_BYTES
+
+log = logging.getLogger(__name__)
 
 BYTES_PER_GB = 1024 * 1024 * 1024
 BYTES_PER_MB = 1024 * 1024
 
 
+class BandwidthBudgetExceeded(RuntimeError):
+    """Raised when a run has used up its network byte budget."""
+
+
 class NetworkUsage:
+    """Bytes on the wire, from Playwright's `request.sizes()` (headers + encoded body).
+
+    Totals are broken down by resource type and host, and the costliest URLs
+    are kept for a top-N report.
+    """
+
     inbound_bytes: int
     outbound_bytes: int
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        budget_bytes: Optional[int] = None,
+        *,
+        on_exceeded: str = "stop",
+        pause_seconds: float = 900.0,
+    ) -> None:
         self.inbound_bytes = 0
         self.outbound_bytes = 0
+        # None/0 disables the budget.
+        self.budget_bytes = budget_bytes or None
+        self.on_exceeded = on_exceeded
+        self.pause_seconds = pause_seconds
+        self._window_start_bytes = 0
+        self.by_resource_type: dict[str, dict[str, int]] = {}
+        self.by_host: dict[str, dict[str, int]] = {}
+        self.max_tracked_urls = 5000
+        self._url_bytes: dict[str, int] = {}
+        self._pending: set[asyncio.Future] = set()
+
+    @property
+    def total_bytes(self) -> int:
+        return self.inbound_bytes + self.outbound_bytes
+
+    @property
+    def budget_exceeded(self) -> bool:
+        if self.budget_bytes is None:
+            return False
+        return self.total_bytes - self._window_start_bytes >= self.budget_bytes
+
+    async def enforce_budget(self) -> None:
+        """Call before each navigation: raise ("stop") or sleep ("pause") once over budget."""
+        if not self.budget_exceeded:
+            return
+        used_mb = round((self.total_bytes - self._window_start_bytes) / BYTES_PER_MB, 2)
+        if self.on_exceeded != "pause":
+            raise BandwidthBudgetExceeded(
+                f"Network budget exceeded: {used_mb} MB used of "
+                f"{round(self.budget_bytes / BYTES_PER_MB, 2)} MB"
+            )
 
-    def add_inbound_from_response(self, resp: Response) -> None:
-        # Prefer Content-Length; chunked responses may not have it.
+        log.warning(
+            "Network budget reached (%s MB); pausing crawl for %ss",
+            used_mb,
+            self.pause_seconds,
+            extra={"event": "budget_pause", "used_mb": used_mb},
+        )
+        await asyncio.sleep(self.pause_seconds)
+        # Concurrent workers may all wake up here; only the first opens a new window.
+        if self.budget_exceeded:
+            self._window_start_bytes = self.total_bytes
+
+    def add_bytes(
+        self,
+        *,
+        inbound: int = 0,
+        outbound: int = 0,
+        url: str = "",
+        resource_type: str = "other",
+    ) -> None:
+        """Count transferred bytes (headers included), attributed to a URL and resource type."""
+        inbound, outbound = max(0, int(inbound)), max(0, int(outbound))
+        self.inbound_bytes += inbound
+        self.outbound_bytes += outbound
+        NETWORK_BYTES.inc(inbound, direction="inbound")
+        NETWORK_BYTES.inc(outbound, direction="outbound")
+
+        total = inbound + outbound
+        for bucket, key in (
+            (self.by_resource_type, resource_type or "other"),
+            (self.by_host, urllib.parse.urlparse(url).netloc.lower() or "unknown"),
+        ):
+            entry = bucket.setdefault(key, {"requests": 0, "inbound": 0, "outbound": 0})
+            entry["requests"] += 1
+            entry["inbound"] += inbound
+            entry["outbound"] += outbound
+        if url and total:
+            self._url_bytes[url] = self._url_bytes.get(url, 0) + total
+            if len(self._url_bytes) > self.max_tracked_urls:
+                # Keep memory bounded on long crawls: drop the cheapest half.
+                keep = sorted(self._url_bytes.items(), key=lambda item: -item[1])
+                self._url_bytes = dict(keep[: self.max_tracked_urls // 2])
+
+    async def _account_finished(self, request: Request) -> None:
         try:
-            headers = resp.headers or {}
-            content_length = headers.get("content-length") or headers.get("Content-Length")
-            if content_length:
-                self.inbound_bytes += int(content_length)
+            sizes = await request.sizes()
         except Exception:
-            # Best-effort; ignore if header missing or malformed.
-            pass
+            # The request's resources may already be gone (tab closed); fall
+            # back to the body we sent.
+            sizes = {"requestBodySize": len((request.post_data or "").encode("utf-8"))}
+        self.add_bytes(
+            inbound=sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0),
+            outbound=sizes.get("requestBodySize", 0) + sizes.get("requestHeadersSize", 0),
+            url=request.url,
+            resource_type=request.resource_type,
+        )
 
-    def add_outbound_from_request(self, req: Request) -> None:
+    def _on_request_finished(self, request: Request) -> None:
+        # `sizes()` is async; account in a task and keep it until it is done.
+        task = asyncio.ensure_future(self._account_finished(request))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _on_request_failed(self, request: Request) -> None:
+        # Failed/aborted requests never got a response; only the body left us.
         try:
-            data = req.post_data or ""
-            # post_data is a string; approximate UTF-8 byte size.
-            self.outbound_bytes += len(data.encode("utf-8"))
+            body = len((request.post_data or "").encode("utf-8"))
         except Exception:
-            pass
+            body = 0
+        if body:
+            self.add_bytes(outbound=body, url=request.url, resource_type=request.resource_type)
+
+    def attach(self, target: Union[Page, BrowserContext]) -> None:
+        # Attaching to the context also covers tabs opened by the worker pool.
+        target.on("requestfinished", self._on_request_finished)
+        target.on("requestfailed", self._on_request_failed)
 
-    def attach(self, page: Page) -> None:
-        page.on("response", lambda r: self.add_inbound_from_response(r))
-        page.on("request", lambda q: self.add_outbound_from_request(q))
+    async def drain(self) -> None:
+        """Wait for in-progress size lookups so totals are complete."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def top_urls(self, n: int = 10) -> list[tuple[str, int]]:
+        return sorted(self._url_bytes.items(), key=lambda item: -item[1])[:n]
 
     def snapshot(self) -> dict:
         bytes_per_kb = 1024
@@ -50,8 +167,19 @@ class NetworkUsage:
                 "gigabytes": round(value_bytes / BYTES_PER_GB, 4),
             }
 
+        def breakdown(bucket: dict[str, dict[str, int]]) -> dict:
+            return {
+                key: {**entry, "megabytes": as_units(entry["inbound"] + entry["outbound"])["megabytes"]}
+                for key, entry in sorted(
+                    bucket.items(), key=lambda item: -(item[1]["inbound"] + item[1]["outbound"])
+                )
+            }
+
         return {
             "inbound": as_units(inbound_total_bytes),
             "outbound": as_units(outbound_total_bytes),
             "total": as_units(total_bytes),
+            "by_resource_type": breakdown(self.by_resource_type),
+            "by_host": breakdown(self.by_host),
+            "top_urls": [{"url": url, "bytes": size} for url, size in self.top_urls()],
         }
@@ -0,0 +1,140 @@
+import asyncio
+import random
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Optional
+
+# HTTP statuses that mean "slow down" rather than "this page is broken".
+THROTTLE_STATUSES = {403, 429, 503}
+
+
+@dataclass
+class _HostState:
+    requests_per_minute: float
+    tokens: float = 1.0
+    last_refill: float = field(default_factory=time.monotonic)
+    backoff_until: float = 0.0
+    consecutive_failures: int = 0
+    healthy_streak: int = 0
+
+
+class AdaptiveRateLimiter:
+    """Per-host token bucket that every navigation goes through.
+
+    Each host starts at `requests_per_minute` and adapts to what it observes:
+    after `recovery_after` healthy responses in a row the rate grows by
+    `recovery_factor` (up to `max_rpm`); a throttle signal (HTTP 403/429/503,
+    captcha page, timeout) halves it (down to `min_rpm`) and adds an
+    exponential backoff pause.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        *,
+        jitter: float = 0.3,
+        min_rpm: float = 1.0,
+        max_rpm: Optional[float] = None,
+        burst: float = 1.0,
+        recovery_after: int = 10,
+        recovery_factor: float = 1.2,
+        base_backoff_seconds: float = 30.0,
+        max_backoff_seconds: float = 600.0,
+    ) -> None:
+        self.requests_per_minute = max(0.01, float(requests_per_minute))
+        self.jitter = max(0.0, float(jitter))
+        self.min_rpm = max(0.01, float(min_rpm))
+        self.max_rpm = float(max_rpm) if max_rpm else self.requests_per_minute * 4
+        self.burst = max(1.0, float(burst))
+        self.recovery_after = max(1, int(recovery_after))
+        self.recovery_factor = max(1.0, float(recovery_factor))
+        self.base_backoff_seconds = max(0.0, float(base_backoff_seconds))
+        self.max_backoff_seconds = max(0.0, float(max_backoff_seconds))
+        self._hosts: dict[str, _HostState] = {}
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urllib.parse.urlparse(url or "").netloc.lower()
+
+    def _state(self, url: str) -> _HostState:
+        host = self._host(url)
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(requests_per_minute=self.requests_per_minute, tokens=self.burst)
+            self._hosts[host] = state
+        return state
+
+    def current_rpm(self, url: str) -> float:
+        return self._state(url).requests_per_minute
+
+    def _refill(self, state: _HostState, now: float) -> None:
+        rate_per_second = state.requests_per_minute / 60.0
+        state.tokens = min(self.burst, state.tokens + (now - state.last_refill) * rate_per_second)
+        state.last_refill = now
+
+    async def acquire(self, url: str) -> None:
+        """Wait until a request to `url`'s host is allowed."""
+        state = self._state(url)
+        while True:
+            now = time.monotonic()
+            if now < state.backoff_until:
+                await asyncio.sleep(state.backoff_until - now)
+                continue
+            self._refill(state, now)
+            if state.tokens >= 1.0:
+                state.tokens -= 1.0
+                break
+            rate_per_second = state.requests_per_minute / 60.0
+            await asyncio.sleep((1.0 - state.tokens) / rate_per_second)
+
+        if self.jitter:
+            interval = 60.0 / state.requests_per_minute
+            await asyncio.sleep(random.uniform(0.0, self.jitter * interval))
+
+    async def wait_for_backoff(self, url: str) -> None:
+        """Sit out `url`'s host backoff without taking a token.
+
+        For a retry of a request that already paid for its token (e.g. the
+        browser fallback after a failed plain-HTTP fetch).
+        """
+        state = self._state(url)
+        while (remaining := state.backoff_until - time.monotonic()) > 0:
+            await asyncio.sleep(remaining)
+
+    def record_success(self, url: str) -> None:
+        state = self._state(url)
+        state.consecutive_failures = 0
+        state.healthy_streak += 1
+        if state.healthy_streak >= self.recovery_after:
+            state.healthy_streak = 0
+            state.requests_per_minute = min(
+                self.max_rpm, state.requests_per_minute * self.recovery_factor
+            )
+
+    def record_throttle(self, url: str) -> None:
+        state = self._state(url)
+        state.healthy_streak = 0
+        state.consecutive_failures += 1
+        state.requests_per_minute = max(self.min_rpm, state.requests_per_minute / 2.0)
+        backoff = min(
+            self.max_backoff_seconds,
+            self.base_backoff_seconds * (2 ** (state.consecutive_failures - 1)),
+        )
+        backoff *= random.uniform(1.0, 1.0 + self.jitter)
+        state.backoff_until = max(state.backoff_until, time.monotonic() + backoff)
+        state.tokens = 0.0
+
+    def observe(
+        self,
+        url: str,
+        *,
+        status: Optional[int] = None,
+        captcha: bool = False,
+        timeout: bool = False,
+    ) -> None:
+        """Feed the outcome of a navigation back into the limiter."""
+        if captcha or timeout or (status is not None and status in THROTTLE_STATUSES):
+            self.record_throttle(url)
+        else:
+            self.record_success(url)
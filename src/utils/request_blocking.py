@@ -0,0 +1,39 @@
+from typing import Iterable, Union
+
+from playwright.async_api import BrowserContext, Page, Route
+
+
+class RequestBlocker:
+    """Aborts requests we never need (images, fonts, trackers) via `route`.
+
+    Blocking happens at the network layer only; DOM attributes such as the
+    gallery `data-zoom`/`src` values are still present and readable.
+    """
+
+    def __init__(
+        self,
+        resource_types: Iterable[str] = (),
+        url_patterns: Iterable[str] = (),
+    ) -> None:
+        self.resource_types = {t.strip().lower() for t in resource_types if t.strip()}
+        self.url_patterns = [p for p in url_patterns if p]
+        self.blocked_requests = 0
+        self.allowed_requests = 0
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if (resource_type or "").lower() in self.resource_types:
+            return True
+        return any(pattern in url for pattern in self.url_patterns)
+
+    async def handle(self, route: Route) -> None:
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked_requests += 1
+            await route.abort()
+        else:
+            self.allowed_requests += 1
+            await route.continue_()
+
+    async def install(self, target: Union[Page, BrowserContext]) -> None:
+        # Installing on the context covers every tab, including worker pool tabs.
+        await target.route("**/*", self.handle)
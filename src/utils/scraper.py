@@ -1,9 +1,15 @@
 import asyncio
+import logging
 import random
 from playwright.async_api import Page
 from typing import Optional, Tuple
 import urllib.parse
 
+from utils.strings import to_slug
+from utils.timing import timings
+
+log = logging.getLogger(__name__)
+
 def get_element_by_id(page: Page, element_id: str):
     return page.locator(f"#{element_id}").first
 
@@ -16,6 +22,16 @@ async def scroll_like_human(
     max_scrolls: int = 30,
     is_reverse: bool = False,
 ) -> None:
+    with timings.span("scroll"):
+        await _scroll_like_human(page, delay, max_scrolls, is_reverse)
+
+
+async def _scroll_like_human(
+    page: Page,
+    delay: float,
+    max_scrolls: int,
+    is_reverse: bool,
+) -> None:
 
     # This gets the scroll height of the body of the page
     previous_height = await page.evaluate("document.body.scrollHeight")
@@ -35,13 +51,14 @@ async def scroll_like_human(
         """)
 
         # 2. Wait for the smooth animation AND the network
-        await asyncio.sleep(delay)
+        with timings.span("sleep.scroll"):
+            await asyncio.sleep(delay)
         
         if is_reverse:
             # Check if we've reached the top of the page
             current_scroll_pos = await page.evaluate("window.pageYOffset")
             if current_scroll_pos <= 0:
-                print("Reached the top of the page.")
+                log.debug("Reached the top of the page.", extra={"event": "scroll_top_reached"})
                 break
             continue
 
@@ -53,12 +70,102 @@ async def scroll_like_human(
 
         # Logic: If height hasn't changed AND we are at the bottom, we are done
         if new_height == previous_height and current_scroll_pos >= new_height:
-            print("Reached the end of the page.")
+            log.debug("Reached the end of the page.", extra={"event": "scroll_end_reached"})
             break
             
         previous_height = new_height
 
-async def get_current_page_number(page: Page) -> str:
+# Scrolls inside the page until the expected cards are present or the DOM has
+# been quiet (no MutationObserver records) for `idleMs` at the bottom of the
+# page. One evaluate round trip instead of several per step.
+SCROLL_UNTIL_LOADED_SCRIPT = """
+async ({ itemSelector, expectedItems, stepMin, stepMax, delayMin, delayMax, idleMs, timeoutMs, maxSteps }) => {
+    const count = () => (itemSelector ? document.querySelectorAll(itemSelector).length : 0);
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+    const between = (low, high) => low + Math.random() * Math.max(0, high - low);
+    let lastChange = performance.now();
+    const observer = new MutationObserver(() => { lastChange = performance.now(); });
+    observer.observe(document.body, { childList: true, subtree: true });
+    const started = performance.now();
+    let steps = 0;
+    let reason = "timeout";
+    try {
+        while (performance.now() - started < timeoutMs) {
+            if (expectedItems && count() >= expectedItems) { reason = "complete"; break; }
+            if (maxSteps && steps >= maxSteps) { reason = "max_steps"; break; }
+            window.scrollBy(0, Math.round(between(stepMin, stepMax)));
+            steps += 1;
+            await sleep(between(delayMin, delayMax));
+            const bottom = window.scrollY + window.innerHeight >= document.documentElement.scrollHeight - 2;
+            if (bottom && performance.now() - lastChange >= idleMs) { reason = "idle"; break; }
+        }
+    } finally {
+        observer.disconnect();
+    }
+    return { items: count(), steps, reason };
+}
+"""
+
+
+async def scroll_until_loaded(
+    page: Page,
+    *,
+    item_selector: Optional[str] = None,
+    expected_items: int = 0,
+    humanize_scale: float = 0.0,
+    idle_ms: int = 1000,
+    timeout_seconds: float = 30.0,
+    max_steps: int = 0,
+) -> dict:
+    """Scroll until lazy-loaded items stop appearing; returns `{items, steps, reason}`.
+
+    Resolves as soon as `expected_items` elements match `item_selector`, or once
+    the page bottom is reached and no DOM mutation happened for `idle_ms`.
+    `humanize_scale` > 0 uses shorter, slower, jittered steps.
+    """
+    if humanize_scale > 0:
+        steps = {"stepMin": 250, "stepMax": 700, "delayMin": 200 * humanize_scale, "delayMax": 900 * humanize_scale}
+    else:
+        steps = {"stepMin": 1200, "stepMax": 1600, "delayMin": 50, "delayMax": 100}
+    with timings.span("scroll"):
+        return await page.evaluate(
+            SCROLL_UNTIL_LOADED_SCRIPT,
+            {
+                "itemSelector": item_selector,
+                "expectedItems": max(0, int(expected_items)),
+                "idleMs": max(0, int(idle_ms)),
+                "timeoutMs": max(0, int(timeout_seconds * 1000)),
+                "maxSteps": max(0, int(max_steps)),
+                **steps,
+            },
+        )
+
+
+def build_search_url(
+    base_url: str,
+    city_query: str,
+    page_number: int = 1,
+    *,
+    results_per_page: int = 50,
+) -> str:
+    """Build a results-page URL for a city and page number.
+
+    "Caracas, Distrito Capital" maps to `<base>/distrito-capital/caracas/` and
+    page N > 1 appends `_Desde_<offset>_NoIndex_True` with a 1-based offset,
+    the same scheme `get_current_page_number` parses.
+    """
+    parts = [p.strip() for p in (city_query or "").split(",") if p.strip()]
+    location = "/".join(to_slug(p) for p in reversed(parts))
+    url = base_url.rstrip("/") + "/"
+    if location:
+        url += f"{location}/"
+    if page_number > 1:
+        offset = (page_number - 1) * results_per_page + 1
+        url += f"_Desde_{offset}_NoIndex_True"
+    return url
+
+
+async def get_current_page_number(page: Page, *, results_per_page: int = 50) -> str:
     # Try common DOM selectors first
     selectors = [
         'button[aria-current="true"]',
@@ -87,29 +194,16 @@ async def get_current_page_number(page: Page) -> str:
         # MercadoLibre uses offsets sometimes — compute approximate page
         try:
             offset = int(m.group(1))
-            per_page = 50  # adjust if your search shows different results per page
-            return str(offset // per_page + 1)
+            return str(offset // results_per_page + 1)
         except Exception:
             return m.group(1)
     return "unknown"
 
-async def extract_coordinates_from_staticmap(
-    page: Page,
-    class_name: str,
-) -> Tuple[Optional[float], Optional[float]]:
-    """Extract latitude/longitude from a Google Static Maps <img> by parsing its src.
-
-    Looks for an element with the given class name, reads its `src`, parses the
-    `center=<lat>,<lon>` query param, and returns floats if available.
-    """
+def parse_staticmap_center(src: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    """Parse latitude/longitude from a Google Static Maps URL's `center` param."""
+    if not src:
+        return None, None
     try:
-        img = page.locator(f".{class_name}").first
-        if await img.count() == 0:
-            return None, None
-        src = await img.get_attribute("src")
-        if not src:
-            return None, None
-
         parsed = urllib.parse.urlparse(src)
         qs = urllib.parse.parse_qs(parsed.query)
         center_vals = qs.get("center")
@@ -127,3 +221,22 @@ async def extract_coordinates_from_staticmap(
             return None, None
     except Exception:
         return None, None
+
+
+async def extract_coordinates_from_staticmap(
+    page: Page,
+    class_name: str,
+) -> Tuple[Optional[float], Optional[float]]:
+    """Extract latitude/longitude from a Google Static Maps <img> by parsing its src.
+
+    Looks for an element with the given class name, reads its `src`, parses the
+    `center=<lat>,<lon>` query param, and returns floats if available.
+    """
+    try:
+        img = page.locator(f".{class_name}").first
+        if await img.count() == 0:
+            return None, None
+        src = await img.get_attribute("src")
+        return parse_staticmap_center(src)
+    except Exception:
+        return None, None
@@ -8,4 +8,9 @@ def to_snake_case(text):
         for c in normalized.lower().replace(' ', '_').replace('-', '_')
     )
     snake = re.sub(r'_+', '_', snake)
-    return snake.strip('_')
\ No newline at end of file
+    return snake.strip('_')
+
+
+def to_slug(text):
+    """URL slug as used in MercadoLibre paths: "San Cristóbal" -> "san-cristobal"."""
+    return to_snake_case(text).replace('_', '-')
@@ -0,0 +1,132 @@
+"""Per-stage wall-clock timing for crawl runs.
+
+Wrap a stage in `with timings.span("goto"):` (works inside coroutines too) or
+record a measured duration with `timings.record(name, seconds)`. At the end of
+a run `timings.summary()` gives count, total and p50/p95/p99 per stage,
+`print_report()` logs it and `export_json(path)` writes it to disk.
+
+Memory per stage is constant: count, total, min and max are exact, and the
+percentiles come from a fixed-size uniform reservoir of samples (exact while a
+stage has fewer samples than `reservoir_size`).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import random
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+log = logging.getLogger(__name__)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class _StageStats:
+    __slots__ = ("count", "total", "min", "max", "reservoir")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.reservoir: list[float] = []
+
+
+class StageTimer:
+    def __init__(self, reservoir_size: int = 2048, *, seed: Optional[int] = None) -> None:
+        self.reservoir_size = max(1, reservoir_size)
+        self._stages: dict[str, _StageStats] = {}
+        self._random = random.Random(seed)
+        self.started_at = time.perf_counter()
+
+    def record(self, stage: str, seconds: float) -> None:
+        seconds = max(0.0, seconds)
+        stats = self._stages.get(stage)
+        if stats is None:
+            stats = self._stages[stage] = _StageStats()
+        stats.count += 1
+        stats.total += seconds
+        stats.min = min(stats.min, seconds)
+        stats.max = max(stats.max, seconds)
+        if len(stats.reservoir) < self.reservoir_size:
+            stats.reservoir.append(seconds)
+        else:
+            # Reservoir sampling (Algorithm R): every sample is kept with equal probability.
+            slot = self._random.randrange(stats.count)
+            if slot < self.reservoir_size:
+                stats.reservoir[slot] = seconds
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def reset(self) -> None:
+        self._stages.clear()
+        self.started_at = time.perf_counter()
+
+    def summary(self) -> dict[str, dict]:
+        stats: dict[str, dict] = {}
+        for stage, s in sorted(self._stages.items()):
+            ordered = sorted(s.reservoir)
+            stats[stage] = {
+                "count": s.count,
+                "total_s": round(s.total, 3),
+                "mean_ms": round(s.total / s.count * 1000, 1),
+                "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+                "min_ms": round(s.min * 1000, 1),
+                "max_ms": round(s.max * 1000, 1),
+            }
+        return stats
+
+    def snapshot(self) -> dict:
+        return {
+            "wall_s": round(time.perf_counter() - self.started_at, 3),
+            "stages": self.summary(),
+        }
+
+    def print_report(self) -> None:
+        snap = self.snapshot()
+        log.info("Stage timings (wall %s s)", snap["wall_s"], extra={"event": "timings", "wall_s": snap["wall_s"]})
+        for stage, s in sorted(snap["stages"].items(), key=lambda item: -item[1]["total_s"]):
+            log.info(
+                "%-22s n=%-6d total=%9.2fs p50=%8.1fms p95=%8.1fms p99=%8.1fms",
+                stage,
+                s["count"],
+                s["total_s"],
+                s["p50_ms"],
+                s["p95_ms"],
+                s["p99_ms"],
+                extra={"event": "stage_timing", "stage": stage, **s},
+            )
+
+    def export_json(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+        return path
+
+
+# Process-wide timer shared by every crawl stage.
+timings = StageTimer()
+
+
+def report_timings(export_path: Optional[str] = None) -> None:
+    timings.print_report()
+    if export_path:
+        log.info("Stage timings written to %s", timings.export_json(export_path))
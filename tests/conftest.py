@@ -1,6 +1,8 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Ensure repository root is on sys.path so imports like `utils.*` work when
 # running tests without installing the project as a package.
 ROOT = Path(__file__).resolve().parents[1]
@@ -9,3 +11,21 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+
+@pytest.fixture
+async def sqlite_db(tmp_path, monkeypatch):
+    """Migrated SQLite database for one test; yields `db.session`.
+
+    Both engines are reset before and after, so pooled (async) connections do
+    not leak into the next test.
+    """
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{(tmp_path / 'test.db').as_posix()}")
+    monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+
+    import db.session as db_session
+
+    await db_session.reset_engine()
+    db_session.init_db()
+    yield db_session
+    await db_session.reset_engine()
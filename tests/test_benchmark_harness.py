@@ -0,0 +1,97 @@
+import httpx
+import pytest
+from sqlalchemy import create_engine, text
+
+from benchmarks.fake_site import Corpus, FakeMercadoLibre
+from benchmarks.harness import benchmark_env, compare_to_baseline
+from benchmarks.probes import DbWriteCounter, tree_rss_bytes
+from scraper.http_fetch import HttpListingFetcher
+from scraper.parser import parse_listing_html
+from utils.scraper import build_search_url
+
+
+@pytest.fixture
+def site():
+    with FakeMercadoLibre(Corpus.synthetic(pages=2, per_page=3)) as server:
+        yield server
+
+
+def test_fake_site_serves_paginated_results_and_detail_pages(site):
+    base = f"{site.base_url}/apartamentos/venta"
+    first = httpx.get(build_search_url(base, "Caracas, Distrito Capital", 1, results_per_page=3)).text
+    last = httpx.get(build_search_url(base, "Caracas, Distrito Capital", 2, results_per_page=3)).text
+
+    assert first.count('class="ui-search-layout__item"') == 3
+    assert "andes-pagination__button--next" in first
+    assert "andes-pagination__button--next" not in last
+    assert f'href="{site.base_url}/MLV-100003-' in last
+
+    fields = parse_listing_html(httpx.get(f"{site.base_url}/MLV-100000-apartamento-benchmark-_JM").text)
+    assert fields["title"] == "Apartamento benchmark 100000"
+    assert fields["url"].startswith(f"{site.base_url}/MLV-100000")
+    assert site.requests == {"results": 2, "listing": 1}
+
+
+@pytest.mark.asyncio
+async def test_fake_detail_pages_stay_on_the_http_fetch_path(site):
+    fetcher = HttpListingFetcher(http2=False)
+    html = await fetcher.fetch_listing_html(f"{site.base_url}/MLV-100001-apartamento-benchmark-_JM")
+    await fetcher.aclose()
+
+    assert html is not None
+    assert (fetcher.fetched, fetcher.escalated) == (1, 0)
+
+
+def test_saved_corpus_links_are_rewritten_to_the_local_server(tmp_path):
+    (tmp_path / "results").mkdir()
+    (tmp_path / "listings").mkdir()
+    (tmp_path / "results" / "001.html").write_text(
+        '<li class="ui-search-layout__item"><a href="https://apartamento.mercadolibre.com.ve/MLV-42-x">x</a></li>',
+        encoding="utf-8",
+    )
+    (tmp_path / "listings" / "MLV-42.html").write_text('<h1 class="ui-pdp-title">saved</h1>', encoding="utf-8")
+
+    corpus = Corpus.from_directory(tmp_path)
+    with FakeMercadoLibre(corpus) as server:
+        page = httpx.get(f"{server.base_url}/apartamentos/venta/").text
+        detail = httpx.get(f"{server.base_url}/MLV-42-x").text
+
+    assert f'href="{server.base_url}/MLV-42-x"' in page
+    assert "saved" in detail
+
+
+def test_benchmark_env_disables_pacing_and_points_at_the_fake_site(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    env = benchmark_env("http://127.0.0.1:1234", tmp_path, results_per_page=3)
+
+    assert env["SEARCH_BASE_URL"] == "http://127.0.0.1:1234/apartamentos/venta"
+    assert env["MERCADOLIBRE_APARTAMENTOS_URL"] == env["SEARCH_BASE_URL"]
+    assert env["HUMANIZE_DELAY_SCALE"] == "0"
+    assert env["HTTP_FETCH_ENABLED"] == "0"
+    assert env["DATABASE_URL"].endswith("benchmark.db")
+    # Tunables already in the environment are kept.
+    assert env["LOG_LEVEL"] == "DEBUG"
+
+
+def test_db_write_counter_counts_write_statements_and_rows():
+    engine = create_engine("sqlite://")
+    counter = DbWriteCounter().install()
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+            conn.execute(text("INSERT INTO t (x) VALUES (:x)"), [{"x": 1}, {"x": 2}, {"x": 3}])
+            conn.execute(text("SELECT * FROM t"))
+            conn.execute(text("UPDATE t SET x = 0"))
+    finally:
+        counter.uninstall()
+
+    assert (counter.statements, counter.rows, counter.commits) == (2, 4, 1)
+
+
+def test_compare_to_baseline_flags_regressions_in_either_direction():
+    baseline = {"listings_per_sec": 10.0, "protocol_calls_per_listing": 20.0, "peak_rss_mb": 500.0}
+    result = {"listings_per_sec": 8.0, "protocol_calls_per_listing": 21.0, "peak_rss_mb": 400.0}
+
+    problems = compare_to_baseline(result, baseline, max_regression=0.10)
+    assert len(problems) == 1 and problems[0].startswith("listings_per_sec")
+    assert tree_rss_bytes() > 0
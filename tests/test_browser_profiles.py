@@ -0,0 +1,23 @@
+import pytest
+
+from scraper.browser_profiles import get_browser_profile
+
+
+def test_production_profile_is_headless_and_lean():
+    profile = get_browser_profile("Production")
+    kwargs = profile.launch_kwargs()
+
+    assert kwargs["headless"] is True
+    assert "slow_mo" not in kwargs
+    assert "--disable-gpu" in kwargs["args"]
+    assert profile.context_kwargs()["viewport"] == {"width": 1024, "height": 768}
+
+
+def test_debug_profile_keeps_the_visible_slowed_browser():
+    assert get_browser_profile("debug").launch_kwargs() == {"headless": False, "slow_mo": 100}
+    assert get_browser_profile("debug").context_kwargs() == {}
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        get_browser_profile("turbo")
@@ -0,0 +1,141 @@
+import pytest
+from sqlmodel import Session, select
+
+
+FIELDS = {
+    "price": "85000",
+    "title": "Apartamento en Chacao",
+    "p_type": "Apartamento",
+    "listing_type": "Venta",
+    "description": "Luminoso,  con vista.",
+    "specs": ["80 m² totales", "2 habitaciones"],
+    "map_src": None,
+    "images": ["https://http2.mlstatic.com/b.jpg", "https://http2.mlstatic.com/a.jpg"],
+}
+
+
+def test_fingerprints_ignore_whitespace_case_and_image_order():
+    from scraper.fingerprint import card_fingerprint, content_fingerprint
+
+    reordered = dict(FIELDS, description="luminoso, con\nvista.", images=list(reversed(FIELDS["images"])))
+    assert content_fingerprint(reordered) == content_fingerprint(FIELDS)
+    # The price is tracked daily, so it does not count as a content change.
+    assert content_fingerprint(dict(FIELDS, price="1")) == content_fingerprint(FIELDS)
+    assert content_fingerprint(dict(FIELDS, specs=["81 m² totales"])) != content_fingerprint(FIELDS)
+
+    card = {"snippet": "Apartamento  85.000", "price": "85.000"}
+    assert card_fingerprint(card) == card_fingerprint({"snippet": "apartamento 85.000", "price": "85.000"})
+    assert card_fingerprint(card) != card_fingerprint(dict(card, price="80.000"))
+
+
+@pytest.mark.asyncio
+async def test_changed_cards_are_revisited_and_unchanged_content_only_records_a_price(sqlite_db):
+    from db.models import Listing, ListingPrice
+    from db.writer import close_listing_writer
+    from scraper.fingerprint import card_fingerprint, content_fingerprint
+    from scraper.scraper import queue_listing_fields, select_hrefs_to_visit
+
+    same = {"href": "https://apartamento.mercadolibre.com.ve/MLV-111-same", "price": "85.000", "snippet": "a"}
+    edited = {"href": "https://apartamento.mercadolibre.com.ve/MLV-222-edited", "price": "40.000", "snippet": "b"}
+    legacy = {"href": "https://apartamento.mercadolibre.com.ve/MLV-333-legacy", "price": "10.000", "snippet": "c"}
+    with Session(sqlite_db.get_engine()) as session:
+        session.add(Listing(mercadolibre_listing_id="111", title="same", card_hash=card_fingerprint(same)))
+        session.add(
+            Listing(
+                mercadolibre_listing_id="222",
+                title=FIELDS["title"],
+                card_hash="stale",
+                content_hash=content_fingerprint(FIELDS),
+            )
+        )
+        session.add(Listing(mercadolibre_listing_id="333", title="legacy"))
+        session.commit()
+
+    card_state = {}
+    to_visit = await select_hrefs_to_visit([same, edited, legacy], card_state=card_state)
+    assert to_visit == [edited["href"]]
+    assert card_state[edited["href"]].content_hash == content_fingerprint(FIELDS)
+
+    # The detail page turns out identical: no listing row is rebuilt.
+    listing = await queue_listing_fields(
+        FIELDS,
+        mercadolibre_id="222",
+        city_query="Caracas, Distrito Capital",
+        source="http",
+        card=card_state[edited["href"]],
+    )
+    assert listing.title is None and listing.price == 85000.0
+    await close_listing_writer()
+
+    with Session(sqlite_db.get_engine()) as session:
+        hashes = dict(session.exec(select(Listing.mercadolibre_listing_id, Listing.card_hash)).all())
+        prices = session.exec(select(ListingPrice.mercadolibre_listing_id)).all()
+    # Legacy rows get their card fingerprint recorded on the first pass.
+    assert hashes == {"111": card_fingerprint(same), "222": card_fingerprint(edited), "333": card_fingerprint(legacy)}
+    assert sorted(prices) == ["111", "222", "333"]
+
+
+class FakeHttpFetcher:
+    async def fetch_listing_html(self, url):
+        return "<html></html>"
+
+
+@pytest.mark.asyncio
+async def test_worker_mode_rehashes_a_changed_card_and_skips_it_on_the_next_crawl(sqlite_db, monkeypatch):
+    import scraper.distributed as distributed
+    import scraper.scraper as scraper_module
+    from db.models import Listing
+    from db.models.crawl_job import JOB_KIND_LISTING, JOB_KIND_RESULTS_PAGE
+    from db.writer import close_listing_writer
+    from scraper.fingerprint import card_fingerprint, content_fingerprint
+    from scraper.work_queue import ClaimedJob, WorkQueue
+
+    city = "Caracas, Distrito Capital"
+    edited = {"href": "https://apartamento.mercadolibre.com.ve/MLV-222-edited", "price": "40.000", "snippet": "b"}
+    with Session(sqlite_db.get_engine()) as session:
+        session.add(
+            Listing(
+                mercadolibre_listing_id="222",
+                title=FIELDS["title"],
+                card_hash="stale",
+                content_hash=content_fingerprint(FIELDS),
+            )
+        )
+        session.commit()
+
+    class FakeResultsPage:
+        async def wait_for_selector(self, selector, timeout=None):
+            pass
+
+    async def collect_listing_hrefs(page, *, card_state=None):
+        return await scraper_module.select_hrefs_to_visit([edited], card_state=card_state)
+
+    async def no_goto(page, url, **kwargs):
+        pass
+
+    async def parse_fields(html):
+        return FIELDS
+
+    monkeypatch.setattr(distributed, "collect_listing_hrefs", collect_listing_hrefs)
+    monkeypatch.setattr(distributed, "paced_goto", no_goto)
+    monkeypatch.setattr(distributed, "MAX_RESULT_PAGES", 1)
+    monkeypatch.setattr(distributed, "HTTP_FETCH_ENABLED", True)
+    monkeypatch.setattr(scraper_module, "_http_fetcher", FakeHttpFetcher())
+    monkeypatch.setattr(scraper_module, "parse_listing_html_off_loop", parse_fields)
+
+    queue = WorkQueue("node-a")
+    results_job = ClaimedJob(0, JOB_KIND_RESULTS_PAGE, "https://x.test/caracas/", city, 1, 0)
+    await distributed.process_results_page(FakeResultsPage(), results_job, queue)
+    (job,) = queue.claim(10)
+    assert (job.kind, job.card_hash) == (JOB_KIND_LISTING, card_fingerprint(edited))
+
+    assert await distributed.process_listing(None, job)
+    await close_listing_writer()
+    with Session(sqlite_db.get_engine()) as session:
+        assert session.exec(select(Listing.card_hash)).one() == card_fingerprint(edited)
+
+    # The next crawl finds the fresh card hash and does not queue the listing again.
+    queue.clear(city)
+    await distributed.process_results_page(FakeResultsPage(), results_job, queue)
+    await close_listing_writer()
+    assert queue.claim(10) == []
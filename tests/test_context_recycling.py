@@ -0,0 +1,96 @@
+import pytest
+
+from scraper.recycling import ContextRecycler
+
+
+class FakeFrame:
+    def __init__(self, parent=None):
+        self.parent_frame = parent
+
+
+class FakeRequest:
+    def __init__(self, navigation=True, main_frame=True):
+        self._navigation = navigation
+        self.frame = FakeFrame(None if main_frame else FakeFrame())
+
+    def is_navigation_request(self):
+        return self._navigation
+
+
+class FakeContext:
+    def __init__(self, storage_state=None):
+        self.storage_state_in = storage_state
+        self.handlers = []
+        self.closed = False
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+    def emit(self, request):
+        for handler in self.handlers:
+            handler(request)
+
+    async def storage_state(self):
+        return {"cookies": [{"name": "_d2id", "value": "abc"}], "origins": []}
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePage:
+    def __init__(self, heap_bytes):
+        self.heap_bytes = heap_bytes
+
+    async def evaluate(self, script):
+        return self.heap_bytes
+
+
+def _recycler(**kwargs):
+    created = []
+
+    async def factory(**options):
+        context = FakeContext(options.get("storage_state"))
+        created.append(context)
+        return context
+
+    return ContextRecycler(factory, **kwargs), created
+
+
+@pytest.mark.asyncio
+async def test_recycles_after_n_main_frame_navigations_and_keeps_storage():
+    recycler, created = _recycler(max_navigations=2)
+    first = await recycler.start()
+
+    first.emit(FakeRequest())
+    first.emit(FakeRequest(navigation=False))
+    first.emit(FakeRequest(main_frame=False))
+    assert not await recycler.maybe_recycle()
+
+    first.emit(FakeRequest())
+    assert await recycler.maybe_recycle()
+
+    second = recycler.context
+    assert first.closed and second is created[1]
+    assert second.storage_state_in["cookies"][0]["name"] == "_d2id"
+    assert recycler.navigations == 0
+    assert recycler.recycles == 1
+
+
+@pytest.mark.asyncio
+async def test_recycles_when_page_memory_passes_threshold():
+    recycler, _ = _recycler(max_memory_mb=100)
+    await recycler.start()
+
+    assert not await recycler.maybe_recycle(FakePage(50 * 1024 * 1024))
+    assert await recycler.maybe_recycle(FakePage(150 * 1024 * 1024))
+
+
+@pytest.mark.asyncio
+async def test_disabled_thresholds_never_recycle():
+    recycler, created = _recycler()
+    context = await recycler.start()
+    for _ in range(1000):
+        context.emit(FakeRequest())
+    assert not await recycler.maybe_recycle(FakePage(10**10))
+    await recycler.close()
+    assert created[0].closed and len(created) == 1
@@ -0,0 +1,92 @@
+import pytest
+
+
+def test_async_url_swaps_in_async_drivers(monkeypatch):
+    from db.session import build_async_database_url
+
+    monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+    assert build_async_database_url("sqlite:///data/app.db") == "sqlite+aiosqlite:///data/app.db"
+    assert (
+        build_async_database_url("postgresql+psycopg2://u:p@db:5432/housing")
+        == "postgresql+psycopg://u:p@db:5432/housing"
+    )
+
+    monkeypatch.setenv("ASYNC_DATABASE_URL", "postgresql+asyncpg://u:p@db/housing")
+    assert build_async_database_url("postgresql://u:p@db/housing") == "postgresql+asyncpg://u:p@db/housing"
+
+
+@pytest.mark.asyncio
+async def test_async_session_reads_rows_written_by_the_sync_engine(tmp_path, monkeypatch):
+    from sqlmodel import Session, select
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{(tmp_path / 'test_async.db').as_posix()}")
+    monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+
+    import db.session as db_session
+    from db.models import Listing
+
+    await db_session.reset_engine()
+    db_session.init_db()
+    with Session(db_session.get_engine()) as session:
+        session.add(Listing(mercadolibre_listing_id="1", title="sync"))
+        session.commit()
+
+    try:
+        async with db_session.async_session() as session:
+            titles = (await session.exec(select(Listing.title))).all()
+        assert titles == ["sync"]
+        assert db_session._async_engine is not None
+    finally:
+        await db_session.reset_engine()
+    assert (db_session._engine, db_session._async_engine) == (None, None)
+
+
+def test_pool_settings_map_to_engine_arguments():
+    from sqlalchemy.engine import make_url
+
+    from db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, PoolSettings
+
+    settings = PoolSettings(size=3, max_overflow=1, pre_ping=False, statement_timeout_ms=15000)
+
+    pg = settings.engine_kwargs(make_url("postgresql+psycopg://u:p@db/housing"), is_async=False)
+    assert (pg["poolclass"], pg["pool_size"], pg["max_overflow"], pg["pool_pre_ping"]) == (
+        InstrumentedQueuePool,
+        3,
+        1,
+        False,
+    )
+    assert pg["connect_args"] == {"options": "-c statement_timeout=15000"}
+    lite = settings.engine_kwargs(make_url("sqlite+aiosqlite:///app.db"), is_async=True)
+    assert lite["poolclass"] is InstrumentedAsyncQueuePool and lite["connect_args"] == {}
+    assert "poolclass" not in settings.engine_kwargs(make_url("sqlite://"), is_async=False)
+
+
+def test_pool_reports_checkouts_overflow_and_timeouts(tmp_path):
+    from sqlalchemy import create_engine, exc
+
+    from db.pool import InstrumentedQueuePool
+    from utils.metrics import DB_POOL_CHECKOUTS, DB_POOL_IN_USE, DB_POOL_OVERFLOWS, DB_POOL_TIMEOUTS
+
+    engine = create_engine(
+        f"sqlite:///{(tmp_path / 'pool.db').as_posix()}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    checkouts = DB_POOL_CHECKOUTS.value(pool="sync")
+    overflows = DB_POOL_OVERFLOWS.value(pool="sync")
+    timeouts = DB_POOL_TIMEOUTS.value(pool="sync")
+
+    first, second = engine.connect(), engine.connect()
+    assert DB_POOL_IN_USE.value(pool="sync") == 2
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    first.close()
+    second.close()
+    engine.dispose()
+
+    assert DB_POOL_CHECKOUTS.value(pool="sync") - checkouts == 2
+    assert DB_POOL_OVERFLOWS.value(pool="sync") - overflows == 1
+    assert DB_POOL_TIMEOUTS.value(pool="sync") - timeouts == 1
+    assert DB_POOL_IN_USE.value(pool="sync") == 0
@@ -0,0 +1,68 @@
+import pytest
+from sqlmodel import Session, select
+
+
+@pytest.fixture
+def frontier(sqlite_db):
+    from scraper.frontier import CrawlFrontier
+
+    return CrawlFrontier(max_attempts=2)
+
+
+def _jobs():
+    import db.session as db_session
+    from db.models import CrawlJob
+
+    with Session(db_session.get_engine()) as session:
+        return {job.url: job for job in session.exec(select(CrawlJob)).all()}
+
+
+def test_resume_page_starts_at_first_unfinished_page(frontier):
+    from db.models.crawl_job import JOB_KIND_RESULTS_PAGE
+
+    assert frontier.resume_page("Caracas") == 1
+
+    for n in (1, 2, 3):
+        frontier.add_results_page("Caracas", n, f"https://x.test/caracas/p{n}")
+    frontier.mark_done(JOB_KIND_RESULTS_PAGE, ["https://x.test/caracas/p1", "https://x.test/caracas/p2"])
+    frontier.mark_in_flight(JOB_KIND_RESULTS_PAGE, "https://x.test/caracas/p3")
+    assert frontier.resume_page("Caracas") == 3
+    assert frontier.resume_page("Valencia") == 1
+
+    # Everything registered is done (crash between pages): continue after the last one.
+    frontier.mark_done(JOB_KIND_RESULTS_PAGE, ["https://x.test/caracas/p3"])
+    assert frontier.resume_page("Caracas") == 4
+
+    frontier.clear("Caracas")
+    assert frontier.resume_page("Caracas") == 1
+
+
+def test_listing_jobs_are_deduplicated_and_track_attempts(frontier):
+    from db.models.crawl_job import JOB_KIND_LISTING
+
+    frontier.add_listings("Caracas", ["https://x.test/MLV-1#position=1", "https://x.test/MLV-2"])
+    frontier.add_listings("Caracas", ["https://x.test/MLV-1#position=7"])
+    assert set(_jobs()) == {"https://x.test/MLV-1", "https://x.test/MLV-2"}
+
+    frontier.mark_done(JOB_KIND_LISTING, ["https://x.test/MLV-1#position=7"])
+    frontier.mark_failed(JOB_KIND_LISTING, {"https://x.test/MLV-2": "TimeoutError()"})
+    jobs = _jobs()
+    assert jobs["https://x.test/MLV-1"].status == "done"
+    assert (jobs["https://x.test/MLV-2"].status, jobs["https://x.test/MLV-2"].attempts) == ("pending", 1)
+    assert frontier.finished_listing_urls(["https://x.test/MLV-1#p", "https://x.test/MLV-2"]) == {
+        "https://x.test/MLV-1"
+    }
+
+    # Out of attempts: permanently failed and no longer retried.
+    frontier.mark_failed(JOB_KIND_LISTING, {"https://x.test/MLV-2": "TimeoutError()"})
+    assert _jobs()["https://x.test/MLV-2"].status == "failed"
+    assert "https://x.test/MLV-2" in frontier.finished_listing_urls(["https://x.test/MLV-2"])
+
+
+def test_reset_in_flight_requeues_jobs_from_a_crashed_run(frontier):
+    from db.models.crawl_job import JOB_KIND_RESULTS_PAGE
+
+    frontier.add_results_page("Caracas", 1, "https://x.test/p1")
+    frontier.mark_in_flight(JOB_KIND_RESULTS_PAGE, "https://x.test/p1")
+    assert frontier.reset_in_flight("Caracas") == 1
+    assert _jobs()["https://x.test/p1"].status == "pending"
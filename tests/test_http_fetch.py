@@ -0,0 +1,63 @@
+import httpx
+import pytest
+
+from scraper.http_fetch import HttpListingFetcher
+from scraper.parser import parse_listing_html
+from test_parser import LISTING_HTML
+from utils.network_usage import NetworkUsage
+from utils.rate_limiter import AdaptiveRateLimiter
+
+
+def _fetcher(handler, **kwargs):
+    return HttpListingFetcher(transport=httpx.MockTransport(handler), http2=False, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_server_rendered_listing_is_fetched_without_the_browser():
+    net = NetworkUsage()
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["cookie"] = request.headers.get("cookie")
+        seen["ua"] = request.headers.get("user-agent")
+        return httpx.Response(200, text=LISTING_HTML)
+
+    class FakeContext:
+        async def cookies(self):
+            return [{"name": "_d2id", "value": "abc", "domain": "apartamento.mercadolibre.com.ve", "path": "/"}]
+
+    fetcher = _fetcher(handler, net=net)
+    await fetcher.sync_from_context(FakeContext(), user_agent="Mozilla/5.0 Test")
+    html = await fetcher.fetch_listing_html("https://apartamento.mercadolibre.com.ve/MLV-123456-x")
+    await fetcher.aclose()
+
+    assert parse_listing_html(html)["title"] == "Apartamento en Chacao"
+    assert seen == {"cookie": "_d2id=abc", "ua": "Mozilla/5.0 Test"}
+    # Body plus response headers; request headers count as outbound.
+    assert net.inbound_bytes > len(LISTING_HTML.encode("utf-8"))
+    assert net.outbound_bytes > 0
+    assert net.by_resource_type["document"]["requests"] == 1
+    assert list(net.by_host) == ["apartamento.mercadolibre.com.ve"]
+    assert (fetcher.fetched, fetcher.escalated) == (1, 0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(429, text="slow down"),
+        httpx.Response(200, text="<html><body><div id='root'></div></body></html>"),
+    ],
+)
+async def test_blocked_or_client_rendered_pages_escalate(response):
+    limiter = AdaptiveRateLimiter(60, jitter=0)
+    fetcher = _fetcher(lambda request: response, rate_limiter=limiter)
+
+    assert await fetcher.fetch_listing_html("https://x.test/MLV-1") is None
+    await fetcher.aclose()
+    assert fetcher.escalated == 1
+
+
+def test_captcha_redirect_needs_browser():
+    assert HttpListingFetcher.needs_browser(200, "https://x.test/account-verification?go=1", "ui-pdp-title")
+    assert not HttpListingFetcher.needs_browser(200, "https://x.test/MLV-1", '<h1 class="ui-pdp-title">')
@@ -0,0 +1,45 @@
+from datetime import date
+
+import pytest
+from sqlmodel import Session, select
+
+
+@pytest.mark.asyncio
+async def test_select_hrefs_to_visit_skips_known_listings_and_records_card_price(sqlite_db):
+    from db.models import Listing, ListingPrice
+    from db.writer import close_listing_writer
+    from scraper.scraper import select_hrefs_to_visit
+
+    with Session(sqlite_db.get_engine()) as session:
+        session.add(Listing(mercadolibre_listing_id="111", title="known"))
+        session.commit()
+
+    cards = [
+        {"href": "https://apartamento.mercadolibre.com.ve/MLV-111-known", "price": "85.000"},
+        {"href": "https://apartamento.mercadolibre.com.ve/MLV-222-new", "price": "40.000"},
+        {"href": "https://apartamento.mercadolibre.com.ve/MLV-333-noprice", "price": None},
+    ]
+    to_visit = await select_hrefs_to_visit(cards)
+    await close_listing_writer()
+
+    assert to_visit == [cards[1]["href"], cards[2]["href"]]
+    with Session(sqlite_db.get_engine()) as session:
+        rows = session.exec(select(ListingPrice)).all()
+        assert [(r.mercadolibre_listing_id, r.day, r.price) for r in rows] == [
+            ("111", date.today(), 85000.0)
+        ]
+
+    # Re-running the same page on the same day does not duplicate price rows.
+    await select_hrefs_to_visit(cards)
+    await close_listing_writer()
+    with Session(sqlite_db.get_engine()) as session:
+        assert len(session.exec(select(ListingPrice)).all()) == 1
+
+
+def test_parse_card_price_strips_thousands_separators():
+    from scraper.parser import parse_card_price
+
+    assert parse_card_price("85.000") == 85000.0
+    assert parse_card_price(" 1.250.000 ") == 1250000.0
+    assert parse_card_price(None) is None
+    assert parse_card_price("Consultar") is None
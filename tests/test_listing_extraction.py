@@ -0,0 +1,104 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from scraper.parser import LISTING_FIELD_SELECTORS, dedupe_image_urls, parse_specs
+from scraper.scraper import (
+    LISTING_FIELDS_SCRIPT,
+    build_listing_from_fields,
+    extract_listing_fields,
+    paced_click_navigation,
+)
+from utils.rate_limiter import AdaptiveRateLimiter
+
+
+class FakeEvaluatePage:
+    def __init__(self, result: dict):
+        self.result = result
+        self.calls: list[tuple[str, dict]] = []
+
+    async def evaluate(self, script: str, arg=None):
+        self.calls.append((script, arg))
+        return self.result
+
+
+class FakeResponse:
+    def __init__(self, status: int):
+        self.status = status
+
+
+class FakeNavigationPage:
+    url = "https://listado.mercadolibre.com.ve/caracas/_Desde_49"
+
+    def __init__(self, status: int):
+        self.status = status
+
+    @asynccontextmanager
+    async def expect_navigation(self):
+        info = type("EventInfo", (), {})()
+        info.value = asyncio.get_running_loop().create_future()
+        yield info
+        info.value.set_result(FakeResponse(self.status))
+
+
+class FakeButton:
+    def __init__(self):
+        self.clicks = 0
+
+    async def click(self):
+        self.clicks += 1
+
+
+def test_parse_specs_reads_area_rooms_and_bathrooms():
+    area, rooms, bathrooms = parse_specs(["85 m² totales", "3 cuartos", "2 baños"])
+    assert (area, rooms, bathrooms) == ("85", "3", "2")
+
+
+def test_dedupe_image_urls_skips_inline_and_duplicates():
+    urls = ["https://img/1.jpg", "", "data:image/gif;base64,xx", "https://img/1.jpg", "https://img/2.jpg"]
+    assert dedupe_image_urls(urls) == ["https://img/1.jpg", "https://img/2.jpg"]
+
+
+@pytest.mark.asyncio
+async def test_extract_listing_fields_uses_a_single_evaluate_call():
+    page = FakeEvaluatePage({"price": "45000", "title": "Apto"})
+    fields = await extract_listing_fields(page)
+
+    assert fields["price"] == "45000"
+    assert page.calls == [(LISTING_FIELDS_SCRIPT, LISTING_FIELD_SELECTORS)]
+
+
+def test_build_listing_from_fields_runs_python_parsers():
+    fields = {
+        "price": "45000",
+        "title": "Apartamento en Chacao",
+        "p_type": "Apartamento",
+        "listing_type": "Apartamento",
+        "description": "Bonito",
+        "specs": ["120 m² totales", "3 cuartos", "2 baños"],
+        "map_src": "https://maps.google.com/staticmap?center=10.5%2C-66.9&zoom=15",
+        "images": ["https://img/1.jpg", "https://img/1.jpg", "data:x"],
+    }
+    listing = build_listing_from_fields(fields, mercadolibre_id="123", city="Caracas", state="Distrito Capital")
+
+    assert listing.mercadolibre_listing_id == "123"
+    assert listing.price == 45000.0
+    assert (listing.area, listing.rooms, listing.bathrooms) == (120.0, 3, 2)
+    assert (listing.latitude, listing.longitude) == (10.5, -66.9)
+    assert listing.images == ["https://img/1.jpg"]
+    assert listing.city == "Caracas"
+
+
+@pytest.mark.asyncio
+async def test_next_button_navigation_reports_throttling_to_the_rate_limiter(monkeypatch):
+    import scraper.scraper as scraper_module
+
+    limiter = AdaptiveRateLimiter(12, jitter=0, min_rpm=2)
+    monkeypatch.setattr(scraper_module, "rate_limiter", limiter)
+    button = FakeButton()
+
+    await paced_click_navigation(FakeNavigationPage(429), button)
+
+    assert button.clicks == 1
+    assert limiter.current_rpm(FakeNavigationPage.url) == 6
@@ -0,0 +1,160 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, select
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_listings_and_prices_into_one_commit(sqlite_db):
+    from db.models import Listing, ListingPrice
+    from db.writer import ListingWriter
+
+    async with ListingWriter(batch_size=100, flush_seconds=60) as writer:
+        for i in range(10):
+            await writer.add_listing(Listing(mercadolibre_listing_id=str(i), title=f"t{i}", price=float(i)))
+        # Same listing twice in one batch is collapsed.
+        await writer.add_listing(Listing(mercadolibre_listing_id="0", title="dup", price=99.0))
+        assert writer.stats.commits == 0
+
+    assert writer.stats.commits == 1
+    with Session(sqlite_db.get_engine()) as session:
+        listings = session.exec(select(Listing)).all()
+        prices = session.exec(select(ListingPrice)).all()
+    assert len(listings) == 10
+    assert len(prices) == 10
+    assert {p.day for p in prices} == {date.today()}
+    assert next(l for l in listings if l.mercadolibre_listing_id == "0").title == "t0"
+
+
+@pytest.mark.asyncio
+async def test_writer_updates_only_changed_columns_of_existing_rows(sqlite_db):
+    from db.models import Listing, ListingPrice
+    from db.writer import ListingWriter
+
+    async with ListingWriter() as writer:
+        await writer.add_listing(
+            Listing(mercadolibre_listing_id="1", title="original", description="same", rooms=2, price=10.0)
+        )
+
+    async with ListingWriter() as writer:
+        # A field missing from the fresh parse does not wipe the stored value.
+        await writer.add_listing(
+            Listing(mercadolibre_listing_id="1", title="changed", description="same", price=11.0)
+        )
+        await writer.add_price("1", 12.0)
+        await writer.add_price("unknown", 5.0)
+    assert writer.stats.listings_updated == 1
+
+    with Session(sqlite_db.get_engine()) as session:
+        listing = session.exec(select(Listing)).one()
+        prices = session.exec(select(ListingPrice)).all()
+    assert (listing.title, listing.description, listing.rooms) == ("changed", "same", 2)
+    # The listing price is the first seen one; daily prices live in listings_prices.
+    assert listing.price == 10.0
+    assert [(p.mercadolibre_listing_id, p.price) for p in prices] == [("1", 10.0)]
+
+
+@pytest.mark.asyncio
+async def test_write_batch_groups_updates_by_changed_columns_and_logs_changes(sqlite_db):
+    from benchmarks.probes import DbWriteCounter
+    from db.models import Listing, ListingChange
+    from db.writer import write_batch
+
+    def rows(*listings):
+        return [listing.model_dump(exclude={"id"}) for listing in listings]
+
+    await write_batch(rows(*(Listing(mercadolibre_listing_id=str(i), title="t", rooms=1) for i in range(4))), {})
+
+    fresh = [
+        Listing(mercadolibre_listing_id="0", title="new", rooms=1),
+        Listing(mercadolibre_listing_id="1", title="new", rooms=1),
+        Listing(mercadolibre_listing_id="2", title="t", rooms=3),
+        Listing(mercadolibre_listing_id="3", title="t", rooms=1),
+        Listing(mercadolibre_listing_id="4", title="brand new"),
+    ]
+    counter = DbWriteCounter().install()
+    try:
+        updated = await write_batch(rows(*fresh), {}, change_log=True)
+    finally:
+        counter.uninstall()
+
+    assert updated == 3
+    # Two UPDATEs (title; rooms), the change log and the insert of the new row.
+    assert (counter.statements, counter.rows) == (4, 1 + 2 + 3 + 1)
+    with Session(sqlite_db.get_engine()) as session:
+        stored = {l.mercadolibre_listing_id: (l.title, l.rooms) for l in session.exec(select(Listing))}
+        changes = {c.mercadolibre_listing_id: c.changes for c in session.exec(select(ListingChange))}
+    assert stored == {"0": ("new", 1), "1": ("new", 1), "2": ("t", 3), "3": ("t", 1), "4": ("brand new", None)}
+    assert changes == {"0": {"title": "t"}, "1": {"title": "t"}, "2": {"rooms": 1}}
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_when_batch_is_full(sqlite_db):
+    import asyncio
+
+    from db.models import Listing, ListingPrice
+    from db.writer import ListingWriter
+
+    writer = ListingWriter(batch_size=2, flush_seconds=60)
+    await writer.add_listing(Listing(mercadolibre_listing_id="a"))
+    for _ in range(50):
+        if writer.stats.commits:
+            break
+        await asyncio.sleep(0.01)
+    assert writer.stats.commits == 1
+    await writer.close()
+
+    with Session(sqlite_db.get_engine()) as session:
+        assert len(session.exec(select(ListingPrice)).all()) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings("ignore:Pydantic serializer warnings")
+async def test_writer_retries_then_drops_only_the_rows_that_keep_failing(sqlite_db):
+    from db.models import Listing, ListingPrice
+    from db.writer import ListingWriter
+
+    writer = ListingWriter(batch_size=100, flush_seconds=60, max_retries=1)
+    for mlvid in ("1", "2", "3"):
+        await writer.add_listing(Listing(mercadolibre_listing_id=mlvid, title=f"t{mlvid}", price=1.0))
+    # A value the driver cannot bind fails every batch it is part of.
+    await writer.add_listing(Listing(mercadolibre_listing_id="bad", title=object(), price=1.0))
+
+    with pytest.raises(Exception):
+        await writer.flush()
+    assert writer.pending == 8
+
+    await writer.flush()
+    await writer.close()
+
+    assert writer.pending == 0
+    assert writer.stats.rows_dropped == 2
+    with Session(sqlite_db.get_engine()) as session:
+        assert sorted(session.exec(select(Listing.mercadolibre_listing_id)).all()) == ["1", "2", "3"]
+        assert len(session.exec(select(ListingPrice)).all()) == 3
+
+
+@pytest.mark.asyncio
+async def test_close_listing_writer_logs_instead_of_raising(sqlite_db, monkeypatch):
+    import db.writer as writer_module
+    from db.models import Listing
+
+    async def broken_close(self):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(writer_module.ListingWriter, "close", broken_close)
+    await writer_module.get_listing_writer().add_listing(Listing(mercadolibre_listing_id="1"))
+
+    await writer_module.close_listing_writer()
+    assert writer_module._writer is None
+
+
+def test_bulk_upsert_compiles_on_conflict_for_postgres():
+    from db.models import ListingPrice
+
+    stmt = postgresql.insert(ListingPrice).on_conflict_do_nothing(
+        index_elements=["mercadolibre_listing_id", "day"]
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (mercadolibre_listing_id, day) DO NOTHING" in sql
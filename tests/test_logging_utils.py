@@ -1,5 +1,7 @@
+import gzip
+import json
+import logging
 import os
-from pathlib import Path
 
 import pytest
 
@@ -9,13 +11,24 @@ import src.utils.logging as logging_utils
 class FakePage:
     def __init__(self, url: str = "https://example.test/listing"):
         self.url = url
+        self.screenshots = []
 
     async def content(self) -> str:
         return "<html><body>hi</body></html>"
 
-    async def screenshot(self, *, path: str, full_page: bool = True) -> None:
-        # Simulate Playwright writing a screenshot file.
-        Path(path).write_bytes(b"PNG")
+    async def screenshot(self, **kwargs) -> bytes:
+        # Playwright returns the image bytes when no path is given.
+        self.screenshots.append(kwargs)
+        return b"JPEG"
+
+
+@pytest.fixture(autouse=True)
+def _reset_snapshot_state(monkeypatch):
+    monkeypatch.setattr(logging_utils, "_signature_counts", {})
+    monkeypatch.setattr(logging_utils, "_writer", None)
+    monkeypatch.setattr(logging_utils, "_POLICY", logging_utils.SnapshotPolicy())
+    yield
+    logging_utils.shutdown_logging()
 
 
 @pytest.mark.asyncio
@@ -28,15 +41,19 @@ async def test_setup_logger_creates_dir_and_log_failure_writes_files(tmp_path, m
 
     page = FakePage()
     await logging_utils.log_failure(page, href="https://example.test/href", exc=RuntimeError("boom"))
+    await logging_utils.flush_failure_snapshots()
 
-    html_files = list(log_dir.glob("failure_*.html"))
-    png_files = list(log_dir.glob("failure_*.png"))
+    html_files = list(log_dir.glob("failure_*.html.gz"))
+    jpg_files = list(log_dir.glob("failure_*.jpg"))
 
     assert len(html_files) == 1
-    assert len(png_files) == 1
+    assert len(jpg_files) == 1
+    # Viewport-only JPEG by default.
+    assert page.screenshots == [{"type": "jpeg", "quality": 60, "full_page": False}]
 
     # Sanity check: HTML snapshot has content
-    assert "<html" in html_files[0].read_text(encoding="utf-8")
+    with gzip.open(html_files[0], "rt", encoding="utf-8") as fh:
+        assert "<html" in fh.read()
 
 
 @pytest.mark.asyncio
@@ -45,8 +62,8 @@ async def test_log_failure_with_no_page_does_not_crash(tmp_path):
     logging_utils.setup_logger(str(log_dir), level="INFO")
 
     await logging_utils.log_failure(None, href=None, exc=ValueError("x"))
-    assert list(log_dir.glob("failure_*.html")) == []
-    assert list(log_dir.glob("failure_*.png")) == []
+    await logging_utils.flush_failure_snapshots()
+    assert list(log_dir.glob("failure_*")) == []
 
 
 @pytest.mark.asyncio
@@ -58,10 +75,79 @@ async def test_log_failure_handles_snapshot_errors(tmp_path, monkeypatch):
         async def content(self) -> str:
             raise RuntimeError("content failed")
 
-        async def screenshot(self, *, path: str, full_page: bool = True) -> None:
+        async def screenshot(self, **kwargs) -> bytes:
             raise RuntimeError("screenshot failed")
 
     await logging_utils.log_failure(BrokenPage(), href="x", exc=RuntimeError("boom"))
+    await logging_utils.flush_failure_snapshots()
     # Still should not create files.
-    assert list(log_dir.glob("failure_*.html")) == []
-    assert list(log_dir.glob("failure_*.png")) == []
+    assert list(log_dir.glob("failure_*")) == []
+
+
+@pytest.mark.asyncio
+async def test_repeated_signatures_are_deduplicated_and_sampling_skips_capture(tmp_path):
+    log_dir = tmp_path / "logs"
+    logging_utils.setup_logger(
+        str(log_dir), policy=logging_utils.SnapshotPolicy(max_per_signature=2, screenshot="off")
+    )
+
+    page = FakePage()
+    for listing_id in range(5):
+        # Same error apart from the id -> same signature.
+        exc = TimeoutError(f"Timeout waiting for MLV-{listing_id}")
+        await logging_utils.log_failure(page, href=None, exc=exc, extra={"step": "listing"})
+    await logging_utils.flush_failure_snapshots()
+
+    assert len(list(log_dir.glob("failure_*.html.gz"))) == 2
+    assert page.screenshots == []
+
+    logging_utils.setup_logger(str(log_dir), policy=logging_utils.SnapshotPolicy(sample_rate=0.0))
+    await logging_utils.log_failure(page, href=None, exc=KeyError("other"))
+    await logging_utils.flush_failure_snapshots()
+    assert len(list(log_dir.glob("failure_*"))) == 2
+
+
+def test_error_signature_ignores_numbers_and_urls():
+    first = logging_utils.error_signature(ValueError("bad price 123 at https://a.test/MLV-1"), "listing")
+    second = logging_utils.error_signature(ValueError("bad price 99 at https://a.test/MLV-2"), "listing")
+    assert first == second
+    assert first != logging_utils.error_signature(ValueError("bad price 1"), "results_page")
+
+
+def test_rotate_snapshots_deletes_oldest_first(tmp_path):
+    for i in range(4):
+        path = tmp_path / f"failure_{i}.jpg"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 + i, 1000 + i))
+    (tmp_path / "other.txt").write_bytes(b"x" * 1000)
+
+    assert logging_utils.rotate_snapshots(str(tmp_path), 250) == 2
+    assert sorted(p.name for p in tmp_path.glob("failure_*")) == ["failure_2.jpg", "failure_3.jpg"]
+
+
+def test_setup_logger_writes_structured_json_lines(tmp_path):
+    log_file = tmp_path / "scraper.jsonl"
+    logging_utils.setup_logger(str(tmp_path), level="INFO", log_format="json", log_file=str(log_file))
+
+    logger = logging.getLogger("scraper.test")
+    logger.debug("hidden")
+    logger.info("Queued listing %s", "MLV-1", extra={"event": "listing_queued", "listing_id": "MLV-1"})
+    try:
+        raise ValueError("bad card")
+    except ValueError:
+        logger.exception("parse failed")
+    # Stopping the listener flushes everything queued so far.
+    logging_utils.shutdown_logging()
+
+    records = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    assert [r["msg"] for r in records] == ["Queued listing MLV-1", "parse failed"]
+    assert records[0]["event"] == "listing_queued" and records[0]["listing_id"] == "MLV-1"
+    assert records[0]["level"] == "info" and records[0]["logger"] == "scraper.test"
+    assert "ValueError: bad card" in records[1]["exc"]
+
+
+def test_console_formatter_appends_fields():
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "Scraped %s", ("MLV-1",), None)
+    record.event = "listing_queued"
+    record.source = "http"
+    assert logging_utils.ConsoleFormatter().format(record) == "Scraped MLV-1  source=http"
@@ -0,0 +1,68 @@
+import asyncio
+import importlib
+
+import pytest
+
+from utils.metrics import Counter, Histogram, MetricsServer, Registry, render_metrics
+
+
+def test_counter_and_histogram_render_prometheus_text():
+    registry = Registry()
+    pages = registry.register(Counter("pages_total", "Pages.", ["status"]))
+    latency = registry.register(Histogram("write_seconds", "Writes.", buckets=(0.1, 1.0)))
+
+    pages.inc(status="2xx")
+    pages.inc(2, status="2xx")
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    text = registry.render()
+
+    assert "# TYPE pages_total counter" in text
+    assert 'pages_total{status="2xx"} 3' in text
+    assert 'write_seconds_bucket{le="0.1"} 1' in text
+    assert 'write_seconds_bucket{le="1"} 2' in text
+    assert 'write_seconds_bucket{le="+Inf"} 2' in text
+    assert "write_seconds_count 2" in text
+
+
+def test_labels_must_match_declaration():
+    pages = Counter("pages_total", "Pages.", ["status"])
+    with pytest.raises(ValueError):
+        pages.inc(host="x")
+    with pytest.raises(ValueError):
+        pages.inc(-1, status="2xx")
+
+
+@pytest.mark.asyncio
+async def test_scraper_metrics_server_serves_registry():
+    async with MetricsServer("127.0.0.1", 0) as server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode("utf-8")
+        writer.close()
+
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert "scraper_listings_scraped_total" in response
+
+
+def test_api_exposes_metrics_with_route_templates(sqlite_db):
+    import backend.main as backend_main
+
+    importlib.reload(backend_main)
+
+    from fastapi.testclient import TestClient
+
+    with TestClient(backend_main.app) as client:
+        assert client.get("/listing/MLV-1").status_code == 200
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/listing/{listing_id}",status="200"}'
+        in response.text
+    )
+    assert "MLV-1" not in response.text
+    assert render_metrics().startswith("# HELP")
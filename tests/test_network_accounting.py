@@ -0,0 +1,77 @@
+import pytest
+
+from utils.network_usage import NetworkUsage
+
+
+class FakeRequest:
+    def __init__(self, url: str, resource_type: str, sizes: dict | None = None, post_data: str | None = None):
+        self.url = url
+        self.resource_type = resource_type
+        self.post_data = post_data
+        self._sizes = sizes
+
+    async def sizes(self) -> dict:
+        if self._sizes is None:
+            raise RuntimeError("Target closed")
+        return self._sizes
+
+
+class FakeTarget:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def emit(self, event, request):
+        self.handlers[event](request)
+
+
+def _sizes(body: int, headers: int = 100, request_body: int = 0, request_headers: int = 50) -> dict:
+    return {
+        "requestBodySize": request_body,
+        "requestHeadersSize": request_headers,
+        "responseBodySize": body,
+        "responseHeadersSize": headers,
+    }
+
+
+@pytest.mark.asyncio
+async def test_finished_requests_count_transferred_sizes_including_headers():
+    net = NetworkUsage()
+    target = FakeTarget()
+    net.attach(target)
+
+    target.emit("requestfinished", FakeRequest("https://a.test/page", "document", _sizes(1000)))
+    target.emit("requestfinished", FakeRequest("https://cdn.test/app.js", "script", _sizes(5000, request_body=20)))
+    await net.drain()
+
+    assert net.inbound_bytes == 1100 + 5100
+    assert net.outbound_bytes == 50 + 70
+    assert net.by_resource_type["script"] == {"requests": 1, "inbound": 5100, "outbound": 70}
+    assert list(net.snapshot()["by_host"]) == ["cdn.test", "a.test"]
+
+
+@pytest.mark.asyncio
+async def test_missing_sizes_fall_back_to_request_body():
+    net = NetworkUsage()
+    target = FakeTarget()
+    net.attach(target)
+
+    target.emit("requestfinished", FakeRequest("https://a.test/api", "xhr", None, post_data="x" * 30))
+    target.emit("requestfailed", FakeRequest("https://a.test/img.png", "image", post_data=None))
+    await net.drain()
+
+    assert (net.inbound_bytes, net.outbound_bytes) == (0, 30)
+    assert "image" not in net.by_resource_type
+
+
+def test_top_urls_orders_by_total_bytes_and_stays_bounded():
+    net = NetworkUsage()
+    net.max_tracked_urls = 10
+    for i in range(25):
+        net.add_bytes(inbound=i * 10, url=f"https://a.test/{i}", resource_type="image")
+
+    assert net.top_urls(3) == [("https://a.test/24", 240), ("https://a.test/23", 230), ("https://a.test/22", 220)]
+    assert len(net._url_bytes) <= 10
+    assert net.by_resource_type["image"]["requests"] == 25
@@ -0,0 +1,69 @@
+import pytest
+
+from utils.network_usage import BandwidthBudgetExceeded, NetworkUsage
+from utils.request_blocking import RequestBlocker
+
+
+class FakeRequest:
+    def __init__(self, resource_type: str, url: str):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, resource_type: str, url: str):
+        self.request = FakeRequest(resource_type, url)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "abort"
+
+    async def continue_(self):
+        self.outcome = "continue"
+
+
+@pytest.mark.asyncio
+async def test_request_blocker_aborts_resource_types_and_url_patterns():
+    blocker = RequestBlocker(["image", "font"], ["googletagmanager.com"])
+
+    image = FakeRoute("image", "https://http2.mlstatic.com/D_1.jpg")
+    tracker = FakeRoute("script", "https://www.googletagmanager.com/gtm.js")
+    document = FakeRoute("document", "https://apartamento.mercadolibre.com.ve/MLV-1")
+    for route in (image, tracker, document):
+        await blocker.handle(route)
+
+    assert (image.outcome, tracker.outcome, document.outcome) == ("abort", "abort", "continue")
+    assert blocker.blocked_requests == 2
+    assert blocker.allowed_requests == 1
+
+
+@pytest.mark.asyncio
+async def test_network_budget_disabled_by_default():
+    net = NetworkUsage()
+    net.inbound_bytes = 10 * 1024 * 1024 * 1024
+    assert not net.budget_exceeded
+    await net.enforce_budget()
+
+
+@pytest.mark.asyncio
+async def test_network_budget_stop_raises_once_exceeded():
+    net = NetworkUsage(1000)
+    net.inbound_bytes = 600
+    await net.enforce_budget()
+
+    net.outbound_bytes = 400
+    with pytest.raises(BandwidthBudgetExceeded):
+        await net.enforce_budget()
+
+
+@pytest.mark.asyncio
+async def test_network_budget_pause_sleeps_then_opens_new_window():
+    net = NetworkUsage(1000, on_exceeded="pause", pause_seconds=0)
+    net.inbound_bytes = 1500
+    assert net.budget_exceeded
+
+    await net.enforce_budget()
+    assert not net.budget_exceeded
+
+    net.inbound_bytes = 2600
+    assert net.budget_exceeded
@@ -0,0 +1,65 @@
+import gzip
+
+from scraper.parser import parse_listing_html, reparse_snapshots, select
+
+LISTING_HTML = """
+<html>
+<head>
+  <link rel="canonical" href="https://apartamento.mercadolibre.com.ve/MLV-123456-apartamento-en-chacao">
+  <meta itemprop="price" content="85000">
+</head>
+<body>
+  <h1 class="ui-pdp-title">Apartamento en Chacao</h1>
+  <span class="ui-pdp-subtitle">Apartamento &middot; Venta</span>
+  <div class="ui-pdp-highlighted-specs-res">
+    <div class="ui-pdp-label"><span>120 m² totales</span></div>
+    <div class="ui-pdp-label"><span>3 cuartos</span></div>
+    <div class="ui-pdp-label"><span>2 baños</span></div>
+  </div>
+  <p class="ui-pdp-description__content">Luminoso<br>y amplio</p>
+  <figure><img class="ui-pdp-gallery__figure__image" data-zoom="https://img/1-zoom.jpg" src="https://img/1.jpg"></figure>
+  <figure><img class="ui-pdp-gallery__figure__image" src="https://img/2.jpg"/></figure>
+  <img class="ui-pdp-image other" src="https://maps.googleapis.com/maps/api/staticmap?center=10.49%2C-66.85&zoom=15">
+</body>
+</html>
+"""
+
+
+def test_parse_listing_html_returns_raw_fields():
+    fields = parse_listing_html(LISTING_HTML)
+
+    assert fields["url"].endswith("MLV-123456-apartamento-en-chacao")
+    assert fields["price"] == "85000"
+    assert fields["title"] == "Apartamento en Chacao"
+    assert fields["p_type"] == "Apartamento · Venta"
+    assert fields["description"] == "Luminosoy amplio"
+    assert fields["specs"] == ["120 m² totales", "3 cuartos", "2 baños"]
+    assert fields["map_src"].startswith("https://maps.googleapis.com/")
+    assert fields["images"] == ["https://img/1-zoom.jpg", "https://img/2.jpg"]
+
+
+def test_parse_listing_html_missing_fields_are_none():
+    fields = parse_listing_html("<html><body><p>nothing</p></body></html>")
+    assert fields["price"] is None
+    assert fields["title"] is None
+    assert fields["specs"] == []
+    assert fields["images"] == []
+
+
+def test_select_descendant_combinator_requires_ancestor():
+    from scraper.parser import parse_document
+
+    doc = parse_document('<div class="a"><p><span class="b">in</span></p></div><span class="b">out</span>')
+    assert [el.text_content() for el in select(doc, ".a .b")] == ["in"]
+    assert len(select(doc, "span.b")) == 2
+
+
+def test_reparse_snapshots_reads_plain_and_gzipped_files(tmp_path):
+    plain = tmp_path / "failure_1.html"
+    plain.write_text(LISTING_HTML, encoding="utf-8")
+    packed = tmp_path / "failure_2.html.gz"
+    with gzip.open(packed, "wt", encoding="utf-8") as fh:
+        fh.write(LISTING_HTML)
+
+    results = reparse_snapshots([plain, packed], processes=0)
+    assert [r["price"] for r in results.values()] == ["85000", "85000"]
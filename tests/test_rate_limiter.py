@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from utils.rate_limiter import AdaptiveRateLimiter
+
+URL = "https://apartamento.mercadolibre.com.ve/MLV-1"
+
+
+@pytest.mark.asyncio
+async def test_acquire_spaces_requests_to_the_target_rate():
+    limiter = AdaptiveRateLimiter(600, jitter=0)  # one request every 0.1 s
+
+    start = time.monotonic()
+    await limiter.acquire(URL)
+    first = time.monotonic() - start
+    await limiter.acquire(URL)
+    second = time.monotonic() - start
+
+    assert first < 0.05
+    assert second >= 0.08
+
+
+@pytest.mark.asyncio
+async def test_hosts_have_independent_buckets():
+    limiter = AdaptiveRateLimiter(1, jitter=0)
+    start = time.monotonic()
+    await limiter.acquire("https://a.test/1")
+    await limiter.acquire("https://b.test/1")
+    assert time.monotonic() - start < 0.05
+
+
+def test_throttle_signals_halve_rate_and_back_off_exponentially():
+    limiter = AdaptiveRateLimiter(12, jitter=0, min_rpm=2, base_backoff_seconds=10)
+
+    limiter.observe(URL, status=429)
+    state = limiter._state(URL)
+    assert limiter.current_rpm(URL) == 6
+    first_backoff = state.backoff_until - time.monotonic()
+    assert 9 < first_backoff <= 10
+
+    limiter.observe(URL, captcha=True)
+    limiter.observe(URL, timeout=True)
+    assert limiter.current_rpm(URL) == 2  # clamped at min_rpm
+    assert state.backoff_until - time.monotonic() > 35
+
+
+def test_healthy_responses_speed_up_to_max_rpm():
+    limiter = AdaptiveRateLimiter(10, max_rpm=15, recovery_after=2, recovery_factor=1.2)
+
+    for _ in range(2):
+        limiter.observe(URL, status=200)
+    assert limiter.current_rpm(URL) == pytest.approx(12)
+
+    for _ in range(10):
+        limiter.observe(URL, status=200)
+    assert limiter.current_rpm(URL) == 15
+
+    limiter.observe(URL, status=404)  # a missing page is not a throttle signal
+    assert limiter.current_rpm(URL) == 15
+
+
+@pytest.mark.asyncio
+async def test_wait_for_backoff_honours_the_pause_without_taking_a_token():
+    limiter = AdaptiveRateLimiter(60, jitter=0)
+    await limiter.acquire(URL)
+    state = limiter._state(URL)
+    tokens = state.tokens
+
+    state.backoff_until = time.monotonic() + 0.1
+    start = time.monotonic()
+    await limiter.wait_for_backoff(URL)
+
+    assert time.monotonic() - start >= 0.08
+    assert state.tokens == tokens
@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scraper.locations import expand_state, find_state
+from scraper.scheduler import CrawlTarget, due_targets, next_due_at
+
+
+def test_find_state_ignores_case_and_accents():
+    assert find_state("merida") == "Mérida"
+    assert find_state("DISTRITO CAPITAL") == "Distrito Capital"
+    assert find_state("Atlantis") is None
+
+
+def test_expand_state_builds_city_queries():
+    assert expand_state("Distrito Capital") == ["Caracas, Distrito Capital"]
+    assert "Maracaibo, Zulia" in expand_state("zulia")
+    with pytest.raises(ValueError):
+        expand_state("Atlantis")
+
+
+def test_due_targets_orders_by_priority_then_overdue():
+    now = datetime(2026, 2, 5, 12, tzinfo=timezone.utc)
+    day = timedelta(hours=24)
+    targets = [
+        CrawlTarget("Fresh", priority=5, freshness=day),
+        CrawlTarget("Old", priority=0, freshness=day),
+        CrawlTarget("Older", priority=0, freshness=day),
+        CrawlTarget("Never", priority=0, freshness=day),
+        CrawlTarget("Important", priority=3, freshness=day),
+    ]
+    last_finished = {
+        "Fresh": now - timedelta(hours=1),
+        "Old": now - timedelta(hours=30),
+        "Older": now - timedelta(hours=50),
+        "Important": now - timedelta(hours=25),
+    }
+
+    due = [t.city_query for t in due_targets(targets, last_finished, now)]
+
+    assert due == ["Important", "Never", "Older", "Old"]
+
+
+def test_next_due_at_is_earliest_window_end():
+    finished = datetime(2026, 2, 5, tzinfo=timezone.utc)
+    targets = [
+        CrawlTarget("A", freshness=timedelta(hours=6)),
+        CrawlTarget("B", freshness=timedelta(hours=2)),
+    ]
+    assert next_due_at(targets, {"A": finished, "B": finished}) == finished + timedelta(hours=2)
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    def on(self, event, handler) -> None:
+        pass
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_due_cities_concurrently_and_records_them(sqlite_db, monkeypatch):
+    from scraper import scheduler as scheduler_module
+    from scraper.recycling import ContextRecycler
+
+    contexts: list[FakeContext] = []
+    in_flight = 0
+    peak = 0
+
+    async def fake_context(**kwargs):
+        context = FakeContext()
+        contexts.append(context)
+        return context
+
+    async def crawl(context, city_query, recycler):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    targets = [CrawlTarget(city) for city in ("A", "B", "C")]
+    scheduler = scheduler_module.CrawlScheduler(None, targets, net=None, concurrency=2, crawl=crawl)
+    monkeypatch.setattr(scheduler, "_new_recycler", lambda: ContextRecycler(fake_context))
+
+    assert await scheduler.run_once() == 3
+    assert peak == 2
+    assert all(c.closed for c in contexts)
+
+    finished = scheduler_module.load_last_finished(["A", "B", "C"])
+    assert set(finished) == {"A", "B", "C"}
+    # Everything was just crawled, so nothing is due on the next pass.
+    assert await scheduler.run_once() == 0
@@ -1,10 +1,13 @@
 import pytest
 
 from src.utils.scraper import (
+    build_search_url,
     extract_coordinates_from_staticmap,
     get_current_page_number,
     get_element_by_id,
     get_elements_by_classname,
+    parse_staticmap_center,
+    scroll_until_loaded,
 )
 
 
@@ -91,3 +94,71 @@ async def test_extract_coordinates_from_staticmap_returns_none_when_missing():
     lat, lon = await extract_coordinates_from_staticmap(page, "ui-pdp-image")
     assert lat is None
     assert lon is None
+
+
+def test_parse_staticmap_center_handles_missing_and_malformed_src():
+    assert parse_staticmap_center(None) == (None, None)
+    assert parse_staticmap_center("https://maps.google.com/staticmap?zoom=15") == (None, None)
+    assert parse_staticmap_center("https://maps.google.com/staticmap?center=abc") == (None, None)
+    assert parse_staticmap_center("https://x/?center=1.5,2.5") == (1.5, 2.5)
+
+
+def test_build_search_url_first_page_has_no_offset():
+    url = build_search_url("https://inmuebles.example.test/apartamentos/venta/", "Caracas")
+    assert url == "https://inmuebles.example.test/apartamentos/venta/caracas/"
+
+
+def test_build_search_url_city_and_state_with_offset():
+    url = build_search_url(
+        "https://inmuebles.example.test/apartamentos/venta",
+        "San Cristóbal, Táchira",
+        3,
+        results_per_page=48,
+    )
+    assert url == "https://inmuebles.example.test/apartamentos/venta/tachira/san-cristobal/_Desde_97_NoIndex_True"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("page_number", [1, 2, 3, 10])
+async def test_build_search_url_round_trips_with_get_current_page_number(page_number):
+    url = build_search_url("https://x.test/venta", "Caracas", page_number, results_per_page=48)
+    if page_number == 1:
+        assert "_Desde_" not in url
+        return
+    assert await get_current_page_number(FakePage(url=url), results_per_page=48) == str(page_number)
+
+
+class FakeScrollPage:
+    def __init__(self):
+        self.calls = []
+
+    async def evaluate(self, script, arg=None):
+        self.calls.append((script, arg))
+        return {"items": arg["expectedItems"], "steps": 3, "reason": "complete"}
+
+
+@pytest.mark.asyncio
+async def test_scroll_until_loaded_is_a_single_evaluate_round_trip():
+    page = FakeScrollPage()
+    result = await scroll_until_loaded(
+        page, item_selector=".ui-search-layout__item", expected_items=48, idle_ms=500, timeout_seconds=2
+    )
+
+    assert result == {"items": 48, "steps": 3, "reason": "complete"}
+    assert len(page.calls) == 1
+    script, arg = page.calls[0]
+    assert "MutationObserver" in script
+    assert arg["itemSelector"] == ".ui-search-layout__item"
+    assert (arg["idleMs"], arg["timeoutMs"]) == (500, 2000)
+    # No humanizing: big steps, short pauses.
+    assert arg["delayMax"] <= 100
+
+
+@pytest.mark.asyncio
+async def test_scroll_until_loaded_humanized_profile_scales_delays():
+    page = FakeScrollPage()
+    await scroll_until_loaded(page, humanize_scale=2.0)
+
+    _, arg = page.calls[0]
+    assert arg["delayMin"] == 400 and arg["delayMax"] == 1800
+    assert arg["stepMax"] < 1200
@@ -1,6 +1,6 @@
 import pytest
 
-from src.utils.strings import to_snake_case
+from src.utils.strings import to_slug, to_snake_case
 
 
 def test_to_snake_case_strips_accents_and_lowercases():
@@ -29,3 +29,8 @@ def test_to_snake_case_punctuation_becomes_single_underscores():
 )
 def test_to_snake_case_examples(raw, expected):
     assert to_snake_case(raw) == expected
+
+
+def test_to_slug_uses_hyphens():
+    assert to_slug("San Cristóbal") == "san-cristobal"
+    assert to_slug("Distrito Capital") == "distrito-capital"
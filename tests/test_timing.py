@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+
+from utils.timing import StageTimer, percentile
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_summary_reports_counts_and_percentiles_per_stage():
+    timer = StageTimer()
+    for ms in range(1, 101):
+        timer.record("goto", ms / 1000)
+    timer.record("scroll", 0.5)
+
+    stats = timer.summary()
+
+    assert stats["goto"]["count"] == 100
+    assert stats["goto"]["p50_ms"] == 50.0
+    assert stats["goto"]["p95_ms"] == 95.0
+    assert stats["goto"]["p99_ms"] == 99.0
+    assert stats["goto"]["max_ms"] == 100.0
+    assert stats["scroll"] == {
+        "count": 1,
+        "total_s": 0.5,
+        "mean_ms": 500.0,
+        "p50_ms": 500.0,
+        "p95_ms": 500.0,
+        "p99_ms": 500.0,
+        "min_ms": 500.0,
+        "max_ms": 500.0,
+    }
+
+
+def test_memory_per_stage_is_bounded_by_the_reservoir():
+    timer = StageTimer(reservoir_size=100, seed=1)
+    for i in range(1, 10_001):
+        timer.record("listing", i / 1000)
+
+    stats = timer.summary()["listing"]
+
+    assert len(timer._stages["listing"].reservoir) == 100
+    assert (stats["count"], stats["min_ms"], stats["max_ms"]) == (10_000, 1.0, 10_000.0)
+    assert stats["total_s"] == round(sum(range(1, 10_001)) / 1000, 3)
+    # Uniform sample of 1..10000 ms: the median lands near the middle.
+    assert 3_000 < stats["p50_ms"] < 7_000
+
+
+@pytest.mark.asyncio
+async def test_span_times_awaited_work_and_exports_json(tmp_path):
+    timer = StageTimer()
+    with timer.span("sleep"):
+        await asyncio.sleep(0.01)
+    with pytest.raises(RuntimeError):
+        with timer.span("boom"):
+            raise RuntimeError("still recorded")
+
+    path = timer.export_json(tmp_path / "out" / "timings.json")
+    data = json.loads(path.read_text(encoding="utf-8"))
+
+    assert data["stages"]["sleep"]["p50_ms"] >= 10
+    assert data["stages"]["boom"]["count"] == 1
+    assert data["wall_s"] >= 0.01
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlmodel import Session, select
+
+
+@pytest.fixture
+def make_queue(sqlite_db):
+    from scraper.work_queue import WorkQueue
+
+    return lambda worker_id: WorkQueue(worker_id, lease_seconds=60, max_attempts=2)
+
+
+def _jobs():
+    import db.session as db_session
+    from db.models import CrawlJob
+
+    with Session(db_session.get_engine()) as session:
+        return {job.url: job for job in session.exec(select(CrawlJob)).all()}
+
+
+def test_workers_never_claim_the_same_job(make_queue):
+    a, b = make_queue("node-a"), make_queue("node-b")
+    a.seed_city("Caracas", "https://x.test/caracas/")
+    a.add_listings("Caracas", [f"https://x.test/MLV-{i}" for i in range(5)])
+
+    first = a.claim(3)
+    second = b.claim(10)
+
+    # Listings are handed out before results pages.
+    assert [j.kind for j in first] == ["listing"] * 3
+    assert {j.id for j in first}.isdisjoint(j.id for j in second)
+    assert len(first) + len(second) == 6
+    assert b.claim(10) == []
+
+    jobs = _jobs()
+    assert {jobs[j.url].lease_owner for j in first} == {"node-a"}
+    assert {jobs[j.url].lease_owner for j in second} == {"node-b"}
+
+
+def test_only_the_lease_owner_can_complete_a_job(make_queue):
+    a, b = make_queue("node-a"), make_queue("node-b")
+    a.add_listings("Caracas", ["https://x.test/MLV-1"])
+    [job] = a.claim()
+
+    b.complete([job.id])
+    assert _jobs()[job.url].status == "in_flight"
+
+    a.complete([job.id])
+    done = _jobs()[job.url]
+    assert done.status == "done"
+    assert done.lease_owner is None
+
+
+def test_expired_leases_are_reclaimed_and_count_as_attempts(make_queue):
+    a, b = make_queue("node-a"), make_queue("node-b")
+    a.add_listings("Caracas", ["https://x.test/MLV-1"])
+    now = datetime.now(timezone.utc)
+    [job] = a.claim(now=now)
+
+    # A heartbeat keeps the job leased past its original expiry.
+    assert a.heartbeat([job.id], now=now + timedelta(seconds=50)) == 1
+    assert b.claim(now=now + timedelta(seconds=90)) == []
+
+    # node-a dies: once the lease runs out node-b takes the job over.
+    [reclaimed] = b.claim(now=now + timedelta(seconds=200))
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 1
+    assert a.heartbeat([job.id]) == 0
+
+    # Second expiry exhausts max_attempts=2.
+    assert b.claim(now=now + timedelta(seconds=400)) == []
+    assert _jobs()[job.url].status == "failed"
+
+
+def test_fail_and_release(make_queue):
+    a = make_queue("node-a")
+    a.add_listings("Caracas", ["https://x.test/MLV-1", "https://x.test/MLV-2"])
+    first, second = a.claim(2)
+
+    a.fail({first.id: "boom"})
+    a.release([second.id])
+
+    jobs = _jobs()
+    assert (jobs[first.url].status, jobs[first.url].attempts, jobs[first.url].last_error) == ("pending", 1, "boom")
+    assert (jobs[second.url].status, jobs[second.url].attempts) == ("pending", 0)
+
+
+def test_seed_city_restarts_a_finished_crawl(make_queue):
+    a = make_queue("node-a")
+    a.seed_city("Caracas", "https://x.test/caracas/")
+    [page] = a.claim()
+    a.complete([page.id])
+    assert not a.has_open_jobs()
+
+    a.seed_city("Caracas", "https://x.test/caracas/")
+    assert _jobs()[page.url].status == "pending"
+    assert a.has_open_jobs()
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from scraper.pool import DomainLimiter, ListingWorkerPool
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages: list[FakePage] = []
+
+    async def new_page(self) -> FakePage:
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_each_href_once_and_keeps_input_order():
+    context = FakeContext()
+    seen: list[str] = []
+
+    async def worker(page, href):
+        seen.append(href)
+        await asyncio.sleep(0)
+        return href.upper()
+
+    pool = ListingWorkerPool(context, worker, concurrency=3)
+    results = await pool.run(["a", "b", "a", "c", "", "d"])
+
+    assert results == ["A", "B", "C", "D"]
+    assert sorted(seen) == ["a", "b", "c", "d"]
+    assert len(context.pages) == 3
+    assert all(p.closed for p in context.pages)
+
+
+@pytest.mark.asyncio
+async def test_pool_respects_per_domain_limit():
+    context = FakeContext()
+    in_flight = {"a.test": 0, "b.test": 0}
+    peak = {"a.test": 0, "b.test": 0}
+
+    async def worker(page, href):
+        host = href.split("/")[2]
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight[host] -= 1
+        return host
+
+    hrefs = [f"https://a.test/{i}" for i in range(6)] + [f"https://b.test/{i}" for i in range(6)]
+    pool = ListingWorkerPool(context, worker, concurrency=6, domain_limiter=DomainLimiter(2))
+    await pool.run(hrefs)
+
+    assert peak == {"a.test": 2, "b.test": 2}
+
+
+@pytest.mark.asyncio
+async def test_pool_isolates_worker_failures():
+    context = FakeContext()
+
+    async def worker(page, href):
+        if href == "bad":
+            raise RuntimeError("boom")
+        return href
+
+    pool = ListingWorkerPool(context, worker, concurrency=2)
+    assert await pool.run(["ok", "bad", "fine"]) == ["ok", None, "fine"]
+
+
+@pytest.mark.asyncio
+async def test_pool_stop_on_exceptions_abort_the_run():
+    context = FakeContext()
+
+    class Stop(RuntimeError):
+        pass
+
+    async def worker(page, href):
+        raise Stop("budget")
+
+    pool = ListingWorkerPool(context, worker, concurrency=2, stop_on=(Stop,))
+    with pytest.raises(Stop):
+        await pool.run(["a", "b", "c"])
+    assert all(p.closed for p in context.pages)